@@ -0,0 +1,165 @@
+"""
+Asynchronous, batched ingestion of audit rows from NocoDB webhooks.
+
+The webhook handler only validates the event and enqueues one row; a single
+background worker drains the queue and hands rows to a bulk writer in
+batches. Failed batches are retried with exponential backoff and then
+appended to a JSON-lines dead-letter file, so a burst of webhooks never
+blocks the request path and memory stays bounded by the queue size. Rows
+that arrive while the queue is full are dead-lettered too; dead-letter writes
+run in the threadpool, off the event loop.
+"""
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from .logging_setup import get_logger
+
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "100"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_MAX_RETRIES = int(os.getenv("AUDIT_MAX_RETRIES", "3"))
+AUDIT_RETRY_BASE_DELAY = float(os.getenv("AUDIT_RETRY_BASE_DELAY", "0.5"))
+AUDIT_DEAD_LETTER_PATH = os.getenv("AUDIT_DEAD_LETTER_PATH", "audit_dead_letter.jsonl")
+
+logger = get_logger("audit")
+
+BatchWriter = Callable[[List[dict]], Awaitable[None]]
+
+
+class AuditPipeline:
+    def __init__(
+        self,
+        write_batch: BatchWriter,
+        max_queue: int = AUDIT_QUEUE_MAX,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        max_retries: int = AUDIT_MAX_RETRIES,
+        dead_letter_path: str = AUDIT_DEAD_LETTER_PATH,
+    ):
+        self.write_batch = write_batch
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.dead_letter_path = dead_letter_path
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.dead_lettered = 0
+        self.rejected = 0
+        self.high_water = 0
+        self.last_error: Optional[str] = None
+        self.last_flush_at: Optional[str] = None
+
+    def start(self):
+        """Create the queue and start the worker on the running event loop"""
+        if self._worker and not self._worker.done():
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """Flush what is already queued, then stop the worker"""
+        if not self._worker:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Audit pipeline stopped with %s rows still queued", self._queue.qsize())
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def enqueue(self, row: dict) -> bool:
+        """Queue one audit row; returns False when the queue is full and the row was dead-lettered instead"""
+        if self._queue is None:
+            self.start()
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            await run_in_threadpool(self._dead_letter, [row], "queue full")
+            return False
+        self.enqueued += 1
+        self.high_water = max(self.high_water, self._queue.qsize())
+        return True
+
+    async def _next_batch(self) -> List[dict]:
+        # Block for the first row, then collect more until the batch is full or the interval passes
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write_with_retries(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write_with_retries(self, batch: List[dict]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.write_batch(batch)
+                self.written += len(batch)
+                self.batches += 1
+                self.last_flush_at = datetime.now().isoformat()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                if attempt < self.max_retries:
+                    self.retries += 1
+                    await asyncio.sleep(AUDIT_RETRY_BASE_DELAY * (2 ** attempt))
+        logger.error("Audit batch of %s rows failed after %s attempts: %s", len(batch), self.max_retries + 1, self.last_error)
+        await run_in_threadpool(self._dead_letter, batch, self.last_error)
+
+    def _dead_letter(self, rows: List[dict], reason: Optional[str]):
+        try:
+            failed_at = datetime.now().isoformat()
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps({"failed_at": failed_at, "reason": reason, "row": row}, default=str) + "\n")
+            self.dead_lettered += len(rows)
+        except Exception as e:
+            logger.error("Could not write audit dead-letter file %s: %s", self.dead_letter_path, str(e))
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self.max_queue,
+            "queue_high_water": self.high_water,
+            "worker_running": bool(self._worker and not self._worker.done()),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "dead_lettered": self.dead_lettered,
+            "dead_letter_path": self.dead_letter_path,
+            "last_error": self.last_error,
+            "last_flush_at": self.last_flush_at,
+        }
@@ -0,0 +1,240 @@
+"""
+Local append-only audit store (MySQL `audit_log` table).
+
+Rows arrive from the audit webhook pipeline and from POST /audit. Reads for
+one record use the (table_name, record_id, timestamp, id) index with keyset
+pagination, so a page of history costs one index range scan no matter how
+often the record was edited.
+
+History recorded by NocoDB before the store existed is copied in once per
+record (`backfill`, source "nocodb"), so a record's whole trail is read from
+one place. Timestamps are stored as naive UTC.
+"""
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+from .cache import TTLCache
+
+# Records known to be backfilled, so the check costs no query once seen
+_backfilled = TTLCache(ttl=3600, max_entries=10000)
+
+# Frontend and webhook names for the same NocoDB tables
+TABLE_ALIASES = {
+    "sites": "plots",
+    "land plots": "plots",
+    "land_plots": "plots",
+}
+
+
+def canonical_table(table_name: str) -> str:
+    name = (table_name or "").strip().lower()
+    return TABLE_ALIASES.get(name, name)
+
+
+def _to_datetime(value) -> datetime:
+    """Naive UTC; values with an offset are converted, naive ones are taken as UTC"""
+    if isinstance(value, str) and value:
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            value = None
+    if not isinstance(value, datetime):
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _to_json(value) -> Optional[str]:
+    # Webhook rows already carry JSON strings; API callers may pass objects
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        try:
+            json.loads(value)
+            return value
+        except ValueError:
+            return json.dumps(value)
+    return json.dumps(value, default=str)
+
+
+def _from_json(value):
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8")
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+_INSERT = """
+    INSERT INTO audit_log
+        (table_name, record_id, action, old_values, new_values, field_changed,
+         user_id, user_email, timestamp, source, details)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def _values(rows: List[dict], source: str) -> List[tuple]:
+    return [
+        (
+            canonical_table(row.get("table_name")),
+            str(row.get("record_id")),
+            (row.get("action") or "UPDATE")[:16],
+            _to_json(row.get("old_values")),
+            _to_json(row.get("new_values")),
+            _to_json(row.get("field_changed")),
+            row.get("user_id"),
+            row.get("user_email"),
+            _to_datetime(row.get("timestamp")),
+            source,
+            _to_json(row.get("details")),
+        )
+        for row in rows
+    ]
+
+
+def insert_rows(get_connection: Callable, rows: List[dict], source: str = "webhook") -> Optional[int]:
+    """Append audit rows in one batch; returns the id of the first inserted row"""
+    if not rows:
+        return None
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(_INSERT, _values(rows, source))
+        conn.commit()
+        return cursor.lastrowid
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def is_backfilled(get_connection: Callable, table_name: str, record_id: str) -> bool:
+    key = (canonical_table(table_name), str(record_id))
+    if _backfilled.get(key):
+        return True
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT 1 FROM audit_backfill WHERE table_name = %s AND record_id = %s", key)
+        done = cursor.fetchone() is not None
+    finally:
+        cursor.close()
+        conn.close()
+    if done:
+        _backfilled.set(key, True)
+    return done
+
+
+def backfill(get_connection: Callable, table_name: str, record_id: str, rows: List[dict]) -> int:
+    """
+    Copy a record's NocoDB history into the store, once.
+
+    Only entries older than the record's first locally recorded row are
+    copied; later edits already arrived by webhook. The claim row and the
+    history commit together, so concurrent callers copy it only once.
+    Returns the number of rows copied.
+    """
+    key = (canonical_table(table_name), str(record_id))
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("INSERT IGNORE INTO audit_backfill (table_name, record_id) VALUES (%s, %s)", key)
+        if cursor.rowcount == 0:
+            conn.rollback()
+            _backfilled.set(key, True)
+            return 0
+        cursor.execute(
+            "SELECT MIN(timestamp) FROM audit_log WHERE table_name = %s AND record_id = %s AND source <> 'nocodb'",
+            key,
+        )
+        first_local = cursor.fetchone()[0]
+        values = [v for v in _values(rows, "nocodb") if first_local is None or v[8] < first_local]
+        if values:
+            cursor.executemany(_INSERT, values)
+        cursor.execute(
+            "UPDATE audit_backfill SET entries = %s WHERE table_name = %s AND record_id = %s",
+            (len(values), *key),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+    _backfilled.set(key, True)
+    return len(values)
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor_value: str) -> Tuple[datetime, int]:
+    """Raises ValueError for a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor_value.encode("ascii")).decode("utf-8")
+        timestamp, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor_value}") from e
+
+
+def fetch_trail(
+    get_connection: Callable,
+    table_name: str,
+    record_id: str,
+    limit: int = 50,
+    before: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Newest-first audit rows for one record.
+
+    Returns (rows, next_cursor); pass next_cursor back as `before` to get
+    the following page. next_cursor is None on the last page.
+    """
+    params: list = [canonical_table(table_name), str(record_id)]
+    keyset = ""
+    if before:
+        before_ts, before_id = decode_cursor(before)
+        keyset = "AND (timestamp < %s OR (timestamp = %s AND id < %s))"
+        params += [before_ts, before_ts, before_id]
+    params.append(limit + 1)
+
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            f"""
+            SELECT id, table_name, record_id, action, old_values, new_values, field_changed,
+                   user_id, user_email, timestamp, source, details
+            FROM audit_log
+            WHERE table_name = %s AND record_id = %s {keyset}
+            ORDER BY timestamp DESC, id DESC
+            LIMIT %s
+            """,
+            params,
+        )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+
+    for row in rows:
+        for key in ("old_values", "new_values", "field_changed"):
+            row[key] = _from_json(row[key])
+        # Kept as NocoDB's JSON text, which the frontend parses itself
+        if isinstance(row["details"], (bytes, bytearray)):
+            row["details"] = row["details"].decode("utf-8")
+    return rows, next_cursor
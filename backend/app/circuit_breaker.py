@@ -0,0 +1,109 @@
+"""
+Circuit breaker for an upstream service.
+
+Closed: calls go through and consecutive failures are counted. After
+`failure_threshold` of them the breaker opens and calls are refused without
+touching the upstream. After `reset_timeout` seconds it is half-open and a
+single trial call is let through: success closes the breaker, failure opens
+it again for another `reset_timeout`.
+
+Thread-safe; callers must report each allowed call's outcome with
+`record_success` or `record_failure`.
+"""
+import threading
+import time
+from typing import Optional
+
+from .logging_setup import get_logger
+
+logger = get_logger("breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started: Optional[float] = None
+        self.times_opened = 0
+        self.rejected = 0
+        self.last_failure: Optional[str] = None
+
+    def _current_state(self) -> str:
+        # Caller holds the lock
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trial_started = None
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    @property
+    def healthy(self) -> bool:
+        """Closed with no failures since the last success"""
+        with self._lock:
+            return self._current_state() == CLOSED and self._failures == 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            now = time.monotonic()
+            # One trial at a time; a trial that never reported back is given up on
+            if state == HALF_OPEN and (self._trial_started is None or now - self._trial_started >= self.reset_timeout):
+                self._trial_started = now
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("%s circuit closed", self.name)
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_started = None
+
+    def record_failure(self, reason: str):
+        with self._lock:
+            self._failures += 1
+            self.last_failure = reason
+            state = self._current_state()
+            if state == HALF_OPEN or (state == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._trial_started = None
+                self.times_opened += 1
+                logger.warning(
+                    "%s circuit open after %s consecutive failures (last: %s); retrying in %ss",
+                    self.name, self._failures, reason, self.reset_timeout,
+                )
+
+    def stats(self) -> dict:
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1)
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_seconds": self.reset_timeout,
+                "retry_in_seconds": retry_in,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "last_failure": self.last_failure,
+            }
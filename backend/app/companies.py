@@ -0,0 +1,240 @@
+"""
+Paged, filtered reads of the MySQL `companies` table.
+
+GET /companies used to return the whole table with every date converted in a
+Python loop and the summary counted by scanning the result. Here:
+
+* rows are read a page at a time with keyset pagination on (sort column, id)
+* `fields` projects the selected columns; names are checked against the
+  table's columns so they can be interpolated safely
+* type / status / name filters and the sort run in SQL
+* the summary comes from one grouped COUNT(*) query and is cached for
+  COMPANIES_SUMMARY_TTL seconds
+
+The table is maintained through NocoDB, so `invalidate` is called from the
+NocoDB webhook when a companies row changes; with several workers it is
+signalled to the others through the shared cache. Rows created through the
+management accounts API live in a separate database and do not affect it.
+"""
+import base64
+import json
+import os
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .cache import TTLCache
+from .shared_cache import Generation
+
+COMPANIES_SUMMARY_TTL = float(os.getenv("COMPANIES_SUMMARY_TTL", "300"))
+COMPANIES_COLUMNS_TTL = float(os.getenv("COMPANIES_COLUMNS_TTL", "3600"))
+COMPANIES_MAX_PAGE = 1000
+
+# Public sort names -> column
+SORT_COLUMNS = {
+    "name": "full_name",
+    "type": "type",
+    "status": "company_status",
+    "id": "id",
+}
+
+_DATE_TYPES = {"date", "datetime", "timestamp", "time"}
+_DECIMAL_TYPES = {"decimal"}
+
+_summary = TTLCache(ttl=COMPANIES_SUMMARY_TTL, max_entries=1)
+_columns = TTLCache(ttl=COMPANIES_COLUMNS_TTL, max_entries=1)
+_shared = Generation("companies")
+
+
+def table_columns(get_connection: Callable) -> Dict[str, str]:
+    """Column name -> MySQL data type, in table order"""
+    columns = _columns.get("companies")
+    if columns is not None:
+        return columns
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            """
+            SELECT COLUMN_NAME AS name, DATA_TYPE AS data_type FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'companies'
+            ORDER BY ORDINAL_POSITION
+            """
+        )
+        columns = {row["name"]: row["data_type"].lower() for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+        conn.close()
+    _columns.set("companies", columns)
+    return columns
+
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    raw = json.dumps([sort_value, row_id], default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor_value: str) -> Tuple[Optional[str], int]:
+    """Raises ValueError for a malformed cursor"""
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor_value.encode("ascii")))
+        return sort_value, int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor_value}") from e
+
+
+def _keyset_clause(column: str, descending: bool, after_value, after_id: int) -> Tuple[str, list]:
+    # The column is interpolated into SQL; only the whitelisted sort columns may reach it
+    if column not in SORT_COLUMNS.values():
+        raise ValueError(f"Unknown sort column '{column}'")
+    # MySQL sorts NULL first ascending and last descending; the clause follows the same order
+    if not descending:
+        if after_value is None:
+            return f"(({column} IS NULL AND id > %s) OR {column} IS NOT NULL)", [after_id]
+        return f"({column} > %s OR ({column} = %s AND id > %s))", [after_value, after_value, after_id]
+    if after_value is None:
+        return f"({column} IS NULL AND id < %s)", [after_id]
+    return f"({column} < %s OR ({column} = %s AND id < %s) OR {column} IS NULL)", [after_value, after_value, after_id]
+
+
+def _serialise(rows: List[dict], columns: Dict[str, str]) -> None:
+    # Only touch the columns whose type needs it instead of inspecting every value
+    date_keys = [name for name, data_type in columns.items() if data_type in _DATE_TYPES]
+    decimal_keys = [name for name, data_type in columns.items() if data_type in _DECIMAL_TYPES]
+    for row in rows:
+        for key in date_keys:
+            value = row.get(key)
+            if value is not None and hasattr(value, "isoformat"):
+                row[key] = value.isoformat()
+            elif value is not None:
+                row[key] = str(value)
+        for key in decimal_keys:
+            if isinstance(row.get(key), Decimal):
+                row[key] = float(row[key])
+
+
+def list_companies(
+    get_connection: Callable,
+    *,
+    fields: Optional[List[str]] = None,
+    company_type: Optional[str] = None,
+    status: Optional[str] = None,
+    name: Optional[str] = None,
+    sort: str = "name",
+    descending: bool = False,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of companies and the cursor for the next one (None on the last page).
+
+    Without `limit` every matching row is returned, as the endpoint always did.
+    `id` and the sort column are always selected so the cursor can be built.
+    Raises ValueError for unknown fields/sort names or a malformed cursor.
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Unknown sort '{sort}'. Use one of: {', '.join(SORT_COLUMNS)}")
+    sort_column = SORT_COLUMNS[sort]
+    columns = table_columns(get_connection)
+
+    if fields:
+        unknown = [f for f in fields if f not in columns]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        selected = list(dict.fromkeys(["id", sort_column, *fields]))
+    else:
+        selected = list(columns)
+    select_list = ", ".join(f"`{c}`" for c in selected)
+
+    where: List[str] = []
+    params: list = []
+    if company_type:
+        where.append("type = %s")
+        params.append(company_type)
+    if status:
+        where.append("company_status = %s")
+        params.append(status)
+    if name:
+        where.append("(full_name LIKE %s OR name LIKE %s)")
+        params += [f"%{name}%", f"%{name}%"]
+    if after:
+        after_value, after_id = decode_cursor(after)
+        clause, clause_params = _keyset_clause(sort_column, descending, after_value, after_id)
+        where.append(clause)
+        params += clause_params
+
+    direction = "DESC" if descending else "ASC"
+    query = f"SELECT {select_list} FROM companies"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += f" ORDER BY {sort_column} {direction}, id {direction}"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit + 1)
+
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.get(sort_column), last["id"])
+
+    _serialise(rows, {c: columns[c] for c in selected})
+    return rows, next_cursor
+
+
+def summary(get_connection: Callable) -> dict:
+    """Totals and type/status breakdowns from a single grouped query, cached"""
+    if _shared.changed():
+        _drop()
+    cached = _summary.get("summary")
+    if cached is not None:
+        return cached
+
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            "SELECT type, company_status, COUNT(*) AS count FROM companies GROUP BY type, company_status"
+        )
+        groups = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    type_breakdown: Dict[str, int] = {}
+    status_breakdown: Dict[str, int] = {}
+    for group in groups:
+        count = int(group["count"])
+        type_breakdown[group["type"]] = type_breakdown.get(group["type"], 0) + count
+        if group["company_status"] is not None:
+            status = group["company_status"]
+            status_breakdown[status] = status_breakdown.get(status, 0) + count
+
+    result = {
+        "total_companies": sum(type_breakdown.values()),
+        "active_companies": status_breakdown.get("Active", 0),
+        "dissolved_companies": status_breakdown.get("Dissolved", 0),
+        "type_breakdown": type_breakdown,
+        "status_breakdown": dict(sorted(status_breakdown.items(), key=lambda item: item[1], reverse=True)),
+    }
+    _summary.set("summary", result)
+    return result
+
+
+def _drop():
+    _summary.clear()
+    _columns.clear()
+
+
+def invalidate():
+    """Drop the cached summary and columns after the companies table changes, on every worker"""
+    _drop()
+    _shared.bump()
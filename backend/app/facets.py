@@ -0,0 +1,86 @@
+"""
+Distinct-value (facet) index over project data for filter dropdowns.
+
+Partner, status, country and agent values are counted from the Projects
+mirror in one pass and kept until the mirror's version changes, so every
+dropdown endpoint answers from memory and lists the same values. Values are
+grouped case-insensitively, matching how list filters compare them; the
+first spelling seen is the one shown.
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .table_mirror import projects_mirror
+
+# facet name -> NocoDB field title
+PROJECT_FACETS = {
+    "partner": "Primary Project Partner",
+    "status": "Status",
+    "country": "Country",
+    "agent": "Agent",
+}
+
+
+def _values(raw) -> Iterable[str]:
+    # Single selects are strings; multi-selects and links may arrive as lists
+    if raw is None:
+        return ()
+    if isinstance(raw, list):
+        return [v for item in raw for v in _values(item)]
+    if isinstance(raw, dict):
+        raw = raw.get("Title") or raw.get("title") or raw.get("name")
+        return _values(raw)
+    value = str(raw).strip()
+    return (value,) if value else ()
+
+
+def build_facets(rows: Iterable[dict], facets: Dict[str, str] = PROJECT_FACETS) -> Dict[str, Dict[str, int]]:
+    """facet name -> {value: row count}, values sorted case-insensitively"""
+    counts: Dict[str, Dict[str, Tuple[str, int]]] = {name: {} for name in facets}
+    for row in rows:
+        for name, field in facets.items():
+            for value in set(_values(row.get(field))):
+                key = value.lower()
+                display, count = counts[name].get(key, (value, 0))
+                counts[name][key] = (display, count + 1)
+    return {
+        name: {display: count for _, (display, count) in sorted(values.items())}
+        for name, values in counts.items()
+    }
+
+
+class FacetIndex:
+    def __init__(self, mirror=projects_mirror, facets: Dict[str, str] = PROJECT_FACETS):
+        self.mirror = mirror
+        self.facets = facets
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self.builds = 0
+
+    def counts(self) -> Optional[Dict[str, Dict[str, int]]]:
+        """All facets with counts, or None while the mirror has not loaded"""
+        version = self.mirror.version
+        with self._lock:
+            if self._version == version:
+                return self._counts
+        version, rows = self.mirror.snapshot()
+        if rows is None:
+            return None
+        counts = build_facets(rows, self.facets)
+        with self._lock:
+            self._version, self._counts = version, counts
+            self.builds += 1
+        return counts
+
+    def values(self, facet: str) -> Optional[List[str]]:
+        """Sorted distinct values of one facet, or None while the mirror has not loaded"""
+        counts = self.counts()
+        return list(counts[facet]) if counts is not None else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"version": self._version, "builds": self.builds}
+
+
+project_facets = FacetIndex()
@@ -0,0 +1,79 @@
+"""
+Cached upstream latency probes for the health report.
+
+/health stays a constant-time liveness answer; GET /health/report measures
+round trips to MySQL and NocoDB. A `Probe` runs its check at most once every
+HEALTH_PROBE_TTL seconds per worker and concurrent reports wait for the
+check already running, so a dashboard polling the report cannot add load to
+an upstream that is already slow.
+
+A check is a blocking callable returning a dict of details (merged into the
+result) or raising on failure. Results carry the measured latency and are
+"slow" above HEALTH_SLOW_MS.
+"""
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+import anyio.to_thread
+
+from .logging_setup import get_logger
+from .singleflight import SingleFlight
+
+logger = get_logger("health")
+
+HEALTH_PROBE_TTL = float(os.getenv("HEALTH_PROBE_TTL", "15"))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "3"))
+HEALTH_SLOW_MS = float(os.getenv("HEALTH_SLOW_MS", "500"))
+
+STARTED_AT = time.monotonic()
+
+_flights = SingleFlight()
+
+
+class Probe:
+    def __init__(self, name: str, check: Callable[[], Optional[dict]], ttl: float = HEALTH_PROBE_TTL):
+        self.name = name
+        self.check = check
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self.runs = 0
+
+    def _run(self) -> dict:
+        started = time.monotonic()
+        try:
+            details = self.check() or {}
+            result = {"ok": True, "error": None}
+        except Exception as e:
+            details = {}
+            result = {"ok": False, "error": str(e) or type(e).__name__}
+            logger.warning("%s probe failed: %s", self.name, result["error"])
+        latency_ms = round((time.monotonic() - started) * 1000, 1)
+        result.update(latency_ms=latency_ms, slow=latency_ms > HEALTH_SLOW_MS, **details)
+        with self._lock:
+            self._result, self._checked_at = result, time.monotonic()
+            self.runs += 1
+        return result
+
+    def result(self) -> dict:
+        """The last result if it is fresh, else a new measurement (blocking)"""
+        with self._lock:
+            result, checked_at = self._result, self._checked_at
+        if result is None or time.monotonic() - checked_at >= self.ttl:
+            result = _flights.do(self.name, self._run)
+            with self._lock:
+                checked_at = self._checked_at
+        return {**result, "checked_seconds_ago": round(time.monotonic() - checked_at, 1)}
+
+
+def threadpool_stats() -> dict:
+    """Worker threads busy in the threadpool that runs plain `def` endpoints; call from async code"""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    return {"in_use": limiter.borrowed_tokens, "limit": limiter.total_tokens}
+
+
+def uptime_seconds() -> float:
+    return round(time.monotonic() - STARTED_AT, 1)
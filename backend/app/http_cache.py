@@ -0,0 +1,60 @@
+"""
+Conditional GET helpers.
+
+`etag_response` serialises a payload once, derives a strong ETag from the
+bytes and answers 304 Not Modified when the client's If-None-Match already
+names that ETag, so unchanged data costs a hash instead of a transfer.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+# Cache-Control hints. "no-cache" still lets clients store the body but makes
+# them revalidate (a cheap 304) on every use; max-age skips the request
+# entirely for data that may lag slightly behind NocoDB.
+NO_CACHE = "private, no-cache"
+
+
+def max_age(seconds: int) -> str:
+    return f"private, max-age={seconds}, must-revalidate"
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def _if_none_match(request: Request) -> set:
+    header = request.headers.get("if-none-match", "")
+    # Weak validators compare equal for GET; strip the W/ prefix
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+def not_modified(request: Optional[Request], etag: Optional[str]) -> bool:
+    """True when the client's If-None-Match already names `etag`"""
+    if request is None or not etag:
+        return False
+    tags = _if_none_match(request)
+    return etag in tags or "*" in tags
+
+
+def etag_response(
+    request: Request,
+    content: Any,
+    status_code: int = 200,
+    cache_control: Optional[str] = NO_CACHE,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """JSON response carrying an ETag, or an empty 304 if the client has it already"""
+    body = json.dumps(jsonable_encoder(content), separators=(",", ":")).encode("utf-8")
+    etag = make_etag(body)
+    headers = {**(headers or {}), "ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+
+    if status_code == 200 and not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
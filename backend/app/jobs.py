@@ -0,0 +1,201 @@
+"""
+In-process registry for long-running background jobs.
+
+An endpoint starts a job and returns its id straight away; the work runs as
+an asyncio task on the event loop and reports progress that clients poll
+through GET /jobs/{job_id}. Only one job of a given kind runs at a time and
+only the most recent finished jobs are kept.
+
+With several workers the poll may reach a worker other than the one running
+the job, so job state is also published to the shared cache, and the
+one-per-kind rule is enforced across workers by a lease the running worker
+renews every JOB_LEASE_TTL / 3 seconds.
+"""
+import asyncio
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from . import shared_cache
+from .logging_setup import get_logger
+
+logger = get_logger("jobs")
+
+MAX_FINISHED_JOBS = 50
+SHARED_JOB_TTL = 24 * 3600
+JOB_LEASE_TTL = float(os.getenv("JOB_LEASE_TTL", "60"))
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class Job:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = PENDING
+        self.progress = {"done": 0, "total": None}
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    async def set_progress(self, done: int, total: Optional[int] = None, **extra):
+        """Update progress; the shared-cache publish runs in the threadpool"""
+        self.progress["done"] = done
+        if total is not None:
+            self.progress["total"] = total
+        self.progress.update(extra)
+        await run_in_threadpool(self.publish)
+
+    def publish(self):
+        if shared_cache.ENABLED:
+            shared_cache.put(f"job:{self.id}", self.to_dict(), SHARED_JOB_TTL)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+_jobs: "OrderedDict[str, Job]" = OrderedDict()
+_tasks: dict = {}  # job id -> asyncio.Task, keeps running tasks referenced
+
+
+def _prune():
+    finished = [job_id for job_id, job in _jobs.items() if job.finished]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del _jobs[job_id]
+
+
+def _lease(kind: str) -> str:
+    return f"job:{kind}"
+
+
+def _running_key(kind: str) -> str:
+    return f"job-kind:{kind}"
+
+
+async def _hold_lease(kind: str):
+    while True:
+        await asyncio.sleep(JOB_LEASE_TTL / 3)
+        await run_in_threadpool(shared_cache.acquire_lease, _lease(kind), JOB_LEASE_TTL)
+
+
+async def _run(job: Job, work: Callable[[Job], Awaitable[dict]]):
+    job.status = RUNNING
+    job.started_at = datetime.now()
+    await run_in_threadpool(job.publish)
+    renewer = asyncio.get_running_loop().create_task(_hold_lease(job.kind)) if shared_cache.ENABLED else None
+    try:
+        job.result = await work(job)
+        job.status = SUCCEEDED
+    except Exception as e:
+        logger.exception("Background job %s (%s) failed: %s", job.kind, job.id, str(e))
+        job.error = str(e)
+        job.status = FAILED
+    finally:
+        job.finished_at = datetime.now()
+        if renewer is not None:
+            renewer.cancel()
+        await run_in_threadpool(_finish, job)
+        _tasks.pop(job.id, None)
+        _prune()
+
+
+def _finish(job: Job):
+    job.publish()
+    if shared_cache.ENABLED:
+        shared_cache.delete(_running_key(job.kind))
+        shared_cache.release_lease(_lease(job.kind))
+
+
+def _running_here(kind: str) -> Optional[dict]:
+    for job in _jobs.values():
+        if job.kind == kind and not job.finished:
+            return job.to_dict()
+    return None
+
+
+def _running_elsewhere(kind: str) -> Optional[dict]:
+    # Blocking: None when this worker may start the job (it now holds the lease)
+    if not shared_cache.ENABLED or shared_cache.acquire_lease(_lease(kind), JOB_LEASE_TTL):
+        return None
+    job_id = shared_cache.get(_running_key(kind))
+    status = job_status(job_id) if job_id else None
+    # The other worker may not have published the job yet
+    return status or {"job_id": None, "kind": kind, "status": PENDING}
+
+
+async def start_job(kind: str, work: Callable[[Job], Awaitable[dict]]) -> dict:
+    """
+    Schedule `work(job)` on the running event loop and return the job's state.
+
+    If a job of the same kind is still running, in this worker or another,
+    that job's state is returned instead of starting a second one.
+    """
+    running = _running_here(kind)
+    if running is None:
+        running = await run_in_threadpool(_running_elsewhere, kind)
+    if running is None:
+        # Checked again: another request here may have started it during the await
+        running = _running_here(kind)
+    if running is not None:
+        return running
+
+    job = Job(kind)
+    _jobs[job.id] = job
+    if shared_cache.ENABLED:
+        await run_in_threadpool(shared_cache.put, _running_key(kind), job.id, SHARED_JOB_TTL)
+    await run_in_threadpool(job.publish)
+    _tasks[job.id] = asyncio.get_running_loop().create_task(_run(job, work))
+    return job.to_dict()
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    return _jobs.get(job_id)
+
+
+def job_status(job_id: str) -> Optional[dict]:
+    """Job state from this worker, or as published by the worker running it"""
+    job = _jobs.get(job_id)
+    if job is not None:
+        return job.to_dict()
+    return shared_cache.get(f"job:{job_id}") if shared_cache.ENABLED else None
+
+
+def list_jobs() -> list:
+    return [job.to_dict() for job in reversed(_jobs.values())]
+
+
+def stats() -> dict:
+    """Job counts by status, the jobs still running and the last one to finish"""
+    counts = {status: 0 for status in (PENDING, RUNNING, SUCCEEDED, FAILED)}
+    for job in _jobs.values():
+        counts[job.status] += 1
+    finished = [job for job in _jobs.values() if job.finished]
+    last = max(finished, key=lambda job: job.finished_at) if finished else None
+    return {
+        "counts": counts,
+        "active": [job.to_dict() for job in _jobs.values() if not job.finished],
+        "last_finished": last.to_dict() if last else None,
+    }
@@ -0,0 +1,167 @@
+"""
+Application logging: levels, structured output and a non-blocking handler.
+
+Every module logs through `get_logger(name)` (loggers live under "s42.").
+Records are put on an in-memory queue by a QueueHandler and written to
+stderr by a QueueListener thread, so a slow container log pipe never blocks
+a request. Use %-style arguments (`logger.debug("got %s rows", n)`) so
+messages below the configured level are never formatted.
+
+Settings:
+
+* LOG_LEVEL - DEBUG, INFO (default), WARNING, ERROR; DEBUG_MODE=true
+  still switches on DEBUG when LOG_LEVEL is not set
+* LOG_FORMAT - json (default, one object per line) or text
+* LOG_SAMPLING - per-logger sampling of records below WARNING, e.g.
+  "http=0.01,schema=0.1" keeps 1% of s42.http and 10% of s42.schema
+* LOG_QUEUE_SIZE - records held while the writer catches up (default
+  10000); further records are dropped and counted rather than blocking
+"""
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+ROOT_LOGGER = "s42"
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records below WARNING for the loggers named in `rates`"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        name = record.name
+        # Most specific configured prefix wins: s42.http.cors falls back to s42.http
+        while name:
+            rate = self.rates.get(name)
+            if rate is not None:
+                return random.random() < rate
+            name = name.rpartition(".")[0]
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args into the message and render any traceback before the record
+        # crosses threads, but keep both as separate fields for the formatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _parse_sampling(spec: str) -> Dict[str, float]:
+    rates = {}
+    for part in spec.split(","):
+        if "=" not in part:
+            continue
+        name, value = part.split("=", 1)
+        name = name.strip()
+        if not name.startswith(ROOT_LOGGER + ".") and name != ROOT_LOGGER:
+            name = f"{ROOT_LOGGER}.{name}"
+        try:
+            rates[name] = min(max(float(value), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+def _level_from_env() -> int:
+    level = os.getenv("LOG_LEVEL")
+    if not level:
+        return logging.DEBUG if os.getenv("DEBUG_MODE", "false").lower() == "true" else logging.INFO
+    value = logging.getLevelName(level.upper())
+    return value if isinstance(value, int) else logging.INFO
+
+
+def configure_logging():
+    """Install the queue handler on the "s42" logger; safe to call more than once"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stderr)
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        stream.setFormatter(JsonFormatter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _queue_handler.addFilter(SamplingFilter(_parse_sampling(os.getenv("LOG_SAMPLING", ""))))
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(_level_from_env())
+    root.handlers = [_queue_handler]
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=False)
+    _listener.start()
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def stats() -> dict:
+    return {
+        "level": logging.getLevelName(logging.getLogger(ROOT_LOGGER).level),
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "dropped": _queue_handler.dropped if _queue_handler else 0,
+    }
@@ -2,30 +2,129 @@ from fastapi import FastAPI, Depends, HTTPException, status, Header, Query, Body
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import mysql.connector
 import requests
+import httpx
 import urllib3
 import os
 import json
-from datetime import datetime, date
+import asyncio
+import time
+from datetime import datetime, date, timezone
 from decimal import Decimal
 from typing import Optional, Any
 from collections import OrderedDict
 import base64
 from dotenv import load_dotenv
+from .audit_pipeline import AuditPipeline
+from .audit_store import (
+    backfill as backfill_audit_trail,
+    canonical_table as canonical_audit_table,
+    fetch_trail as fetch_audit_trail,
+    insert_rows as insert_audit_rows,
+    is_backfilled as is_audit_backfilled,
+)
+from .circuit_breaker import CLOSED as BREAKER_CLOSED, OPEN as BREAKER_OPEN
+from .companies import (
+    COMPANIES_MAX_PAGE,
+    invalidate as invalidate_companies,
+    list_companies,
+    summary as companies_summary,
+)
+from .facets import PROJECT_FACETS, build_facets, project_facets
+from .health import HEALTH_PROBE_TIMEOUT, Probe, threadpool_stats, uptime_seconds
+from .http_cache import NO_CACHE, etag_response, max_age
+from .jobs import Job, job_status, start_job, stats as job_stats
+from .management_accounts import (
+    SECTIONS as MANAGEMENT_SECTIONS,
+    fetch_all as fetch_management_sections,
+    fetch_section as fetch_management_section,
+    summary as management_accounts_summary,
+)
+from .logging_setup import configure_logging, get_logger, stats as logging_stats, stop_logging
+from .migrations import run_migrations
+from .nocodb_client import (
+    NocoDBUnavailable,
+    breaker as nocodb_breaker,
+    close_client as close_nocodb_client,
+    get_session as get_nocodb_session,
+    nocodb_delete,
+    nocodb_get,
+    nocodb_get_sync,
+    nocodb_headers,
+    nocodb_list_all,
+    nocodb_patch,
+    nocodb_post,
+    nocodb_post_sync,
+    pool_stats as nocodb_pool_stats,
+    stats as nocodb_client_stats,
+    token_scope,
+)
+from .nocodb_query import NocoQuery, parse_fields, parse_sort
+from .page_access import (
+    get_user_pages as get_cached_user_pages,
+    invalidate_all as invalidate_page_access,
+    invalidate_pages,
+    invalidate_user_groups,
+    stats as page_access_stats,
+    warm as warm_page_access,
+)
+from .rates import rate_service
+from .response_cache import (
+    cached_response,
+    invalidate as invalidate_responses,
+    stats as response_cache_stats,
+)
+from .select_options import (
+    as_choices as select_option_choices,
+    display_options as display_select_options,
+    option_order as select_option_order,
+    parse_options as parse_select_options,
+)
+from .shared_cache import worker_id
+from .table_mirror import (
+    apply_webhook_event as apply_mirror_event,
+    plots_mirror,
+    projects_mirror,
+    refresh_mirrored_row,
+    refresher_stats as mirror_refresher_stats,
+    start_refresher as start_mirror_refresher,
+    stop_refresher as stop_mirror_refresher,
+)
+from .user_directory import (
+    invalidate as invalidate_user_directory,
+    nocodb_token as cached_user_nocodb_token,
+    refresh as warm_user_directory,
+    resolve_names as resolve_user_names,
+    stats as user_directory_stats,
+)
+from .warmup import internal_request, warmup
 # import nocodb_sync  # Comment out for now since it's not needed for page management
 
 # Load environment variables from .env file
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
 
-# Debug mode configuration
-DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
-
-def debug_print(*args, **kwargs):
-    """Print debug messages only if DEBUG_MODE is enabled"""
-    if DEBUG_MODE:
-        print(*args, **kwargs)
+# Leveled, queue-backed logging; LOG_LEVEL (or DEBUG_MODE=true) controls verbosity
+configure_logging()
+http_logger = get_logger("http")
+auth_logger = get_logger("auth")
+db_logger = get_logger("db")
+schema_logger = get_logger("schema")
+nocodb_logger = get_logger("nocodb")
+comments_logger = get_logger("comments")
+audit_logger = get_logger("audit")
+access_logger = get_logger("access")
+accounts_logger = get_logger("accounts")
+
+# Cache-Control for conditional-GET endpoints; lists users edit revalidate every
+# time, slow-moving schema and map data may be reused briefly without asking
+SCHEMA_CACHE_CONTROL = max_age(int(os.getenv("SCHEMA_CACHE_MAX_AGE", "60")))
+MAP_CACHE_CONTROL = max_age(int(os.getenv("MAP_CACHE_MAX_AGE", "30")))
+
+NOCODB_SCHEMA_TABLE_ID = "m72851bbm1z0qul"
 
 # Disable SSL warnings for NocoDB API calls
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -87,12 +186,11 @@ app = FastAPI(
 # Custom CORS middleware - handles all CORS requests
 @app.middleware("http")
 async def cors_handler(request, call_next):
-    print(f"?? CORS Request: {request.method} {request.url}")
-    print(f"?? Origin: {request.headers.get('origin', 'None')}")
-    print(f"?? Headers: {dict(request.headers)}")
+    http_logger.debug("CORS Request: %s %s", request.method, request.url)
+    http_logger.debug("Origin: %s", request.headers.get('origin', 'None'))
     
     if request.method == "OPTIONS":
-        print("? Handling OPTIONS preflight request")
+        http_logger.debug("Handling OPTIONS preflight request")
         return JSONResponse(
             content={"message": "OK"},
             headers={
@@ -136,40 +234,24 @@ def json_serial(obj):
 
 def get_user_name_from_email(email: str) -> str:
     """
-    Get user's display name from email address by querying the users table.
+    Get user's display name from email address (served from the user directory cache).
     Returns the user's name if found, otherwise returns the email address.
     """
     if not email:
         return "Unknown User"
     
     try:
-        conn = mysql.connector.connect(
-            host=os.getenv("DB_HOST", "10.1.8.51"),
-            user=os.getenv("DB_USER", "s42project"),
-            password=os.getenv("DB_PASSWORD", "s42project"),
-            database=os.getenv("DB_NAME", "nocodb"),
-            port=int(os.getenv("DB_PORT", "3306")),
-        )
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT name FROM users WHERE email = %s", (email,))
-        user_data = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        
-        if user_data and isinstance(user_data, dict) and user_data.get('name'):
-            return user_data['name']
-        else:
-            return email  # Return email if no name found
+        return resolve_user_names([email], get_db)[email]
     except Exception as e:
-        print(f"Error fetching user name for {email}: {e}")
+        comments_logger.error("Error fetching user name for %s: %s", email, e)
         return email  # Return email on error
 
 
 def get_user_names_batch(emails: list) -> dict:
     """
-    Get user names for multiple emails in a single database query.
-    Returns a dictionary mapping email -> name.
-    More efficient than individual queries when processing multiple items.
+    Get user names for multiple emails from the user directory cache.
+    Returns a dictionary mapping email -> name (the email itself when unknown).
+    Only emails the cache has not seen yet are looked up in the database.
     """
     if not emails:
         return {}
@@ -181,40 +263,48 @@ def get_user_names_batch(emails: list) -> dict:
         return {}
     
     try:
-        conn = mysql.connector.connect(
-            host=os.getenv("DB_HOST", "10.1.8.51"),
-            user=os.getenv("DB_USER", "s42project"),
-            password=os.getenv("DB_PASSWORD", "s42project"),
-            database=os.getenv("DB_NAME", "nocodb"),
-            port=int(os.getenv("DB_PORT", "3306")),
-        )
-        cursor = conn.cursor(dictionary=True)
-        
-        # Create placeholders for IN clause
-        placeholders = ', '.join(['%s'] * len(unique_emails))
-        query = f"SELECT email, name FROM users WHERE email IN ({placeholders})"
-        cursor.execute(query, tuple(unique_emails))
-        results = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
-        # Build email -> name mapping
-        email_to_name = {}
-        for row in results:
-            if isinstance(row, dict) and row.get('email') and row.get('name'):
-                email_to_name[row['email']] = row['name']
-        
-        # Fill in missing emails with email as fallback
-        for email in unique_emails:
-            if email not in email_to_name:
-                email_to_name[email] = email
-        
-        return email_to_name
+        return resolve_user_names(unique_emails, get_db)
     except Exception as e:
-        print(f"Error fetching user names in batch: {e}")
+        comments_logger.error("Error fetching user names in batch: %s", e)
         # Return dict with emails as fallback
         return {email: email for email in unique_emails}
 
+
+def get_user_nocodb_token(email: Optional[str]) -> Optional[str]:
+    """
+    Get the user's personal NocoDB API token (served from the user directory cache).
+    Returns None when the user has no token or the lookup fails.
+    This may block on a cache miss - async handlers must run it via run_in_threadpool.
+    """
+    if not email:
+        return None
+    
+    try:
+        return cached_user_nocodb_token(email, get_db)
+    except Exception as e:
+        auth_logger.error("Error fetching user token: %s", e)
+        return None
+
+
+# Response cache scopes: the token an endpoint will call NocoDB with decides
+# what it can see, so it decides which cached responses a caller may share
+def admin_token_scope(kwargs: dict) -> str:
+    return token_scope(os.getenv("NOCODB_API_TOKEN"))
+
+
+def user_token_scope(kwargs: dict) -> str:
+    """The caller's own NocoDB token if they have one, else the admin token"""
+    user = kwargs.get("current_user") or {}
+    return token_scope(get_user_nocodb_token(user.get("email")) or os.getenv("NOCODB_API_TOKEN"))
+
+
+def authenticated_user_token_scope(kwargs: dict) -> str:
+    """As user_token_scope, for endpoints that only use personal tokens of authenticated sessions"""
+    user = kwargs.get("current_user") or {}
+    if not user.get("authenticated"):
+        return admin_token_scope(kwargs)
+    return user_token_scope(kwargs)
+
 # ===== END UTILITY FUNCTIONS =====
 
 
@@ -223,7 +313,7 @@ def process_schema_data(user_token: Optional[str] = None):
     # Use user token if available, otherwise fall back to environment token
     api_token = user_token or os.getenv("NOCODB_API_TOKEN")
     nocodb_api_url = os.getenv("NOCODB_API_URL")
-    nocodb_schema_table_id = "m72851bbm1z0qul"  # Schema table ID
+    nocodb_schema_table_id = NOCODB_SCHEMA_TABLE_ID
     
     # Try to get the table structure to extract dropdown option orders
     category_order_map = {}
@@ -233,7 +323,7 @@ def process_schema_data(user_token: Optional[str] = None):
         table_info_url = f"{nocodb_api_url}/api/v2/tables/{nocodb_schema_table_id}"
         headers = {"xc-token": api_token, "Content-Type": "application/json"}
         
-        table_response = requests.get(table_info_url, headers=headers, verify=False)
+        table_response = nocodb_get_sync(table_info_url, headers=headers)
         if table_response.status_code == 200:
             table_info = table_response.json()
             
@@ -255,15 +345,15 @@ def process_schema_data(user_token: Optional[str] = None):
                         if title:
                             subcategory_order_map[title] = order
             
-            print(f"?? Loaded {len(category_order_map)} category options and {len(subcategory_order_map)} subcategory options from table structure")
+            schema_logger.debug("Loaded %s category options and %s subcategory options from table structure", len(category_order_map), len(subcategory_order_map))
         else:
-            print(f"??  Failed to fetch table structure (status {table_response.status_code}), using fallback ordering")
+            schema_logger.warning("Failed to fetch table structure (status %s), using fallback ordering", table_response.status_code)
     except Exception as e:
-        print(f"??  Exception fetching table structure: {e}, using fallback ordering")
+        schema_logger.warning("Exception fetching table structure: %s, using fallback ordering", e)
     
     # If we couldn't get the dropdown orders, use fallback ordering
     if not category_order_map:
-        print("?? Using fallback category ordering")
+        schema_logger.debug("Using fallback category ordering")
         FALLBACK_CATEGORY_ORDER = [
             "Database", "Project", "Contact", "Summary", "Location", "General",
             "LandPlot", "Power", "Connectivity", "AI"
@@ -276,7 +366,7 @@ def process_schema_data(user_token: Optional[str] = None):
     headers = {"xc-token": api_token, "Content-Type": "application/json"}
     params = {"limit": 1000, "offset": 0}
     
-    schema_response = requests.get(schema_url, headers=headers, params=params, verify=False)
+    schema_response = nocodb_get_sync(schema_url, headers=headers, params=params)
     if schema_response.status_code != 200:
         raise HTTPException(status_code=500, detail="Failed to fetch schema")
     
@@ -314,7 +404,8 @@ def process_schema_data(user_token: Optional[str] = None):
             "Field ID": record.get("Field ID", ""),
             "Table": record.get("Table", ""),
             "meta": record.get("meta", ""),
-            "Options": record.get("Options", ""),
+            "Options": display_select_options(record.get("Options", ""), record.get("Type", "")),
+            "OptionsList": parse_select_options(record.get("Options", ""), record.get("Type", "")),
             "created_at": record.get("created_at"),
             "updated_at": record.get("updated_at")
         }
@@ -341,10 +432,10 @@ async def get_current_user(authorization: Optional[str] = Header(None)):
     Verify user session via Authorization header
     Expected format: "Bearer {base64_encoded_user_info}"
     """
-    print(f"?? AUTH CHECK: {authorization}", flush=True)
+    auth_logger.debug("Auth check: Authorization header %s", 'present' if authorization else 'missing')
     
     if not authorization:
-        print("? NO AUTH HEADER", flush=True)
+        auth_logger.debug("NO AUTH HEADER")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authorization header required",
@@ -428,12 +519,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def get_db():
+
+@app.exception_handler(NocoDBUnavailable)
+async def nocodb_unavailable_handler(request: Request, exc: NocoDBUnavailable):
+    """Fail fast with 503 while the NocoDB circuit breaker is open"""
+    return JSONResponse(
+        content={"error": str(exc)},
+        status_code=503,
+        headers={"Retry-After": str(int(nocodb_breaker.reset_timeout))},
+    )
+
+def get_db(**options):
     # Debug: print environment variables
-    print(f"DB_HOST: {os.getenv('DB_HOST', 'NOT_SET')}")
-    print(f"DB_USER: {os.getenv('DB_USER', 'NOT_SET')}")
-    print(f"DB_NAME: {os.getenv('DB_NAME', 'NOT_SET')}")
-    print(f"DB_PORT: {os.getenv('DB_PORT', 'NOT_SET')}")
+    db_logger.debug("Connecting to MySQL %s:%s/%s", os.getenv('DB_HOST', 'NOT_SET'), os.getenv('DB_PORT', 'NOT_SET'), os.getenv('DB_NAME', 'NOT_SET'))
     
     conn = mysql.connector.connect(
         host=os.getenv("DB_HOST", "10.1.8.51"),  # Use your working IP
@@ -441,72 +539,119 @@ def get_db():
         password=os.getenv("DB_PASSWORD", "s42project"),  # Use your working password
         database=os.getenv("DB_NAME", "nocodb"),
         port=int(os.getenv("DB_PORT", "3306")),
+        **options,
     )
     return conn
 
 
+def check_mysql() -> dict:
+    """Connect, then read the server's connection usage (get_db opens one connection per call)"""
+    started = time.monotonic()
+    conn = get_db(connection_timeout=max(1, int(HEALTH_PROBE_TIMEOUT)))
+    connect_ms = round((time.monotonic() - started) * 1000, 1)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SHOW GLOBAL STATUS WHERE Variable_name IN ('Threads_connected', 'Threads_running')")
+        server_status = {name: int(value) for name, value in cursor.fetchall()}
+        cursor.execute("SELECT @@max_connections")
+        max_connections = int(cursor.fetchone()[0])
+    finally:
+        cursor.close()
+        conn.close()
+    return {
+        "connect_ms": connect_ms,
+        "connections": {
+            "open": server_status.get("Threads_connected"),
+            "running": server_status.get("Threads_running"),
+            "limit": max_connections,
+        },
+    }
+
+
+def check_nocodb() -> dict:
+    """One-row read of the Projects table"""
+    nocodb_api_url = os.getenv("NOCODB_API_URL")
+    if not nocodb_api_url:
+        raise RuntimeError("NOCODB_API_URL environment variable not set")
+    table_id = os.getenv("NOCODB_PROJECTS_TABLE_ID", "mftsk8hkw23m8q1")
+    # Straight through the session: no retries or breaker, so the latency is one round trip
+    response = get_nocodb_session().get(
+        f"{nocodb_api_url}/api/v2/tables/{table_id}/records",
+        headers=nocodb_headers(os.getenv("NOCODB_API_TOKEN")),
+        params={"limit": 1, "fields": "Id"},
+        timeout=HEALTH_PROBE_TIMEOUT,
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    return {"status_code": response.status_code}
+
+
+mysql_probe = Probe("mysql", check_mysql)
+nocodb_probe = Probe("nocodb", check_nocodb)
+
+
 
 
 ######################################################################
 # Scale42 Renewable Energy Projects endpoints
 ######################################################################
+def get_project_facet_counts():
+    """Facet counts from the facet index; one projected NocoDB read until the mirror has loaded"""
+    counts = project_facets.counts()
+    if counts is not None:
+        return counts, "NocoDB mirror"
+    
+    nocodb_api_url = os.getenv("NOCODB_API_URL", "https://nocodb.edbmotte.com")
+    nocodb_api_token = os.getenv("NOCODB_API_TOKEN")
+    nocodb_projects_table_id = os.getenv("NOCODB_PROJECTS_TABLE_ID", "mftsk8hkw23m8q1")
+    if not nocodb_api_token:
+        raise RuntimeError("NocoDB configuration missing")
+    
+    # Only the faceted columns are requested
+    params = NocoQuery(fields=PROJECT_FACETS.values()).to_params(limit=1000)
+    response = nocodb_get_sync(
+        f"{nocodb_api_url}/api/v2/tables/{nocodb_projects_table_id}/records",
+        headers={"xc-token": nocodb_api_token, "Content-Type": "application/json"},
+        params=params,
+        timeout=30,
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"NocoDB API error: {response.status_code} - {response.text}")
+    return build_facets(response.json().get("list", [])), "NocoDB API v2"
+
+
+@app.get("/projects/facets", tags=["Projects"])
+def get_project_facets(current_user: dict = Depends(get_current_user)):
+    """Distinct partner, status, country and agent values with project counts, for filter dropdowns"""
+    try:
+        counts, source = get_project_facet_counts()
+        return JSONResponse(content={
+            "facets": counts,
+            "source": source
+        })
+    except requests.exceptions.RequestException as e:
+        return JSONResponse(
+            content={"error": f"Network error: {str(e)}"}, 
+            status_code=500
+        )
+    except Exception as e:
+        return JSONResponse(
+            content={"error": f"Unexpected error: {str(e)}"}, 
+            status_code=500
+        )
+
+
 @app.get("/projects/project-partners", tags=["Projects"])
 def get_unique_project_partners(current_user: dict = Depends(get_current_user)):
-    """Get unique Primary Project Partner values from NocoDB API v2"""
+    """Get unique Primary Project Partner values from the project facet index"""
     try:
-        # Get NocoDB configuration from environment
-        nocodb_api_url = os.getenv("NOCODB_API_URL", "https://nocodb.edbmotte.com")
-        nocodb_api_token = os.getenv("NOCODB_API_TOKEN")
-        nocodb_base_id = os.getenv("NOCODB_BASE_ID")
-        nocodb_projects_table_id = os.getenv("NOCODB_PROJECTS_TABLE_ID", "mftsk8hkw23m8q1")
-        
-        if not nocodb_api_token or not nocodb_base_id:
-            return JSONResponse(
-                content={"error": "NocoDB configuration missing"}, 
-                status_code=500
-            )
-        
-        # Construct NocoDB API v2 URL
-        api_url = f"{nocodb_api_url}/api/v2/tables/{nocodb_projects_table_id}/records"
-        
-        # Set up headers for NocoDB API
-        headers = {
-            "xc-token": nocodb_api_token,
-            "Content-Type": "application/json"
-        }
-        
-        # Make request to NocoDB API with SSL verification disabled for now
-        # Add limit parameter to get all records
-        params = {"limit": 1000}  # Set high limit to get all projects
-        response = requests.get(api_url, headers=headers, params=params, verify=False)
-        
-        if response.status_code != 200:
-            return JSONResponse(
-                content={
-                    "error": f"NocoDB API error: {response.status_code} - {response.text}",
-                    "url": api_url
-                }, 
-                status_code=500
-            )
-        
-        # Parse the data and extract unique Primary Project Partners
-        data = response.json()
-        projects = data.get("list", [])
-        
-        # Extract Primary Project Partner values and get unique ones
-        partners = set()
-        for project in projects:
-            partner = project.get("Primary Project Partner")
-            if partner and partner.strip():  # Only add non-empty values
-                partners.add(partner.strip())
-        
-        # Convert to sorted list
-        unique_partners = sorted(list(partners))
+        counts, source = get_project_facet_counts()
+        unique_partners = list(counts["partner"])
         
         return JSONResponse(content={
             "unique_project_partners": unique_partners,
             "count": len(unique_partners),
-            "source": "NocoDB API v2"
+            "source": source
         })
         
     except requests.exceptions.RequestException as e:
@@ -522,8 +667,17 @@ def get_unique_project_partners(current_user: dict = Depends(get_current_user)):
 
 
 @app.get("/projects/projects", tags=["Projects"])
-def get_projects(current_user: dict = Depends(get_current_user), partner_filter: Optional[str] = Query(None, description="Filter by Primary Project Partner")):
-    """Get all renewable energy projects from NocoDB API v2 with optional filtering"""
+@cached_response("projects", ttl=15, scope=admin_token_scope, table=os.getenv("NOCODB_PROJECTS_TABLE_ID"))
+def get_projects(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    partner_filter: Optional[str] = Query(None, description="Filter by Primary Project Partner"),
+    status: Optional[str] = Query(None, description="Filter by Status"),
+    country: Optional[str] = Query(None, description="Filter by Country"),
+    sort: Optional[str] = Query("-Project Priority", description="Comma-separated field titles, '-' prefix for descending"),
+    fields: Optional[str] = Query(None, description="Comma-separated field titles to return; defaults to the projects page fields"),
+):
+    """Get renewable energy projects with filters, sort and field selection pushed down to NocoDB"""
     try:
         # Get NocoDB configuration from environment variables
         nocodb_api_url = os.getenv("NOCODB_API_URL")
@@ -562,40 +716,67 @@ def get_projects(current_user: dict = Depends(get_current_user), partner_filter:
             "Content-Type": "application/json"
         }
         
-        # Make request to NocoDB API with SSL verification disabled for now
-        # Add limit parameter to get all records
-        params = {"limit": 1000}  # Set high limit to get all projects
-        response = requests.get(api_url, headers=headers, params=params, verify=False)
-        
-        if response.status_code != 200:
-            return JSONResponse(
-                content={
-                    "error": f"NocoDB API error: {response.status_code} - {response.text}",
-                    "url": api_url,
-                    "config": {
-                        "nocodb_api_url": nocodb_api_url,
-                        "nocodb_projects_table_id": nocodb_projects_table_id,
-                        "has_token": bool(nocodb_api_token),
-                        "has_base_id": bool(nocodb_base_id)
-                    }
-                }, 
-                status_code=500
-            )
+        # Fields the projects page renders; Id is always returned
+        required_fields = parse_fields(fields) or [
+            "Id",
+            "Project Name", 
+            "Country",
+            "P_PlotID",
+            "Power Availability (Min)",
+            "Power Availability (Max)",
+            "Primary Project Partner",
+            "Project Priority",  # Updated field name
+            "Status",  # Updated field name
+            "Agent"   # Updated field name
+        ]
+        if "Id" not in required_fields:
+            required_fields.insert(0, "Id")
+        query = NocoQuery(
+            filters={"Primary Project Partner": partner_filter, "Status": status, "Country": country},
+            sort=parse_sort(sort),
+            fields=required_fields,
+        )
         
-        # Parse and return the data
-        data = response.json()
-        projects = data.get("list", [])
+        # Serve from the local mirror; only hit NocoDB until it has loaded
+        candidates = projects_mirror.find(**{
+            index: value for index, value in
+            (("partner", partner_filter), ("status", status), ("country", country))
+            if value and value.strip()
+        })
+        source = "NocoDB mirror"
+        total_available = None
+        if candidates is None:
+            # Only the matching rows and the selected columns come back from NocoDB
+            params = query.to_params(limit=1000)
+            response = nocodb_get_sync(api_url, headers=headers, params=params)
         
-        print(f"?? Projects API: Retrieved {len(projects)} projects from NocoDB")
+            if response.status_code != 200:
+                return JSONResponse(
+                    content={
+                        "error": f"NocoDB API error: {response.status_code} - {response.text}",
+                        "url": api_url,
+                        "config": {
+                            "nocodb_api_url": nocodb_api_url,
+                            "nocodb_projects_table_id": nocodb_projects_table_id,
+                            "has_token": bool(nocodb_api_token),
+                            "has_base_id": bool(nocodb_base_id)
+                        }
+                    }, 
+                    status_code=500
+                )
         
-        # Apply partner filter if provided
-        if partner_filter and partner_filter.strip():
-            projects = [p for p in projects if p.get("Primary Project Partner") == partner_filter]
-            print(f"?? Projects API: After partner filter '{partner_filter}': {len(projects)} projects")
+            # Parse and return the data
+            data = response.json()
+            candidates = data.get("list", [])
+            total_available = data.get("pageInfo", {}).get("totalRows", len(candidates))
+            source = "NocoDB API v2"
         
-        # Sort projects by Project Priority - higher priority first
-        projects.sort(key=lambda x: x.get("Project Priority", 0), reverse=True)
-        print(f"?? Projects API: Sorted {len(projects)} projects by priority (Project Priority)")
+        # Same filter/sort/projection semantics whichever source served the rows
+        projects = query.apply(candidates)
+        if total_available is None:
+            # Rows matching the filters, as NocoDB's pageInfo.totalRows reports them
+            total_available = len(projects)
+        nocodb_logger.debug("Projects API: Retrieved %s projects from %s", len(projects), source)
         
         # Helper function to parse plot information
         def parse_plot_info(plot_id_string):
@@ -636,48 +817,28 @@ def get_projects(current_user: dict = Depends(get_current_user), partner_filter:
                 "formatted": f"{site_id} {plot_name}" if site_id else plot_name
             }
         
-        # Filter projects to only include required fields and format plots
-        required_fields = [
-            "Id",
-            "Project Name", 
-            "Country",
-            "P_PlotID",
-            "Power Availability (Min)",
-            "Power Availability (Max)",
-            "Primary Project Partner",
-            "Project Priority",  # Updated field name
-            "Status",  # Updated field name
-            "Agent"   # Updated field name
-        ]
-        
-        filtered_projects = []
-        for project in projects:
-            filtered_project = {}
-            for field in required_fields:
-                if field == "P_PlotID":
-                    # Format plot information
-                    plot_ids = project.get(field, [])
-                    if isinstance(plot_ids, list):
-                        formatted_plots = []
-                        for plot_id in plot_ids:
-                            plot_info = parse_plot_info(plot_id)
-                            if plot_info:
-                                formatted_plots.append(plot_info)
-                        filtered_project[field] = formatted_plots
-                    else:
-                        filtered_project[field] = []
-                else:
-                    filtered_project[field] = project.get(field)
-            filtered_projects.append(filtered_project)
-        
-        return JSONResponse(content={
-            "projects": filtered_projects,
-            "count": len(filtered_projects),
-            "total_available": len(data.get("list", [])),
+        # Format plot information; rows are already projected to required_fields
+        if "P_PlotID" in required_fields:
+            for project in projects:
+                plot_ids = project.get("P_PlotID")
+                formatted_plots = []
+                if isinstance(plot_ids, list):
+                    for plot_id in plot_ids:
+                        plot_info = parse_plot_info(plot_id)
+                        if plot_info:
+                            formatted_plots.append(plot_info)
+                project["P_PlotID"] = formatted_plots
+        
+        return etag_response(request, {
+            "projects": projects,
+            "count": len(projects),
+            "total_available": total_available,
             "applied_filter": partner_filter if partner_filter else None,
-            "source": "NocoDB API v2",
+            "applied_filters": query.filters,
+            "sort": query.sort,
+            "source": source,
             "fields": required_fields
-        })
+        }, cache_control=NO_CACHE)
         
     except requests.exceptions.RequestException as e:
         return JSONResponse(
@@ -697,7 +858,7 @@ from fastapi.responses import JSONResponse
 @app.options("/projects/schema")
 async def options_projects_schema():
     """Handle OPTIONS requests for /projects/schema CORS preflight"""
-    print("? Specific OPTIONS handler for /projects/schema")
+    http_logger.debug("Specific OPTIONS handler for /projects/schema")
     return JSONResponse(
         content={"message": "OK"},
         headers={
@@ -712,7 +873,7 @@ async def options_projects_schema():
 @app.options("/{full_path:path}")
 async def options_handler(full_path: str):
     """Handle all other OPTIONS requests for CORS preflight"""
-    print(f"? Universal OPTIONS handler for path: /{full_path}")
+    http_logger.debug("Universal OPTIONS handler for path: /%s", full_path)
     return JSONResponse(
         content={"message": "OK"},
         headers={
@@ -724,14 +885,15 @@ async def options_handler(full_path: str):
     )
 
 @app.get("/projects/schema", tags=["Projects"])
-def get_schema_data(current_user: dict = Depends(get_current_user)):
+@cached_response("schema", ttl=60, scope=user_token_scope, table=NOCODB_SCHEMA_TABLE_ID)
+def get_schema_data(request: Request, current_user: dict = Depends(get_current_user)):
     """Get schema data from NocoDB schema table"""
-    print("SCHEMA ENDPOINT CALLED - Starting to process schema data with dynamic ordering")
+    schema_logger.debug("SCHEMA ENDPOINT CALLED - Starting to process schema data with dynamic ordering")
     try:
         # Get user-specific NocoDB token, fallback to environment token
         user_token = None
         user_email = current_user.get('email')
-        print(f"?? Getting API token for user: {user_email}")
+        schema_logger.debug("Getting API token for user: %s", user_email)
         
         if user_email:
             try:
@@ -746,18 +908,15 @@ def get_schema_data(current_user: dict = Depends(get_current_user)):
                 cursor = conn.cursor(dictionary=True)
                 cursor.execute("SELECT nocodb_api FROM users WHERE email = %s", (user_email,))
                 user_data = cursor.fetchone()
-                print(f"?? Database query result for {user_email}: {user_data}")
                 if user_data and user_data['nocodb_api']:
                     user_token = user_data['nocodb_api']
-                    print(f"? Using user-specific NocoDB token for {user_email}: {str(user_token)[:20]}...")
+                    schema_logger.debug("Using user-specific NocoDB token for %s", user_email)
                 else:
-                    print(f"?? No user-specific token found for {user_email}, using admin token")
-                    print(f"   User data: {user_data}")
-                    print(f"   nocodb_api field: {user_data.get('nocodb_api') if user_data else 'No user found'}")
+                    schema_logger.debug("No user-specific token found for %s, using admin token", user_email)
                 cursor.close()
                 conn.close()
             except Exception as e:
-                print(f"Error fetching user token: {e}")
+                schema_logger.error("Error fetching user token: %s", e)
         
         # Use user token if available, otherwise fall back to environment token
         api_token = user_token or os.getenv("NOCODB_API_TOKEN")
@@ -765,7 +924,7 @@ def get_schema_data(current_user: dict = Depends(get_current_user)):
         # Get NocoDB configuration from environment variables
         nocodb_api_url = os.getenv("NOCODB_API_URL")
         nocodb_base_id = os.getenv("NOCODB_BASE_ID")
-        nocodb_schema_table_id = "m72851bbm1z0qul"  # Schema table ID
+        nocodb_schema_table_id = NOCODB_SCHEMA_TABLE_ID
         
         # Validate required environment variables
         if not nocodb_api_url:
@@ -800,7 +959,7 @@ def get_schema_data(current_user: dict = Depends(get_current_user)):
         }
         
         # Make request to NocoDB API with SSL verification disabled for now
-        response = requests.get(api_url, headers=headers, params=params, verify=False)
+        response = nocodb_get_sync(api_url, headers=headers, params=params)
         
         if response.status_code != 200:
             return JSONResponse(
@@ -822,63 +981,15 @@ def get_schema_data(current_user: dict = Depends(get_current_user)):
         data = response.json()
         schema_records = data.get("list", [])
         
-        print(f"?? Raw NocoDB data structure:")
-        print(f"   - Total records: {len(schema_records)}")
+        schema_logger.debug("Raw NocoDB data structure")
+        schema_logger.debug("Total records: %s", len(schema_records))
         if schema_records:
-            print(f"   - First record keys: {list(schema_records[0].keys())}")
-            print(f"   - First record sample: {schema_records[0]}")
+            schema_logger.debug("First record keys: %s", list(schema_records[0].keys()))
         
         # Process the data for frontend consumption
         # The data from NocoDB v2 already has properly formatted Category/Subcategory values
         # We need to transform it for the frontend table display
         
-        def parse_select_options(options_string):
-            """Parse NocoDB SingleSelect options string into frontend-friendly format"""
-            if not options_string or options_string in ["", "Long Text field", "DateTime field", "Decimal field", "URL field"]:
-                return []
-            
-            options = []
-            # Split by " | " to get individual options
-            option_parts = options_string.split(" | ")
-            for option_part in option_parts:
-                try:
-                    # Format: "OptionName (Color: #color, Order: N, ID: ...)"
-                    if "(" in option_part and "Order:" in option_part:
-                        name = option_part.split(" (")[0].strip()
-                        # Extract order number
-                        order_part = option_part.split("Order: ")[1].split(",")[0].strip()
-                        order = int(order_part)
-                        
-                        # Extract color if available
-                        color = "#cfdffe"  # default color
-                        if "Color: " in option_part:
-                            color_part = option_part.split("Color: ")[1].split(",")[0].strip()
-                            color = color_part
-                        
-                        options.append({
-                            "value": name,
-                            "label": name,
-                            "order": order,
-                            "color": color
-                        })
-                    else:
-                        # Fallback for simple options
-                        name = option_part.strip()
-                        if name:
-                            options.append({
-                                "value": name,
-                                "label": name,
-                                "order": 999,
-                                "color": "#cfdffe"
-                            })
-                except (IndexError, ValueError):
-                    # Skip malformed options
-                    continue
-            
-            # Sort by order
-            options.sort(key=lambda x: x["order"])
-            return options
-        
         # First pass: collect dropdown options for Category and Subcategory fields
         category_options = []
         subcategory_options = []
@@ -888,24 +999,13 @@ def get_schema_data(current_user: dict = Depends(get_current_user)):
             field_type = record.get("Type", "")
             options_raw = record.get("Options", "")
             
+            # Structured options are parsed once per distinct stored value (memoised)
             if field_name == "Category" and field_type == "SingleSelect":
-                category_options = parse_select_options(options_raw)
-                print(f"??? Found Category options: {category_options}")
+                category_options = parse_select_options(options_raw, field_type)
+                schema_logger.debug("Found Category options: %s", len(category_options))
             elif field_name == "Subcategory" and field_type == "SingleSelect":
-                subcategory_options = parse_select_options(options_raw)
-                print(f"??? Found Subcategory options: {subcategory_options}")
-        
-        # Helper function to get order from options
-        def get_option_order(value, options_list):
-            """Get the order number for a given value from the options list"""
-            if not value or not options_list:
-                return 999
-            for option in options_list:
-                option_value = option.get("value", "")
-                if option_value.lower() == value.lower():
-                    order = option.get("order", 999)
-                    return order
-            return 999
+                subcategory_options = parse_select_options(options_raw, field_type)
+                schema_logger.debug("Found Subcategory options: %s", len(subcategory_options))
         
         # Second pass: process records with proper category and subcategory ordering
         processed_records = []
@@ -915,10 +1015,10 @@ def get_schema_data(current_user: dict = Depends(get_current_user)):
             subcategory_value = record.get("Subcategory", "")
             
             # Look up the order from the options
-            category_order = get_option_order(category_value, category_options)
-            subcategory_order = get_option_order(subcategory_value, subcategory_options)
+            category_order = select_option_order(category_value, category_options)
+            subcategory_order = select_option_order(subcategory_value, subcategory_options)
             
-            print(f"?? Processing field '{record.get('Field Name')}': Category='{category_value}' (order: {category_order}), Subcategory='{subcategory_value}' (order: {subcategory_order})")
+            schema_logger.debug("Processing field '%s': Category='%s' (order: %s), Subcategory='%s' (order: %s)", record.get('Field Name'), category_value, category_order, subcategory_value, subcategory_order)
             
             # Map the NocoDB fields to frontend expected format - with dynamic category_order and subcategory_order
             processed_record = {
@@ -934,7 +1034,8 @@ def get_schema_data(current_user: dict = Depends(get_current_user)):
                 "Field ID": record.get("Field ID", ""),
                 "Table": record.get("Table", ""),
                 "meta": record.get("meta", ""),
-                "Options": record.get("Options", ""),
+                "Options": display_select_options(record.get("Options", ""), record.get("Type", "")),
+                "OptionsList": parse_select_options(record.get("Options", ""), record.get("Type", "")),
                 "created_at": record.get("created_at"),
                 "updated_at": record.get("updated_at")
             }
@@ -960,18 +1061,19 @@ def get_schema_data(current_user: dict = Depends(get_current_user)):
         # Sort the processed records
         sorted_records = sorted(processed_records, key=get_sort_key)
         
-        print(f"? Processed {len(sorted_records)} schema records for frontend")
-        print(f"?? Found {len(category_options)} category options and {len(subcategory_options)} subcategory options")
+        schema_logger.debug("Processed %s schema records for frontend", len(sorted_records))
+        schema_logger.debug("Found %s category options and %s subcategory options", len(category_options), len(subcategory_options))
         
-        return JSONResponse(
-            content={
+        return etag_response(
+            request,
+            {
                 "list": sorted_records,
                 "count": len(sorted_records),
                 "pageInfo": data.get("pageInfo", {}),
                 "totalRecords": len(sorted_records),
                 "fieldOptions": {
-                    "Category": category_options,
-                    "Subcategory": subcategory_options
+                    "Category": select_option_choices(category_options),
+                    "Subcategory": select_option_choices(subcategory_options)
                 },
                 "debug": {
                     "table_id": nocodb_schema_table_id,
@@ -980,10 +1082,12 @@ def get_schema_data(current_user: dict = Depends(get_current_user)):
                     "sorting_applied": True,
                     "sort_order": "category_order -> subcategory_order -> Field Order (Numeric, lower numbers first)",
                     "processing": "NocoDB v2 format with direct field mapping and parsed dropdown options",
-                    "categories_found": list(set(r.get("Category", "") for r in processed_records)),
-                    "subcategories_found": list(set(r.get("Subcategory", "") for r in processed_records))
+                    # Sorted so identical data always serialises (and hashes) identically
+                    "categories_found": sorted(set(r.get("Category", "") for r in processed_records), key=str),
+                    "subcategories_found": sorted(set(r.get("Subcategory", "") for r in processed_records), key=str)
                 }
             },
+            cache_control=SCHEMA_CACHE_CONTROL,
             headers={
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
@@ -1078,6 +1182,9 @@ def get_plots_data(
         nocodb_api_url = os.getenv("NOCODB_API_URL")
         api_token = user_token or os.getenv("NOCODB_API_TOKEN")
         headers = {"xc-token": api_token, "Content-Type": "application/json"}
+        # The mirror is loaded with the admin token, so it may hold fields a
+        # personal token cannot see; only admin-token callers read from it
+        use_mirror = api_token == os.getenv("NOCODB_API_TOKEN")
 
         # Known table IDs (used elsewhere for updates)
         PROJECTS_TABLE_ID = "mftsk8hkw23m8q1"
@@ -1129,17 +1236,19 @@ def get_plots_data(
             return dict(vals)
 
         # 2a) Load selected land plot rows directly from NocoDB
-        debug_print(f"?? Backend: Fetching {len(selected_plot_ids)} plots: {selected_plot_ids}")
+        nocodb_logger.debug("Fetching %s plots: %s", len(selected_plot_ids), selected_plot_ids)
         for pid in selected_plot_ids:
             try:
-                url = f"{nocodb_api_url}/api/v2/tables/{LANDPLOTS_TABLE_ID}/records/{pid}"
-                r = requests.get(url, headers=headers, verify=False)
-                if r.status_code != 200:
-                    debug_print(f"? Backend: Failed to fetch plot {pid}: status {r.status_code}")
-                    # Skip missing plots instead of failing entire request
-                    continue
-                row = r.json() or {}
-                debug_print(f"?? Backend: Plot {pid} row keys: {list(row.keys())[:10]}")  # First 10 keys
+                row = plots_mirror.get(pid) if use_mirror else None
+                if row is None:
+                    url = f"{nocodb_api_url}/api/v2/tables/{LANDPLOTS_TABLE_ID}/records/{pid}"
+                    r = nocodb_get_sync(url, headers=headers)
+                    if r.status_code != 200:
+                        nocodb_logger.warning("Failed to fetch plot %s: status %s", pid, r.status_code)
+                        # Skip missing plots instead of failing entire request
+                        continue
+                    row = r.json() or {}
+                nocodb_logger.debug("Plot %s row keys: %s", pid, list(row.keys())[:10])
 
                 # Determine FK to project from common patterns and relation payloads
                 fk_project_id = None
@@ -1153,7 +1262,7 @@ def get_plots_data(
                 ]:
                     if key in row:
                         val = row.get(key)
-                        debug_print(f"?? Backend: Plot {pid} found key '{key}' with value type: {type(val).__name__}, value: {val if not isinstance(val, dict) else 'dict'}")
+                        nocodb_logger.debug("Plot %s found key '%s' with value type: %s, value: %s", pid, key, type(val).__name__, val if not isinstance(val, dict) else 'dict')
                         # If relation is an array/dict, extract id
                         if isinstance(val, dict) and "id" in val:
                             val = val.get("id")
@@ -1162,7 +1271,7 @@ def get_plots_data(
                         # Normalize to int if numeric
                         if isinstance(val, (int, str)) and str(val).isdigit():
                             fk_project_id = int(val)
-                            debug_print(f"? Backend: Plot {pid} FK resolved to project {fk_project_id} from key '{key}'")
+                            nocodb_logger.debug("Plot %s FK resolved to project %s from key '%s'", pid, fk_project_id, key)
                             break
 
                 # Fallback A: try via schema-mapped values using the field ID
@@ -1198,7 +1307,7 @@ def get_plots_data(
                             f"{nocodb_api_url}/api/v2/tables/{LANDPLOTS_TABLE_ID}/records"
                             f"?where=(id,eq,{pid})&fields=id,chap8h7mt25wqlp&limit=1"
                         )
-                        r2 = requests.get(url2, headers=headers, verify=False)
+                        r2 = nocodb_get_sync(url2, headers=headers)
                         if r2.status_code == 200:
                             data2 = r2.json() or {}
                             lst = data2.get("list") if isinstance(data2, dict) else None
@@ -1231,20 +1340,22 @@ def get_plots_data(
                     plots_by_pid.setdefault(pid, []).append(p)
             
             # Debug logging
-            debug_print(f"?? Backend: plots_by_pid keys: {list(plots_by_pid.keys())}")
-            debug_print(f"?? Backend: projects_fk_set: {sorted(list(projects_fk_set))}")
+            nocodb_logger.debug("plots_by_pid keys: %s", list(plots_by_pid.keys()))
+            nocodb_logger.debug("projects_fk_set: %s", sorted(list(projects_fk_set)))
             for pid, plist in plots_by_pid.items():
-                debug_print(f"?? Backend: Project {pid} has {len(plist)} plots")
+                nocodb_logger.debug("Project %s has %s plots", pid, len(plist))
 
             for proj_id in sorted(projects_fk_set):
                 try:
-                    url = f"{nocodb_api_url}/api/v2/tables/{PROJECTS_TABLE_ID}/records/{proj_id}"
-                    r = requests.get(url, headers=headers, verify=False)
-                    if r.status_code != 200:
-                        continue
-                    prow = r.json() or {}
+                    prow = projects_mirror.get(proj_id) if use_mirror else None
+                    if prow is None:
+                        url = f"{nocodb_api_url}/api/v2/tables/{PROJECTS_TABLE_ID}/records/{proj_id}"
+                        r = nocodb_get_sync(url, headers=headers)
+                        if r.status_code != 200:
+                            continue
+                        prow = r.json() or {}
                     project_plots = plots_by_pid.get(proj_id, [])
-                    debug_print(f"?? Backend: Project {proj_id} getting {len(project_plots)} plots")
+                    nocodb_logger.debug("Project %s getting %s plots", proj_id, len(project_plots))
                     project_obj = {
                         "_db_id": prow.get("id", proj_id),
                         "values": map_values_by_field_id(prow, schema_by_table["Projects"]),
@@ -1252,7 +1363,7 @@ def get_plots_data(
                     }
                     projects.append(project_obj)
                 except Exception as e:
-                    print(f"? Backend: Error loading project {proj_id}: {str(e)}")
+                    nocodb_logger.error("Error loading project %s: %s", proj_id, str(e))
                     continue
         
         # -------------------------
@@ -1295,11 +1406,13 @@ def get_plots_data(
             projects = []
             for proj_id in sorted(projects_fk_set):
                 try:
-                    url = f"{nocodb_api_url}/api/v2/tables/{PROJECTS_TABLE_ID}/records/{proj_id}"
-                    r = requests.get(url, headers=headers, verify=False)
-                    if r.status_code != 200:
-                        continue
-                    prow = r.json() or {}
+                    prow = projects_mirror.get(proj_id) if use_mirror else None
+                    if prow is None:
+                        url = f"{nocodb_api_url}/api/v2/tables/{PROJECTS_TABLE_ID}/records/{proj_id}"
+                        r = nocodb_get_sync(url, headers=headers)
+                        if r.status_code != 200:
+                            continue
+                        prow = r.json() or {}
                     project_obj = {
                         "_db_id": prow.get("id", proj_id),
                         "values": map_values_by_field_id(prow, schema_by_table["Projects"]),
@@ -1360,7 +1473,7 @@ def get_plots_data(
 
 # Map API endpoints added at the end
 @app.get('/projects/map-data', tags=["Projects"])
-def get_map_data_endpoint(current_user: dict = Depends(get_current_user)):
+def get_map_data_endpoint(request: Request, current_user: dict = Depends(get_current_user)):
     """Get map visualization data with site locations and coordinates from NocoDB"""
     try:
         # Get NocoDB configuration from environment
@@ -1384,39 +1497,44 @@ def get_map_data_endpoint(current_user: dict = Depends(get_current_user)):
             "Content-Type": "application/json"
         }
         
-        # Get all records with pagination
-        all_plots = []
-        offset = 0
-        limit = 1000  # Large limit to get all records
-        
-        while True:
-            params = {
-                "limit": limit,
-                "offset": offset
-            }
+        # Serve from the local mirror; only hit NocoDB until it has loaded
+        all_plots = plots_mirror.all_rows()
+        source = "NocoDB mirror"
+        if all_plots is None:
+            # Get all records with pagination
+            all_plots = []
+            offset = 0
+            limit = 1000  # Large limit to get all records
+        
+            while True:
+                params = {
+                    "limit": limit,
+                    "offset": offset
+                }
             
-            # Make request to NocoDB API with SSL verification disabled for now
-            response = requests.get(api_url, headers=headers, params=params, verify=False)
+                # Make request to NocoDB API with SSL verification disabled for now
+                response = nocodb_get_sync(api_url, headers=headers, params=params)
             
-            if response.status_code != 200:
-                return JSONResponse(
-                    content={
-                        "error": f"NocoDB API error: {response.status_code} - {response.text}",
-                        "url": api_url
-                    }, 
-                    status_code=500
-                )
+                if response.status_code != 200:
+                    return JSONResponse(
+                        content={
+                            "error": f"NocoDB API error: {response.status_code} - {response.text}",
+                            "url": api_url
+                        }, 
+                        status_code=500
+                    )
             
-            # Parse the data
-            data = response.json()
-            batch_plots = data.get("list", [])
-            all_plots.extend(batch_plots)
+                # Parse the data
+                data = response.json()
+                batch_plots = data.get("list", [])
+                all_plots.extend(batch_plots)
             
-            # Check if we got fewer records than the limit (last page)
-            if len(batch_plots) < limit:
-                break
+                # Check if we got fewer records than the limit (last page)
+                if len(batch_plots) < limit:
+                    break
                 
-            offset += limit
+                offset += limit
+            source = "NocoDB API v2 direct fetch"
         
         # Parse the data
         plots = all_plots
@@ -1459,13 +1577,13 @@ def get_map_data_endpoint(current_user: dict = Depends(get_current_user)):
                 }
                 sites_data.append(site_data)
         
-        return JSONResponse(content={
+        return etag_response(request, {
             "sites": sites_data,
             "count": len(sites_data),
             "total_plots": len(plots),
             "plots_with_coords": len(sites_data),
-            "source": "NocoDB API v2 direct fetch"
-        })
+            "source": source
+        }, cache_control=MAP_CACHE_CONTROL)
         
     except Exception as e:
         return JSONResponse(
@@ -1503,8 +1621,12 @@ def get_hoyanger_power_data(current_user: dict = Depends(get_current_user)):
 def nocodb_sync_endpoint(current_user: dict = Depends(get_current_user)):
     """Sync data with NocoDB using the full sync implementation"""
     try:
+        # Imported here: the sync module is only needed by this endpoint
+        from . import nocodb_sync
+        
         # Call the actual sync function from nocodb_sync module
         result = nocodb_sync.run_nocodb_sync()
+        invalidate_responses(table=NOCODB_SCHEMA_TABLE_ID)
         
         # Return the result from the sync operation
         return JSONResponse(content={
@@ -1533,14 +1655,80 @@ def nocodb_sync_endpoint(current_user: dict = Depends(get_current_user)):
         )
 
 
+def _warmed(result):
+    # Endpoint functions report failures as error responses rather than raising
+    status_code = getattr(result, "status_code", 200)
+    if status_code != 200:
+        raise RuntimeError(f"HTTP {status_code}: {bytes(getattr(result, 'body', b'')).decode('utf-8', 'replace')[:200]}")
+
+
+async def warm_projects():
+    await projects_mirror.wait_until_loaded()
+    # Same arguments as an unfiltered GET /projects/projects, so it is the same cache entry
+    _warmed(await run_in_threadpool(
+        get_projects,
+        request=internal_request("/projects/projects"),
+        current_user={},
+        partner_filter=None,
+        status=None,
+        country=None,
+        sort="-Project Priority",
+        fields=None,
+    ))
+
+
+async def warm_schema():
+    # Cached under the admin token, shared by every user without a personal NocoDB token
+    _warmed(await run_in_threadpool(get_schema_data, request=internal_request("/projects/schema"), current_user={}))
+
+
+async def warm_map_data():
+    # Map endpoints are built from the Land Plots and Projects mirrors
+    await asyncio.gather(plots_mirror.wait_until_loaded(), projects_mirror.wait_until_loaded())
+
+
+async def warm_page_permissions():
+    await run_in_threadpool(warm_page_access, get_db)
+
+
+async def warm_users():
+    await run_in_threadpool(warm_user_directory, get_db)
+
+
+warmup.add("schema", warm_schema)
+warmup.add("projects", warm_projects)
+warmup.add("map_data", warm_map_data)
+warmup.add("page_permissions", warm_page_permissions)
+warmup.add("user_directory", warm_users)
+
+
 @app.on_event("startup")
 async def startup_event():
-    print("FastAPI STARTUP - execute_nocodb_query function loaded", flush=True)
+    db_logger.debug("FastAPI startup")
+    audit_pipeline.start()
+    start_mirror_refresher()
+    rate_service.start()
+    try:
+        applied = await run_in_threadpool(run_migrations, get_db)
+        db_logger.info("Schema migrations applied: %s", applied or 'none pending')
+    except Exception as e:
+        db_logger.error("Schema migration failed: %s", e)
+    # In the background: the app serves (and /ready says 503) while caches fill
+    warmup.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await warmup.stop()
+    await audit_pipeline.stop()
+    await stop_mirror_refresher()
+    await rate_service.stop()
+    await close_nocodb_client()
+    stop_logging()
 
 class NocoDBQuery(BaseModel):
     query: str
 
-print("DEFINING NOCODB QUERY FUNCTION", flush=True)
 
 # TEST ROUTE TO VERIFY MY MODIFICATIONS ARE WORKING
 @app.post("/test-debug-route", tags=["DEBUG"])
@@ -1562,15 +1750,14 @@ async def execute_nocodb_query(query_request: NocoDBQuery, current_user: dict =
         "query_repr": repr(query_request.query) if query_request.query else "None"
     })
     
-    print(f"?? NOCODB QUERY ENDPOINT CALLED", flush=True)
-    print(f"?? Received query request: '{query_request.query}'", flush=True)
-    print(f"?? Current user: {current_user}", flush=True)
+    nocodb_logger.debug("NOCODB QUERY ENDPOINT CALLED")
+    nocodb_logger.debug("Received query request: '%s'", query_request.query)
     
     # Debug the query detection  
     if "v_HoyangerEnergyReport" in query_request.query:
-        print(f"? DETECTED VIEW QUERY - EXECUTING SQL DIRECTLY", flush=True)
+        nocodb_logger.debug("DETECTED VIEW QUERY - EXECUTING SQL DIRECTLY")
     else:
-        print(f"?? REGULAR QUERY - USING NOCODB API", flush=True)
+        nocodb_logger.debug("REGULAR QUERY - USING NOCODB API")
     
     try:
         
@@ -1579,23 +1766,7 @@ async def execute_nocodb_query(query_request: NocoDBQuery, current_user: dict =
         user_email = current_user.get('email')
 
         if user_email:
-            try:
-                conn = mysql.connector.connect(
-                    host=os.getenv("DB_HOST", "10.1.8.51"),
-                    user=os.getenv("DB_USER", "s42project"),
-                    password=os.getenv("DB_PASSWORD", "s42project"),
-                    database=os.getenv("DB_NAME", "nocodb"),
-                    port=int(os.getenv("DB_PORT", "3306")),
-                )
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("SELECT nocodb_api FROM users WHERE email = %s", (user_email,))
-                user_data = cursor.fetchone()
-                if user_data and isinstance(user_data, dict) and user_data.get('nocodb_api'):
-                    user_token = user_data['nocodb_api']
-                cursor.close()
-                conn.close()
-            except Exception as e:
-                print(f"Error fetching user token: {e}")
+            user_token = await run_in_threadpool(get_user_nocodb_token, user_email)
 
         # Use user token if available, otherwise fall back to environment token
         api_token = user_token or os.getenv("NOCODB_API_TOKEN")
@@ -1608,7 +1779,7 @@ async def execute_nocodb_query(query_request: NocoDBQuery, current_user: dict =
 
         # Check if this is a direct SQL query (contains v_HoyangerEnergyReport view)
         if "v_HoyangerEnergyReport" in query_request.query:
-            print(f"?? Executing SQL query: {query_request.query}")
+            nocodb_logger.debug("Executing SQL query: %s", query_request.query)
             # Execute direct SQL query against the database
             try:
                 conn = mysql.connector.connect(
@@ -1624,9 +1795,9 @@ async def execute_nocodb_query(query_request: NocoDBQuery, current_user: dict =
                 cursor.execute(query_request.query)
                 rows = cursor.fetchall()
                 
-                print(f"? SQL query executed successfully, got {len(rows)} rows")
+                nocodb_logger.debug("SQL query executed successfully, got %s rows", len(rows))
                 if rows:
-                    print(f"?? First row keys: {list(rows[0].keys())}")
+                    nocodb_logger.debug("First row keys: %s", list(rows[0].keys()))
                 
                 # Convert decimal and datetime objects to JSON serializable format
                 result_rows = []
@@ -1644,7 +1815,7 @@ async def execute_nocodb_query(query_request: NocoDBQuery, current_user: dict =
                 cursor.close()
                 conn.close()
                 
-                print(f"?? Returning {len(result_rows)} converted rows")
+                nocodb_logger.debug("Returning %s converted rows", len(result_rows))
                 return JSONResponse(content={
                     "success": True,
                     "rows": result_rows,
@@ -1653,7 +1824,7 @@ async def execute_nocodb_query(query_request: NocoDBQuery, current_user: dict =
                 })
                 
             except Exception as e:
-                print(f"? SQL query error: {str(e)}")
+                nocodb_logger.error("SQL query error: %s", str(e))
                 return JSONResponse(
                     content={"error": f"SQL query error: {str(e)}"},
                     status_code=500
@@ -1681,7 +1852,7 @@ async def execute_nocodb_query(query_request: NocoDBQuery, current_user: dict =
             "Content-Type": "application/json"
         }
 
-        response = requests.get(table_api_url, headers=headers, verify=False)
+        response = await nocodb_get(table_api_url, headers=headers)
 
         if response.status_code != 200:
             return JSONResponse(
@@ -1708,7 +1879,7 @@ async def execute_nocodb_query(query_request: NocoDBQuery, current_user: dict =
         # Get all records from the table
         records_api_url = f"{nocodb_api_url}/api/v2/tables/{table_id}/records?limit=10000"
 
-        response = requests.get(records_api_url, headers=headers, verify=False)
+        response = await nocodb_get(records_api_url, headers=headers)
 
         if response.status_code != 200:
             return JSONResponse(
@@ -1744,7 +1915,7 @@ async def execute_nocodb_query(query_request: NocoDBQuery, current_user: dict =
                     daily_first_records[date_key] = record
 
             except Exception as e:
-                print(f"Error processing record: {e}")
+                nocodb_logger.error("Error processing record: %s", e)
                 continue
 
         # Format result with first records
@@ -1804,11 +1975,6 @@ def get_users(current_user: dict = Depends(get_current_user)):
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
         
-        # First, ensure tables exist
-        create_users_table(cursor)
-        create_groups_table(cursor)
-        create_user_groups_table(cursor)
-        
         # Get users with their groups
         cursor.execute("""
             SELECT u.*, 
@@ -1847,23 +2013,19 @@ def get_users(current_user: dict = Depends(get_current_user)):
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 @app.get("/groups", tags=["User Management"])
-def get_groups(current_user: dict = Depends(get_current_user)):
+def get_groups(request: Request, current_user: dict = Depends(get_current_user)):
     """Get all user groups"""
     try:
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
         
-        # First, ensure the groups table exists
-        create_groups_table(cursor)
-        create_user_groups_table(cursor)
-        
         cursor.execute("SELECT * FROM groups WHERE is_active = TRUE ORDER BY name")
         groups = cursor.fetchall()
         cursor.close()
         conn.close()
         # Convert to JSON with datetime serialization
         json_data = json.loads(json.dumps(groups, default=json_serial))
-        return JSONResponse(content=json_data)
+        return etag_response(request, json_data, cache_control=NO_CACHE)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
@@ -1908,7 +2070,7 @@ def get_user_groups_for_auth(email: str):
         }
             
     except Exception as e:
-        print(f"Error fetching user groups for auth: {str(e)}")
+        auth_logger.error("Error fetching user groups for auth: %s", str(e))
         return {"user": None, "groups": [], "error": str(e)}
 
 # Pydantic models for user/group management
@@ -1988,11 +2150,6 @@ def assign_user_to_group_endpoint(user_id: int, assignment: UserGroupAssignment,
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
         
-        # Ensure tables exist
-        create_users_table(cursor)
-        create_groups_table(cursor)
-        create_user_groups_table(cursor)
-        
         # Check if user and group exist
         cursor.execute("SELECT id FROM users WHERE id = %s AND is_active = TRUE", (user_id,))
         if not cursor.fetchone():
@@ -2027,6 +2184,7 @@ def assign_user_to_group_endpoint(user_id: int, assignment: UserGroupAssignment,
             """, (user_id, assignment.group_id, assignment.role, assigner_id))
             
             conn.commit()
+            invalidate_user_groups()
             cursor.close()
             conn.close()
             
@@ -2060,6 +2218,7 @@ def remove_user_from_group(user_id: int, group_id: int, current_user: dict = Dep
             return JSONResponse(content={"error": "User-group relationship not found"}, status_code=404)
         
         conn.commit()
+        invalidate_user_groups()
         cursor.close()
         conn.close()
         
@@ -2074,8 +2233,6 @@ def create_group(group: CreateGroup, current_user: dict = Depends(get_current_us
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
         
-        create_groups_table(cursor)
-        
         permissions_json = json.dumps(group.permissions) if group.permissions else None
         
         cursor.execute("""
@@ -2085,6 +2242,7 @@ def create_group(group: CreateGroup, current_user: dict = Depends(get_current_us
         
         group_id = cursor.lastrowid
         conn.commit()
+        invalidate_page_access()
         cursor.close()
         conn.close()
         
@@ -2094,9 +2252,7 @@ def create_group(group: CreateGroup, current_user: dict = Depends(get_current_us
             "id": group_id
         })
     except Exception as e:
-        print(f"❌ Error creating group: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        access_logger.exception("Error creating group: %s", str(e))
         return JSONResponse(
             content={
                 "detail": f"Failed to create group: {str(e)}",
@@ -2146,6 +2302,7 @@ def update_group(group_id: int, group: UpdateGroup, current_user: dict = Depends
             return JSONResponse(content={"error": "Group not found"}, status_code=404)
         
         conn.commit()
+        invalidate_page_access()
         cursor.close()
         conn.close()
         
@@ -2188,6 +2345,8 @@ def update_user(user_id: int, user: UpdateUser, current_user: dict = Depends(get
             return JSONResponse(content={"error": "User not found"}, status_code=404)
         
         conn.commit()
+        invalidate_user_groups()
+        invalidate_user_directory()
         cursor.close()
         conn.close()
         
@@ -2208,11 +2367,6 @@ def create_or_update_user(current_user: dict = Depends(get_current_user)):
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
         
-        # Ensure tables exist
-        create_users_table(cursor)
-        create_groups_table(cursor)
-        create_user_groups_table(cursor)
-        
         # Check if user exists
         cursor.execute("SELECT * FROM users WHERE email = %s", (user_email,))
         existing_user = cursor.fetchone()
@@ -2236,6 +2390,8 @@ def create_or_update_user(current_user: dict = Depends(get_current_user)):
         assign_user_to_group(cursor, user_id, user_email)
         
         conn.commit()
+        invalidate_user_groups(user_email)
+        invalidate_user_directory(user_email)
         cursor.close()
         conn.close()
         
@@ -2250,9 +2406,6 @@ def update_user_nocodbapi(user_id: int, request: NocoDBAPIUpdate, current_user:
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
         
-        # Ensure tables exist
-        create_users_table(cursor)
-        
         # Check if user exists
         cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
         existing_user = cursor.fetchone()
@@ -2269,6 +2422,7 @@ def update_user_nocodbapi(user_id: int, request: NocoDBAPIUpdate, current_user:
         )
         
         conn.commit()
+        invalidate_user_directory(existing_user.get("email"))
         cursor.close()
         conn.close()
         
@@ -2283,9 +2437,6 @@ def get_user_nocodbapi(user_id: int, current_user: dict = Depends(get_current_us
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
         
-        # Ensure tables exist
-        create_users_table(cursor)
-        
         # Get user's nocodbapi
         cursor.execute("SELECT id, email, name, nocodbapi FROM users WHERE id = %s", (user_id,))
         user = cursor.fetchone()
@@ -2302,108 +2453,6 @@ def get_user_nocodbapi(user_id: int, current_user: dict = Depends(get_current_us
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
-def create_users_table(cursor):
-    """Create users table if it doesn't exist"""
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            email VARCHAR(255) UNIQUE NOT NULL,
-            name VARCHAR(255),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_login TIMESTAMP,
-            is_active BOOLEAN DEFAULT TRUE,
-            nocodbapi VARCHAR(255),
-            INDEX idx_email (email),
-            INDEX idx_active (is_active)
-        )
-    """)
-    
-    # Remove the old group_id column if it exists (migration)
-    try:
-        cursor.execute("ALTER TABLE users DROP COLUMN group_id")
-    except Exception:
-        # Column doesn't exist or other error, ignore
-        pass
-    
-    # Add new columns if they don't exist
-    try:
-        cursor.execute("ALTER TABLE users ADD COLUMN is_active BOOLEAN DEFAULT TRUE")
-    except Exception:
-        pass
-    
-    try:
-        cursor.execute("ALTER TABLE users ADD COLUMN nocodbapi VARCHAR(255)")
-    except Exception:
-        pass
-
-def create_groups_table(cursor):
-    """Create groups table if it doesn't exist"""
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS groups (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            name VARCHAR(255) UNIQUE NOT NULL,
-            domain VARCHAR(255),
-            description TEXT,
-            permissions JSON,
-            is_active BOOLEAN DEFAULT TRUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            INDEX idx_domain (domain),
-            INDEX idx_active (is_active)
-        )
-    """)
-    
-    # Add new columns if they don't exist
-    try:
-        cursor.execute("ALTER TABLE groups ADD COLUMN description TEXT")
-    except Exception:
-        pass
-    
-    try:
-        cursor.execute("ALTER TABLE groups ADD COLUMN permissions JSON")
-    except Exception:
-        pass
-    
-    try:
-        cursor.execute("ALTER TABLE groups ADD COLUMN is_active BOOLEAN DEFAULT TRUE")
-    except Exception:
-        pass
-    
-    # Create default groups with permissions
-    default_groups = [
-        ("Guests", None, "Guest users with limited access", '{"pages": ["dashboard", "tools"], "actions": ["read"]}'),
-        ("Scale42", "scale-42.com", "Scale42 domain users with full access", '{"pages": ["dashboard", "projects", "map", "schema", "accounts", "hoyanger", "users", "tools"], "actions": ["read", "write", "delete", "admin"]}'),
-        ("Scale42", "edbmotte.com", "EDB Motte domain users with full access", '{"pages": ["dashboard", "projects", "map", "schema", "accounts", "hoyanger", "users", "tools"], "actions": ["read", "write", "delete", "admin"]}'),
-        ("Developers", None, "Developer group with technical access", '{"pages": ["dashboard", "projects", "map", "schema", "tools"], "actions": ["read", "write"]}'),
-        ("Viewers", None, "Read-only access to most content", '{"pages": ["dashboard", "projects", "map"], "actions": ["read"]}'),
-    ]
-    
-    for group_name, domain, description, permissions in default_groups:
-        cursor.execute(
-            "INSERT IGNORE INTO groups (name, domain, description, permissions) VALUES (%s, %s, %s, %s)",
-            (group_name, domain, description, permissions)
-        )
-
-def create_user_groups_table(cursor):
-    """Create user_groups junction table for many-to-many relationship"""
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS user_groups (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            user_id INT NOT NULL,
-            group_id INT NOT NULL,
-            role VARCHAR(50) DEFAULT 'member',
-            assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            assigned_by INT,
-            is_active BOOLEAN DEFAULT TRUE,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-            FOREIGN KEY (group_id) REFERENCES groups(id) ON DELETE CASCADE,
-            FOREIGN KEY (assigned_by) REFERENCES users(id) ON DELETE SET NULL,
-            UNIQUE KEY unique_user_group (user_id, group_id),
-            INDEX idx_user_id (user_id),
-            INDEX idx_group_id (group_id),
-            INDEX idx_active (is_active)
-        )
-    """)
-
 def assign_user_to_group(cursor, user_id, email, assigned_by=None):
     """Assign user to appropriate group based on email domain"""
     domain = email.split('@')[1] if '@' in email else None
@@ -2449,7 +2498,115 @@ def assign_user_to_group(cursor, user_id, email, assigned_by=None):
 @app.get("/health", tags=["Debug"])
 def health():
     """Health check endpoint to verify API is running"""
-    return {"status": "ok"}
+    # The API itself is up even while NocoDB is not; report the breaker alongside
+    return {"status": "ok", "nocodb": nocodb_breaker.state}
+
+@app.get("/ready", tags=["Debug"])
+async def ready():
+    """
+    Readiness for deploys and load balancers: 200 once the startup warm-up is
+    done and MySQL and NocoDB are reachable, 503 with the reasons otherwise
+    """
+    checks = {
+        "warmup": warmup.ready,
+        "mysql": (await run_in_threadpool(mysql_probe.result))["ok"],
+        "nocodb": nocodb_breaker.state != BREAKER_OPEN,
+    }
+    is_ready = all(checks.values())
+    return JSONResponse(
+        content={
+            "status": "ready" if is_ready else "not_ready",
+            "checks": checks,
+            "nocodb": nocodb_breaker.state,
+            "warmup": warmup.status(),
+        },
+        status_code=200 if is_ready else 503,
+        headers={"Cache-Control": NO_CACHE},
+    )
+
+def _health_problems(mysql: dict, nocodb: dict, background: dict) -> list:
+    problems = []
+    for name, probe in (("MySQL", mysql), ("NocoDB", nocodb)):
+        if not probe["ok"]:
+            problems.append(f"{name} unreachable: {probe['error']}")
+        elif probe["slow"]:
+            problems.append(f"{name} slow: {probe['latency_ms']}ms")
+    if nocodb_breaker.state != BREAKER_CLOSED:
+        problems.append(f"NocoDB circuit {nocodb_breaker.state}")
+    if not background["warmup"]["ready"]:
+        problems.append("Startup warm-up not finished")
+    mirror_sync = background["mirror_sync"]
+    if not mirror_sync["running"]:
+        problems.append("Mirror refresher not running")
+    for name, mirror in mirror_sync["mirrors"].items():
+        if mirror["last_error"]:
+            problems.append(f"{name} mirror refresh failed: {mirror['last_error']}")
+    if background["audit_pipeline"]["last_error"]:
+        problems.append(f"Audit pipeline: {background['audit_pipeline']['last_error']}")
+    return problems
+
+
+@app.get("/health/report", tags=["Debug"])
+async def health_report(current_user: dict = Depends(get_current_user)):
+    """
+    Why the API is slow, at a glance: upstream round-trip latency (probes
+    cached for HEALTH_PROBE_TTL seconds), pool utilisation, cache sizes and
+    hit rates, background work and the circuit breaker, for this worker
+    """
+    # Read on the event loop: the threadpool limiter and the job registry live here
+    threadpool = threadpool_stats()
+    background = {
+        "warmup": warmup.status(),
+        "jobs": job_stats(),
+        "mirror_sync": mirror_refresher_stats(),
+        "audit_pipeline": audit_pipeline.metrics(),
+        "rates": {k: v for k, v in rate_service.snapshot().items() if k != "rates"},
+        "logging": logging_stats(),
+    }
+    mysql, nocodb = await asyncio.gather(
+        run_in_threadpool(mysql_probe.result),
+        run_in_threadpool(nocodb_probe.result),
+    )
+    # Blocking: the shared cache statistics query SQLite
+    responses = await run_in_threadpool(response_cache_stats)
+
+    problems = _health_problems(mysql, nocodb, background)
+    if not mysql["ok"]:
+        overall = "down"
+    elif problems:
+        overall = "degraded"
+    else:
+        overall = "ok"
+    return JSONResponse(
+        content={
+            "status": overall,
+            "problems": problems,
+            "worker": worker_id(),
+            "uptime_seconds": uptime_seconds(),
+            "upstreams": {
+                "mysql": mysql,
+                "nocodb": {**nocodb, **nocodb_client_stats()},
+            },
+            "pools": {
+                "threadpool": threadpool,
+                "nocodb_http": nocodb_pool_stats(),
+                "mysql_server": mysql.get("connections"),
+            },
+            "caches": {
+                "responses": responses,
+                "page_access": page_access_stats(),
+                "user_directory": user_directory_stats(),
+                "project_facets": project_facets.stats(),
+            },
+            "background": background,
+        },
+        headers={"Cache-Control": NO_CACHE},
+    )
+
+@app.get("/debug/response-cache", tags=["Debug"])
+def debug_response_cache(current_user: dict = Depends(get_current_user)):
+    """Hit/miss counts of the response caches and coalesced NocoDB calls"""
+    return {**response_cache_stats(), "nocodb": nocodb_client_stats()}
 
 @app.get("/debug", tags=["Debug"])
 def debug():
@@ -2471,32 +2628,14 @@ async def create_nocodb_row(
     """Create a new row in NocoDB table using v1 API"""
     try:
         # Get user's personal API token if available, otherwise use environment token
-        user_token = None
         user_email = current_user.get('email')
-        print(f"?? CREATE ENDPOINT - Getting API token for user: {user_email}")
+        nocodb_logger.debug("CREATE ENDPOINT - Getting API token for user: %s", user_email)
         
-        if user_email:
-            try:
-                # Get user's NocoDB token from database
-                conn = mysql.connector.connect(
-                    host=os.getenv("DB_HOST", "10.1.8.51"),
-                    user=os.getenv("DB_USER", "s42project"),
-                    password=os.getenv("DB_PASSWORD", "s42project"),
-                    database=os.getenv("DB_NAME", "nocodb"),
-                    port=int(os.getenv("DB_PORT", "3306")),
-                )
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("SELECT nocodb_api FROM users WHERE email = %s", (user_email,))
-                user_data = cursor.fetchone()
-                if user_data and user_data['nocodb_api']:
-                    user_token = user_data['nocodb_api']
-                    print(f"? CREATE ENDPOINT - Using user-specific NocoDB token for {user_email}")
-                else:
-                    print(f"?? CREATE ENDPOINT - No user-specific token found for {user_email}, using admin token")
-                cursor.close()
-                conn.close()
-            except Exception as e:
-                print(f"Error fetching user token: {e}")
+        user_token = await run_in_threadpool(get_user_nocodb_token, user_email)
+        if user_token:
+            nocodb_logger.debug("CREATE ENDPOINT - Using user-specific NocoDB token for %s", user_email)
+        else:
+            nocodb_logger.debug("CREATE ENDPOINT - No user-specific token found for %s, using admin token", user_email)
         
         # Use user token if available, otherwise fall back to environment token
         api_token = user_token or os.getenv("NOCODB_API_TOKEN")
@@ -2509,10 +2648,7 @@ async def create_nocodb_row(
         
         nocodb_url = f"{os.getenv('NOCODB_API_URL')}/api/v3/data/{base_id}/{table_id}/records"
         
-        headers = {
-            "Content-Type": "application/json",
-            "xc-token": api_token
-        }
+        headers = nocodb_headers(api_token)
         
         # NocoDB v3 API requires fields wrapper
         v3_payload = {
@@ -2520,24 +2656,25 @@ async def create_nocodb_row(
         }
         
         # Make the create request
-        print(f"🔄 Making NocoDB v3 create request:")
-        print(f"   URL: {nocodb_url}")
-        print(f"   Payload: {v3_payload}")
-        print(f"   Token type: {'user' if user_token else 'admin'}")
+        nocodb_logger.debug("Making NocoDB v3 create request")
+        nocodb_logger.debug("URL: %s", nocodb_url)
+        nocodb_logger.debug("Payload: %s", v3_payload)
+        nocodb_logger.debug("Token type: %s", 'user' if user_token else 'admin')
         
-        response = requests.post(nocodb_url, json=v3_payload, headers=headers, verify=False)
+        response = await nocodb_post(nocodb_url, json=v3_payload, headers=headers)
         
-        print(f"?? NocoDB Response: {response.status_code}")
+        nocodb_logger.debug("NocoDB Response: %s", response.status_code)
         if response.status_code not in [200, 201]:
-            print(f"? Error response: {response.text}")
+            nocodb_logger.warning("Error response: %s", response.text)
         
         if response.status_code in [200, 201]:
+            await run_in_threadpool(invalidate_responses, table=table_id)
             return {"success": True, "data": response.json()}
         else:
             raise HTTPException(status_code=response.status_code, detail=f"NocoDB API error: {response.text}")
             
     except Exception as e:
-        print(f"? Error in create_nocodb_row: {str(e)}")
+        nocodb_logger.error("Error in create_nocodb_row: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/nocodb/update-row", tags=["nocodb"])
@@ -2550,33 +2687,14 @@ async def update_nocodb_row(
     """Update a row in NocoDB table using v1 API"""
     try:
         # Get user's personal API token if available, otherwise use environment token
-        user_token = None
         user_email = current_user.get('email')
-        print(f"?? UPDATE ENDPOINT - Getting API token for user: {user_email}")
+        nocodb_logger.debug("UPDATE ENDPOINT - Getting API token for user: %s", user_email)
         
-        if user_email:
-            try:
-                # Get user's NocoDB token from database
-                conn = mysql.connector.connect(
-                    host=os.getenv("DB_HOST", "10.1.8.51"),
-                    user=os.getenv("DB_USER", "s42project"),
-                    password=os.getenv("DB_PASSWORD", "s42project"),
-                    database=os.getenv("DB_NAME", "nocodb"),
-                    port=int(os.getenv("DB_PORT", "3306")),
-                )
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("SELECT nocodb_api FROM users WHERE email = %s", (user_email,))
-                user_data = cursor.fetchone()
-                print(f"?? UPDATE ENDPOINT - Database query result for {user_email}: {user_data}")
-                if user_data and user_data['nocodb_api']:
-                    user_token = user_data['nocodb_api']
-                    print(f"? UPDATE ENDPOINT - Using user-specific NocoDB token for {user_email}")
-                else:
-                    print(f"?? UPDATE ENDPOINT - No user-specific token found for {user_email}, using admin token")
-                cursor.close()
-                conn.close()
-            except Exception as e:
-                print(f"Error fetching user token: {e}")
+        user_token = await run_in_threadpool(get_user_nocodb_token, user_email)
+        if user_token:
+            nocodb_logger.debug("UPDATE ENDPOINT - Using user-specific NocoDB token for %s", user_email)
+        else:
+            nocodb_logger.debug("UPDATE ENDPOINT - No user-specific token found for %s, using admin token", user_email)
         
         # Use user token if available, otherwise fall back to environment token
         api_token = user_token or os.getenv("NOCODB_API_TOKEN")
@@ -2589,10 +2707,7 @@ async def update_nocodb_row(
         
         nocodb_url = f"{os.getenv('NOCODB_API_URL')}/api/v3/data/{base_id}/{table_id}/records"
         
-        headers = {
-            "Content-Type": "application/json",
-            "xc-token": api_token
-        }
+        headers = nocodb_headers(api_token)
         
         # NocoDB v3 API requires id and fields in the payload
         v3_payload = {
@@ -2601,25 +2716,26 @@ async def update_nocodb_row(
         }
         
         # Make the update request (PATCH for v3 API)
-        print(f"?? Making NocoDB v3 update request:")
-        print(f"   URL: {nocodb_url}")
-        print(f"   Payload: {v3_payload}")
-        print(f"   Token type: {'user' if user_token else 'admin'}")
-        print(f"   Using token: {str(api_token)[:20]}...")
+        nocodb_logger.debug("Making NocoDB v3 update request")
+        nocodb_logger.debug("URL: %s", nocodb_url)
+        nocodb_logger.debug("Payload: %s", v3_payload)
+        nocodb_logger.debug("Token type: %s", 'user' if user_token else 'admin')
         
-        response = requests.patch(nocodb_url, json=v3_payload, headers=headers, verify=False)
+        response = await nocodb_patch(nocodb_url, json=v3_payload, headers=headers)
         
-        print(f"?? NocoDB Response: {response.status_code}")
+        nocodb_logger.debug("NocoDB Response: %s", response.status_code)
         if response.status_code != 200:
-            print(f"? Error response: {response.text}")
+            nocodb_logger.warning("Error response: %s", response.text)
         
         if response.status_code == 200:
+            await run_in_threadpool(invalidate_responses, table=table_id)
+            await refresh_mirrored_row(table_id, record_id)
             return {"success": True, "data": response.json()}
         else:
             raise HTTPException(status_code=response.status_code, detail=f"NocoDB API error: {response.text}")
             
     except Exception as e:
-        print(f"? Error in update_nocodb_row: {str(e)}")
+        nocodb_logger.error("Error in update_nocodb_row: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/nocodb/delete-row", tags=["nocodb"])
@@ -2631,33 +2747,14 @@ async def delete_nocodb_row(
     """Delete a row from NocoDB table using v3 API"""
     try:
         # Get user's personal API token if available, otherwise use environment token
-        user_token = None
         user_email = current_user.get('email')
-        print(f"🗑️ DELETE ENDPOINT - Getting API token for user: {user_email}")
+        nocodb_logger.debug("DELETE ENDPOINT - Getting API token for user: %s", user_email)
         
-        if user_email:
-            try:
-                # Get user's NocoDB token from database
-                conn = mysql.connector.connect(
-                    host=os.getenv("DB_HOST", "10.1.8.51"),
-                    user=os.getenv("DB_USER", "s42project"),
-                    password=os.getenv("DB_PASSWORD", "s42project"),
-                    database=os.getenv("DB_NAME", "nocodb"),
-                    port=int(os.getenv("DB_PORT", "3306")),
-                )
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("SELECT nocodb_api FROM users WHERE email = %s", (user_email,))
-                user_data = cursor.fetchone()
-                print(f"📊 DELETE ENDPOINT - Database query result for {user_email}: {user_data}")
-                if user_data and user_data['nocodb_api']:
-                    user_token = user_data['nocodb_api']
-                    print(f"✅ DELETE ENDPOINT - Using user-specific NocoDB token for {user_email}")
-                else:
-                    print(f"⚠️ DELETE ENDPOINT - No user-specific token found for {user_email}, using admin token")
-                cursor.close()
-                conn.close()
-            except Exception as e:
-                print(f"Error fetching user token: {e}")
+        user_token = await run_in_threadpool(get_user_nocodb_token, user_email)
+        if user_token:
+            nocodb_logger.debug("DELETE ENDPOINT - Using user-specific NocoDB token for %s", user_email)
+        else:
+            nocodb_logger.debug("DELETE ENDPOINT - No user-specific token found for %s, using admin token", user_email)
         
         # Use user token if available, otherwise fall back to environment token
         api_token = user_token or os.getenv("NOCODB_API_TOKEN")
@@ -2670,10 +2767,7 @@ async def delete_nocodb_row(
         
         nocodb_url = f"{os.getenv('NOCODB_API_URL')}/api/v3/data/{base_id}/{table_id}/records"
         
-        headers = {
-            "Content-Type": "application/json",
-            "xc-token": api_token
-        }
+        headers = nocodb_headers(api_token)
         
         # NocoDB v3 API requires id in the payload for delete
         v3_payload = {
@@ -2681,25 +2775,26 @@ async def delete_nocodb_row(
         }
         
         # Make the delete request
-        print(f"🗑️ Making NocoDB v3 delete request:")
-        print(f"   URL: {nocodb_url}")
-        print(f"   Payload: {v3_payload}")
-        print(f"   Token type: {'user' if user_token else 'admin'}")
-        print(f"   Using token: {str(api_token)[:20]}...")
+        nocodb_logger.debug("Making NocoDB v3 delete request")
+        nocodb_logger.debug("URL: %s", nocodb_url)
+        nocodb_logger.debug("Payload: %s", v3_payload)
+        nocodb_logger.debug("Token type: %s", 'user' if user_token else 'admin')
         
-        response = requests.delete(nocodb_url, json=v3_payload, headers=headers, verify=False)
+        response = await nocodb_delete(nocodb_url, json=v3_payload, headers=headers)
         
-        print(f"📡 NocoDB Response: {response.status_code}")
+        nocodb_logger.debug("NocoDB Response: %s", response.status_code)
         if response.status_code != 200:
-            print(f"❌ Error response: {response.text}")
+            nocodb_logger.warning("Error response: %s", response.text)
         
         if response.status_code == 200:
+            await run_in_threadpool(invalidate_responses, table=table_id)
+            await apply_mirror_event(table_id, "DELETE", {"Id": row_id})
             return {"success": True, "message": "Row deleted successfully"}
         else:
             raise HTTPException(status_code=response.status_code, detail=f"NocoDB API error: {response.text}")
             
     except Exception as e:
-        print(f"❌ Error in delete_nocodb_row: {str(e)}")
+        nocodb_logger.error("Error in delete_nocodb_row: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/nocodb/verify-update", tags=["nocodb"])
@@ -2712,28 +2807,7 @@ async def verify_nocodb_update(
     """Verify that a field was actually updated by fetching the current value"""
     try:
         # Get user's personal API token if available, otherwise use environment token
-        user_token = None
-        user_email = current_user.get('email')
-        
-        if user_email:
-            try:
-                # Get user's NocoDB token from database
-                conn = mysql.connector.connect(
-                    host=os.getenv("DB_HOST", "10.1.8.51"),
-                    user=os.getenv("DB_USER", "s42project"),
-                    password=os.getenv("DB_PASSWORD", "s42project"),
-                    database=os.getenv("DB_NAME", "nocodb"),
-                    port=int(os.getenv("DB_PORT", "3306")),
-                )
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("SELECT nocodb_api FROM users WHERE email = %s", (user_email,))
-                user_data = cursor.fetchone()
-                if user_data and user_data['nocodb_api']:
-                    user_token = user_data['nocodb_api']
-                cursor.close()
-                conn.close()
-            except Exception as e:
-                print(f"Error fetching user token for verification: {e}")
+        user_token = await run_in_threadpool(get_user_nocodb_token, current_user.get('email'))
         
         # Use user token if available, otherwise fall back to environment token
         api_token = user_token or os.getenv("NOCODB_API_TOKEN")
@@ -2744,12 +2818,7 @@ async def verify_nocodb_update(
         # Get the specific record to check the field value
         nocodb_url = f"{os.getenv('NOCODB_API_URL')}/api/v2/tables/{table_id}/records/{row_id}"
         
-        headers = {
-            "Content-Type": "application/json",
-            "xc-token": api_token
-        }
-        
-        response = requests.get(nocodb_url, headers=headers, verify=False)
+        response = await nocodb_get(nocodb_url, headers=nocodb_headers(api_token))
         
         if response.status_code == 200:
             record_data = response.json()
@@ -2762,6 +2831,7 @@ async def verify_nocodb_update(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/nocodb/table/{table_id}", tags=["nocodb"])
+@cached_response("nocodb_table_info", ttl=300, scope=authenticated_user_token_scope, table=lambda kwargs: kwargs["table_id"])
 async def get_nocodb_table_info(table_id: str, current_user: dict = Depends(get_current_user)):
     """Get table information from NocoDB"""
     try:
@@ -2769,27 +2839,11 @@ async def get_nocodb_table_info(table_id: str, current_user: dict = Depends(get_
         user_token = None
         if current_user and current_user.get("authenticated"):
             user_email = current_user.get("email")
-            if user_email:
-                try:
-                    conn = mysql.connector.connect(
-                        host=os.getenv("DB_HOST"),
-                        user=os.getenv("DB_USER"),
-                        password=os.getenv("DB_PASSWORD"),
-                        database=os.getenv("DB_NAME"),
-                        port=int(os.getenv("DB_PORT", 3306))
-                    )
-                    cursor = conn.cursor(dictionary=True)
-                    cursor.execute("SELECT nocodb_api FROM users WHERE email = %s", (user_email,))
-                    user_data = cursor.fetchone()
-                    if user_data and user_data.get('nocodb_api'):
-                        user_token = user_data['nocodb_api']
-                        print(f"? Using user-specific NocoDB token for {user_email}")
-                    else:
-                        print(f"?? No user-specific token found for {user_email}, using admin token")
-                    cursor.close()
-                    conn.close()
-                except Exception as e:
-                    print(f"Error fetching user token: {e}")
+            user_token = await run_in_threadpool(get_user_nocodb_token, user_email)
+            if user_token:
+                nocodb_logger.debug("Using user-specific NocoDB token for %s", user_email)
+            else:
+                nocodb_logger.debug("No user-specific token found for %s, using admin token", user_email)
         
         # Use user token if available, otherwise fall back to environment token
         api_token = user_token or os.getenv("NOCODB_API_TOKEN")
@@ -2800,13 +2854,8 @@ async def get_nocodb_table_info(table_id: str, current_user: dict = Depends(get_
         # NocoDB API endpoint for table info
         nocodb_url = f"{os.getenv('NOCODB_API_URL')}/api/v2/tables/{table_id}"
         
-        headers = {
-            "Content-Type": "application/json",
-            "xc-token": api_token
-        }
-        
         # Make the request
-        response = requests.get(nocodb_url, headers=headers, verify=False)
+        response = await nocodb_get(nocodb_url, headers=nocodb_headers(api_token))
         
         if response.status_code == 200:
             return {"success": True, "data": response.json()}
@@ -2817,34 +2866,26 @@ async def get_nocodb_table_info(table_id: str, current_user: dict = Depends(get_
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/nocodb/table/{table_id}/records", tags=["nocodb"])
-async def get_nocodb_table_records(table_id: str, current_user: dict = Depends(get_current_user)):
-    """Get table records from NocoDB"""
+@cached_response("nocodb_table_records", ttl=30, scope=authenticated_user_token_scope, table=lambda kwargs: kwargs["table_id"])
+async def get_nocodb_table_records(
+    table_id: str,
+    current_user: dict = Depends(get_current_user),
+    fields: Optional[str] = Query(None, description="Comma-separated field titles to return"),
+    sort: Optional[str] = Query(None, description="Comma-separated field titles, '-' prefix for descending"),
+    limit: int = Query(1000, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    """Get table records from NocoDB, returning only the requested fields"""
     try:
         # Get user's personal API token if available, otherwise use environment token
         user_token = None
         if current_user and current_user.get("authenticated"):
             user_email = current_user.get("email")
-            if user_email:
-                try:
-                    conn = mysql.connector.connect(
-                        host=os.getenv("DB_HOST"),
-                        user=os.getenv("DB_USER"),
-                        password=os.getenv("DB_PASSWORD"),
-                        database=os.getenv("DB_NAME"),
-                        port=int(os.getenv("DB_PORT", 3306))
-                    )
-                    cursor = conn.cursor(dictionary=True)
-                    cursor.execute("SELECT nocodb_api FROM users WHERE email = %s", (user_email,))
-                    user_data = cursor.fetchone()
-                    if user_data and user_data.get('nocodb_api'):
-                        user_token = user_data['nocodb_api']
-                        print(f"? Using user-specific NocoDB token for {user_email}")
-                    else:
-                        print(f"?? No user-specific token found for {user_email}, using admin token")
-                    cursor.close()
-                    conn.close()
-                except Exception as e:
-                    print(f"Error fetching user token: {e}")
+            user_token = await run_in_threadpool(get_user_nocodb_token, user_email)
+            if user_token:
+                nocodb_logger.debug("Using user-specific NocoDB token for %s", user_email)
+            else:
+                nocodb_logger.debug("No user-specific token found for %s, using admin token", user_email)
         
         # Use user token if available, otherwise fall back to environment token
         api_token = user_token or os.getenv("NOCODB_API_TOKEN")
@@ -2855,19 +2896,11 @@ async def get_nocodb_table_records(table_id: str, current_user: dict = Depends(g
         # NocoDB API endpoint for table records
         nocodb_url = f"{os.getenv('NOCODB_API_URL')}/api/v2/tables/{table_id}/records"
         
-        headers = {
-            "Content-Type": "application/json",
-            "xc-token": api_token
-        }
-        
-        # Add query parameters to get all records
-        params = {
-            "limit": 1000,  # Increase limit to get more records
-            "offset": 0
-        }
+        # Sort and projection run in NocoDB so unused columns never cross the wire
+        params = NocoQuery(sort=parse_sort(sort), fields=parse_fields(fields)).to_params(limit=limit, offset=offset)
         
         # Make the request
-        response = requests.get(nocodb_url, headers=headers, params=params, verify=False)
+        response = await nocodb_get(nocodb_url, headers=nocodb_headers(api_token), params=params)
         
         if response.status_code == 200:
             data = response.json()
@@ -2879,7 +2912,7 @@ async def get_nocodb_table_records(table_id: str, current_user: dict = Depends(g
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get('/api/map-data', tags=["Map"])
-def get_api_map_data(current_user: dict = Depends(get_current_user), partner: str = Query("all", description="Filter by Primary Project Partner")):
+def get_api_map_data(request: Request, current_user: dict = Depends(get_current_user), partner: str = Query("all", description="Filter by Primary Project Partner")):
     """Get map visualization data with site locations and coordinates"""
     try:
         conn = get_db()
@@ -2940,11 +2973,11 @@ def get_api_map_data(current_user: dict = Depends(get_current_user), partner: st
         # Convert to JSON with datetime serialization to handle Decimal and other types
         json_data = json.loads(json.dumps(sites_data, default=json_serial))
         
-        return JSONResponse(content={
+        return etag_response(request, {
             "sites": json_data,
             "count": len(json_data),
             "partner_filter": partner if partner != "all" else None
-        })
+        }, cache_control=MAP_CACHE_CONTROL)
         
     except Exception as e:
         return JSONResponse(
@@ -2953,7 +2986,7 @@ def get_api_map_data(current_user: dict = Depends(get_current_user), partner: st
         )
 
 @app.get('/api/map-stats', tags=["Map"])
-def get_api_map_stats(current_user: dict = Depends(get_current_user)):
+def get_api_map_stats(request: Request, current_user: dict = Depends(get_current_user)):
     """Get map statistics and analytics"""
     try:
         conn = get_db()
@@ -2992,12 +3025,12 @@ def get_api_map_stats(current_user: dict = Depends(get_current_user)):
         cursor.close()
         conn.close()
         
-        return JSONResponse(content={
+        return etag_response(request, {
             "total_projects": int(total_projects) if total_projects else 0,
             "total_plots": int(total_plots) if total_plots else 0,
             "sites_with_coords": int(sites_with_coords) if sites_with_coords else 0,
             "sites_with_geojson": int(sites_with_geojson) if sites_with_geojson else 0
-        })
+        }, cache_control=MAP_CACHE_CONTROL)
         
     except Exception as e:
         return JSONResponse(
@@ -3009,50 +3042,17 @@ def get_api_map_stats(current_user: dict = Depends(get_current_user)):
 def get_api_projects_partners(current_user: dict = Depends(get_current_user)):
     """Get unique project partners for map filtering - matches frontend API path"""
     try:
-        # Get NocoDB configuration from environment variables
-        nocodb_api_url = os.getenv("NOCODB_API_URL")
-        nocodb_api_token = os.getenv("NOCODB_API_TOKEN")
-        nocodb_base_id = os.getenv("NOCODB_BASE_ID")
-        nocodb_projects_table_id = os.getenv("NOCODB_PROJECTS_TABLE_ID")
-        
-        # First try NocoDB API
-        if all([nocodb_api_url, nocodb_api_token, nocodb_base_id, nocodb_projects_table_id]):
-            try:
-                headers = {
-                    "Content-Type": "application/json",
-                    "xc-auth": nocodb_api_token
-                }
-                
-                # Fetch all projects from NocoDB
-                response = requests.get(
-                    f"{nocodb_api_url}/api/v1/db/data/{nocodb_base_id}/{nocodb_projects_table_id}",
-                    headers=headers,
-                    timeout=30
-                )
-                
-                if response.status_code == 200:
-                    projects_data = response.json()
-                    projects = projects_data.get("list", [])
-                    
-                    # Extract unique partners from Primary Project Partner field (c3jk8g4qwvqsrpj)
-                    partners = set()
-                    for project in projects:
-                        partner = project.get("c3jk8g4qwvqsrpj")  # Primary Project Partner field ID
-                        if partner and partner.strip() and partner != "N/A":
-                            partners.add(partner.strip())
-                    
-                    # Convert to sorted list
-                    unique_partners = sorted(list(partners))
-                    
-                    return JSONResponse(content={
-                        "partners": unique_partners,
-                        "count": len(unique_partners),
-                        "source": "NocoDB API"
-                    })
-                    
-            except requests.exceptions.RequestException as e:
-                # Fall through to MySQL fallback
-                pass
+        # Same facet index as /projects/project-partners; MySQL only if NocoDB is unreachable
+        try:
+            counts, source = get_project_facet_counts()
+            unique_partners = [p for p in counts["partner"] if p != "N/A"]
+            return JSONResponse(content={
+                "partners": unique_partners,
+                "count": len(unique_partners),
+                "source": source
+            })
+        except Exception as e:
+            nocodb_logger.warning("Project facets unavailable, falling back to MySQL: %s", str(e))
         
         # Fallback to MySQL if NocoDB fails
         try:
@@ -3104,11 +3104,6 @@ def get_user_info(email: str, current_user: dict = Depends(get_current_user)):
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
         
-        # Create tables if they don't exist
-        create_users_table(cursor)
-        create_groups_table(cursor)
-        create_user_groups_table(cursor)
-        
         # Get user with group information using many-to-many relationship
         query = """
         SELECT u.*, 
@@ -3148,11 +3143,6 @@ def create_user(user_data: dict, current_user: dict = Depends(get_current_user))
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
         
-        # Create tables if they don't exist
-        create_users_table(cursor)
-        create_groups_table(cursor)
-        create_user_groups_table(cursor)
-        
         email = user_data.get('email')
         name = user_data.get('name', '')
         
@@ -3192,6 +3182,8 @@ def create_user(user_data: dict, current_user: dict = Depends(get_current_user))
         new_user = cursor.fetchone()
         
         conn.commit()
+        invalidate_user_groups(email)
+        invalidate_user_directory(email)
         cursor.close()
         conn.close()
         
@@ -3207,8 +3199,6 @@ def update_user_login(user_data: dict, current_user: dict = Depends(get_current_
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
         
-        create_users_table(cursor)
-        
         email = user_data.get('email')
         if not email:
             return {"error": "Email is required"}
@@ -3228,21 +3218,21 @@ def update_user_login(user_data: dict, current_user: dict = Depends(get_current_
         return {"error": str(e)}
 
 @app.get('/api/nocodb/map-data', tags=["Map"])
-def get_nocodb_map_data(partner: str = Query("all", description="Filter by Primary Project Partner")):
+def get_nocodb_map_data(request: Request, partner: str = Query("all", description="Filter by Primary Project Partner")):
     """Get map visualization data from NocoDB with site locations, coordinates, and statistics"""
-    print(f"?? Function called with partner: {partner}")
+    nocodb_logger.debug("Function called with partner: %s", partner)
     try:
-        print("?? Starting combined map data and stats fetch from NocoDB")
+        nocodb_logger.debug("Starting combined map data and stats fetch from NocoDB")
         # NocoDB configuration
         nocodb_api_url = os.getenv("NOCODB_API_URL", "https://nocodb.edbmotte.com")
         api_token = os.getenv("NOCODB_API_TOKEN")
         nocodb_projects_table_id = os.getenv("NOCODB_PROJECTS_TABLE_ID", "mftsk8hkw23m8q1")
         land_plots_table_id = os.getenv("NOCODB_PLOTS_TABLE_ID", "mmqclkrvx9lbtpc")  # Use environment variable
         
-        print(f"?? API URL: {nocodb_api_url}")
-        print(f"?? Token present: {bool(api_token)}")
-        print(f"?? Projects table ID: {nocodb_projects_table_id}")
-        print(f"?? Plots table ID: {land_plots_table_id}")
+        nocodb_logger.debug("API URL: %s", nocodb_api_url)
+        nocodb_logger.debug("Token present: %s", bool(api_token))
+        nocodb_logger.debug("Projects table ID: %s", nocodb_projects_table_id)
+        nocodb_logger.debug("Plots table ID: %s", land_plots_table_id)
         
         if not api_token:
             return JSONResponse(
@@ -3255,43 +3245,50 @@ def get_nocodb_map_data(partner: str = Query("all", description="Filter by Prima
             "Content-Type": "application/json"
         }
         
-        # First, fetch projects to build partner mapping
-        projects_api_url = f"{nocodb_api_url}/api/v2/tables/{nocodb_projects_table_id}/records"
-        print(f"?? Projects API URL: {projects_api_url}")
-        projects_response = requests.get(projects_api_url, headers=headers, params={"limit": 1000}, verify=False)
-        projects_response.raise_for_status()
-        projects_data = projects_response.json()
-        print(f"?? Projects data keys: {list(projects_data.keys()) if projects_data else 'None'}")
-        print(f"?? Projects list length: {len(projects_data.get('list', [])) if projects_data else 0}")
+        # Projects and plots come from the local mirror; NocoDB only until it has loaded
+        projects_list = projects_mirror.all_rows()
+        if projects_list is None:
+            # First, fetch projects to build partner mapping
+            projects_api_url = f"{nocodb_api_url}/api/v2/tables/{nocodb_projects_table_id}/records"
+            nocodb_logger.debug("Projects API URL: %s", projects_api_url)
+            projects_response = nocodb_get_sync(projects_api_url, headers=headers, params={"limit": 1000})
+            projects_response.raise_for_status()
+            projects_data = projects_response.json()
+            nocodb_logger.debug("Projects data keys: %s", list(projects_data.keys()) if projects_data else 'None')
+            nocodb_logger.debug("Projects list length: %s", len(projects_data.get('list', [])) if projects_data else 0)
+            projects_list = projects_data.get('list', [])
         
         # Build mapping of project ID to partner
         project_partner_map = {}
         unique_projects = set()
-        for project in projects_data.get('list', []):
+        for project in projects_list:
             project_id = project.get('Id')
             partner_name = project.get('Primary Project Partner', '').strip()
             if project_id:
                 project_partner_map[project_id] = partner_name
                 unique_projects.add(project_id)  # Track unique projects
         
-        print(f"?? Built partner mapping for {len(project_partner_map)} projects")
-        print(f"?? Total unique projects: {len(unique_projects)}")
-        
-        # Fetch land plots data from NocoDB
-        api_url = f"{nocodb_api_url}/api/v2/tables/{land_plots_table_id}/records"
-        print(f"?? Making request to: {api_url}")
-        response = requests.get(api_url, headers=headers, params={"limit": 1000}, verify=False)
-        print(f"? Response status: {response.status_code}")
-        response.raise_for_status()
-        data = response.json()
-        print(f"?? Got {len(data.get('list', []))} records from NocoDB")
+        nocodb_logger.debug("Built partner mapping for %s projects", len(project_partner_map))
+        nocodb_logger.debug("Total unique projects: %s", len(unique_projects))
+        
+        plot_records = plots_mirror.all_rows()
+        if plot_records is None:
+            # Fetch land plots data from NocoDB
+            api_url = f"{nocodb_api_url}/api/v2/tables/{land_plots_table_id}/records"
+            nocodb_logger.debug("Making request to: %s", api_url)
+            response = nocodb_get_sync(api_url, headers=headers, params={"limit": 1000})
+            nocodb_logger.debug("Response status: %s", response.status_code)
+            response.raise_for_status()
+            data = response.json()
+            nocodb_logger.debug("Got %s records from NocoDB", len(data.get('list', [])))
+            plot_records = data.get('list', [])
         
         plots = []
         countries = set()
         secured_sites = 0
         sites_with_coords = 0
         
-        for record in data.get('list', []):
+        for record in plot_records:
             # Look for coordinates in GeoData field (Field ID: cm98xmz0s2px4iu)
             coordinates = record.get('Coordinates')  # Display name
             if not coordinates:
@@ -3342,14 +3339,14 @@ def get_nocodb_map_data(partner: str = Query("all", description="Filter by Prima
         
         # Filter by partner if specified (case-insensitive)
         if partner and partner != 'all' and partner != '':
-            print(f"?? Filtering by partner: '{partner}'")
+            nocodb_logger.debug("Filtering by partner: '%s'", partner)
             filtered_plots = []
             for plot in plots:
                 plot_partner = plot.get('Primary_Project_Partner', '').strip()
                 if plot_partner and plot_partner.lower() == partner.lower():
                     filtered_plots.append(plot)
             plots = filtered_plots
-            print(f"?? After filtering: {len(plots)} plots")
+            nocodb_logger.debug("After filtering: %s plots", len(plots))
         
         # Calculate statistics
         stats = {
@@ -3361,25 +3358,22 @@ def get_nocodb_map_data(partner: str = Query("all", description="Filter by Prima
             "secured_sites": secured_sites
         }
             
-        return JSONResponse(content={
+        return etag_response(request, {
             "sites": plots,
             "stats": stats,  # Stats at the bottom as requested
             "count": len(plots),
             "partner_filter": partner if partner != "all" else None
-        })
+        }, cache_control=MAP_CACHE_CONTROL)
         
     except Exception as e:
-        import traceback
-        print(f"? NocoDB error: {str(e)}")
-        print("Full traceback:")
-        traceback.print_exc()
+        nocodb_logger.exception("NocoDB error loading map data: %s", str(e))
         return JSONResponse(
             content={"error": f"Failed to load map data: {str(e)}"}, 
             status_code=500
         )
 
 @app.get('/api/nocodb/map-stats', tags=["Map"])
-def get_nocodb_map_stats():
+def get_nocodb_map_stats(request: Request):
     """Get map statistics from NocoDB"""
     try:
         # NocoDB configuration
@@ -3392,17 +3386,20 @@ def get_nocodb_map_stats():
             "Content-Type": "application/json"
         }
         
-        # Fetch land plots data from NocoDB
-        api_url = f"{nocodb_api_url}/api/v2/tables/{land_plots_table_id}/records"
-        response = requests.get(api_url, headers=headers, params={"limit": 1000}, verify=False)
-        response.raise_for_status()
-        data = response.json()
+        plot_records = plots_mirror.all_rows()
+        if plot_records is None:
+            # Fetch land plots data from NocoDB
+            api_url = f"{nocodb_api_url}/api/v2/tables/{land_plots_table_id}/records"
+            response = nocodb_get_sync(api_url, headers=headers, params={"limit": 1000})
+            response.raise_for_status()
+            data = response.json()
+            plot_records = data.get('list', [])
         
         total_sites = 0
         countries = set()
         secured_sites = 0
         
-        for record in data.get('list', []):
+        for record in plot_records:
             # Look for coordinates in GeoData field
             coordinates = record.get('Coordinates')
             if not coordinates:
@@ -3426,7 +3423,7 @@ def get_nocodb_map_stats():
                 except (ValueError, AttributeError):
                     continue
         
-        return JSONResponse(content={
+        return etag_response(request, {
             "total_projects": total_sites,  # For compatibility with existing frontend
             "total_plots": total_sites,
             "sites_with_coords": total_sites,
@@ -3434,7 +3431,7 @@ def get_nocodb_map_stats():
             "totalSites": total_sites,
             "countries": len(countries),
             "securedSites": secured_sites
-        })
+        }, cache_control=MAP_CACHE_CONTROL)
         
     except Exception as e:
         return JSONResponse(
@@ -3443,61 +3440,44 @@ def get_nocodb_map_stats():
         )
 
 @app.get("/companies", tags=["Companies"])
-def get_companies_data(current_user: dict = Depends(get_current_user)):
-    """Get all companies data from companies table with summary statistics"""
+def get_companies_data(
+    limit: Optional[int] = Query(None, ge=1, le=COMPANIES_MAX_PAGE, description="Page size; omit to return every matching company"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. full_name,type"),
+    type: Optional[str] = Query(None, description="Exact company type"),
+    status: Optional[str] = Query(None, description="Exact company_status, e.g. Active"),
+    name: Optional[str] = Query(None, description="Substring of full_name or name"),
+    sort: str = Query("name", description="name, type, status or id"),
+    order: str = Query("asc", description="asc or desc"),
+    include_summary: bool = Query(True, description="Include the cached summary counts"),
+    current_user: dict = Depends(get_current_user),
+):
+    """Get companies from the companies table, paged and filtered in SQL, with summary statistics"""
     try:
-        # Connect to MySQL database directly
-        conn = mysql.connector.connect(
-            host=os.getenv("DB_HOST", "10.1.8.51"),
-            user=os.getenv("DB_USER", "s42project"),
-            password=os.getenv("DB_PASSWORD", "s42project"),
-            database=os.getenv("DB_NAME", "nocodb"),
-            port=int(os.getenv("DB_PORT", "3306")),
-        )
-        cursor = conn.cursor(dictionary=True)
-
-        # Get all companies (not just BUSINESS type)
-        cursor.execute('SELECT * FROM companies ORDER BY full_name')
-        companies_data = cursor.fetchall()
-
-        # Get summary statistics
-        cursor.execute('SELECT type, COUNT(*) as count FROM companies GROUP BY type')
-        type_stats = cursor.fetchall()
-
-        cursor.execute('SELECT company_status, COUNT(*) as count FROM companies WHERE company_status IS NOT NULL GROUP BY company_status ORDER BY count DESC')
-        status_stats = cursor.fetchall()
-
-        cursor.close()
-        conn.close()
-
-        # Return all raw company data (like SELECT *)
-        formatted_companies = []
-        for company in companies_data:
-            # Convert date objects to strings for JSON serialization
-            company_dict = {}
-            for key, value in company.items():
-                if hasattr(value, 'isoformat'):  # Handle date/datetime objects
-                    company_dict[key] = value.isoformat()
-                else:
-                    company_dict[key] = value
-            formatted_companies.append(company_dict)
-
-        # Calculate summary statistics
-        total_companies = len(formatted_companies)
-        active_companies = len([c for c in formatted_companies if c.get("company_status") == "Active"])
-        dissolved_companies = len([c for c in formatted_companies if c.get("company_status") == "Dissolved"])
+        field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        try:
+            companies, next_cursor = list_companies(
+                get_db,
+                fields=field_list,
+                company_type=type,
+                status=status,
+                name=name,
+                sort=sort,
+                descending=order.lower() == "desc",
+                limit=limit,
+                after=cursor,
+            )
+        except ValueError as e:
+            return JSONResponse(content={"error": str(e)}, status_code=400)
 
-        return JSONResponse(content={
-            "companies": formatted_companies,
-            "summary": {
-                "total_companies": total_companies,
-                "active_companies": active_companies,
-                "dissolved_companies": dissolved_companies,
-                "type_breakdown": {stat["type"]: stat["count"] for stat in type_stats},
-                "status_breakdown": {stat["company_status"]: stat["count"] for stat in status_stats}
-            },
-            "source": "MySQL companies table"
-        })
+        content = {
+            "companies": companies,
+            "next_cursor": next_cursor,
+            "source": "MySQL companies table",
+        }
+        if include_summary:
+            content["summary"] = companies_summary(get_db)
+        return JSONResponse(content=content)
 
     except mysql.connector.Error as e:
         return JSONResponse(
@@ -3532,32 +3512,9 @@ def get_hoyanger_wise_accounts(current_user: dict = Depends(get_current_user)):
         cursor.close()
         conn.close()
 
-        # Fetch live BTC exchange rates
-        try:
-            # Using CoinGecko API for live rates
-            response = requests.get('https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=gbp,nok,usd', timeout=5)
-            if response.status_code == 200:
-                rates_data = response.json()
-                btc_rates = {
-                    'GBP': rates_data['bitcoin']['gbp'],
-                    'NOK': rates_data['bitcoin']['nok'],
-                    'USD': rates_data['bitcoin']['usd']
-                }
-            else:
-                # Fallback to cached rates if API fails
-                btc_rates = {
-                    'GBP': 55000,
-                    'NOK': 650000,
-                    'USD': 60000
-                }
-        except Exception as e:
-            print(f"Error fetching live rates: {e}")
-            # Fallback to cached rates
-            btc_rates = {
-                'GBP': 55000,
-                'NOK': 650000,
-                'USD': 60000
-            }
+        # BTC rates are refreshed in the background; this never waits on the provider
+        rates_snapshot = rate_service.snapshot()
+        btc_rates = rates_snapshot["rates"]
 
         # Process accounts and calculate conversions
         processed_accounts = []
@@ -3587,8 +3544,11 @@ def get_hoyanger_wise_accounts(current_user: dict = Depends(get_current_user)):
             'btc_to_gbp': total_btc * btc_rates['GBP'],
             'btc_to_nok': total_btc * btc_rates['NOK'],
             'btc_to_usd': total_btc * btc_rates['USD'],
-            'rates_source': 'live' if 'rates_data' in locals() else 'cached',
-            'rates_timestamp': datetime.now().isoformat()
+            'rates_source': 'cached' if rates_snapshot["stale"] else 'live',
+            'rates_timestamp': rates_snapshot["fetched_at"] or datetime.now().isoformat(),
+            'rates_age_seconds': rates_snapshot["age_seconds"],
+            'rates_stale': rates_snapshot["stale"],
+            'rates_provider': rates_snapshot["provider"]
         }
 
         return JSONResponse(content={
@@ -3617,7 +3577,7 @@ def get_nocodb_comments(table_name: str, record_id: str, current_user: dict = De
     """
     Get comments for a specific record using NocoDB v1 API.
     """
-    print(f"DEBUG: get_nocodb_comments called with table_name={table_name}, record_id={record_id}")
+    comments_logger.debug("get_nocodb_comments called with table_name=%s, record_id=%s", table_name, record_id)
     try:
         # Get user-specific NocoDB token if available, otherwise use environment token
         user_token = None
@@ -3640,7 +3600,7 @@ def get_nocodb_comments(table_name: str, record_id: str, current_user: dict = De
                 cursor.close()
                 conn.close()
             except Exception as e:
-                print(f"Error fetching user token: {e}")
+                comments_logger.error("Error fetching user token: %s", e)
 
         # Use user token if available, otherwise fall back to environment token
         api_token = user_token or os.getenv("NOCODB_API_TOKEN")
@@ -3675,7 +3635,7 @@ def get_nocodb_comments(table_name: str, record_id: str, current_user: dict = De
         }
 
         # Make request to NocoDB v1 API
-        response = requests.get(api_url, headers=headers, params=params, verify=False)
+        response = nocodb_get_sync(api_url, headers=headers, params=params)
 
         if response.status_code == 200:
             comments_data = response.json()
@@ -3769,6 +3729,9 @@ class AuditRecord(BaseModel):
     timestamp: Optional[datetime] = None
     field_changed: Optional[str] = None
 
+class CommentsBatchRequest(BaseModel):
+    record_ids: list[str]
+
 @app.post("/nocodb/{table_name}/{record_id}/comments", tags=["nocodb"])
 def create_nocodb_comment(table_name: str, record_id: str, comment_data: CommentCreate, current_user: dict = Depends(get_current_user)):
     """
@@ -3796,7 +3759,7 @@ def create_nocodb_comment(table_name: str, record_id: str, comment_data: Comment
                 cursor.close()
                 conn.close()
             except Exception as e:
-                print(f"Error fetching user token: {e}")
+                comments_logger.error("Error fetching user token: %s", e)
 
         # Use user token if available, otherwise fall back to environment token
         api_token = user_token or os.getenv("NOCODB_API_TOKEN")
@@ -3832,7 +3795,7 @@ def create_nocodb_comment(table_name: str, record_id: str, comment_data: Comment
         }
 
         # Make request to NocoDB v1 API
-        response = requests.post(api_url, headers=headers, json=comment_payload, verify=False)
+        response = nocodb_post_sync(api_url, headers=headers, json=comment_payload)
 
         if response.status_code == 200:
             comment_result = response.json()
@@ -3856,6 +3819,105 @@ def create_nocodb_comment(table_name: str, record_id: str, comment_data: Comment
 
 # ===== COMMENTS MANAGEMENT ENDPOINTS =====
 
+COMMENTS_BATCH_MAX_RECORDS = 500
+COMMENTS_BATCH_CHUNK_SIZE = 100  # record ids per upstream where clause
+
+# Declared before POST /comments/{table_name}/{record_id} so "batch" is not taken as a record id
+@app.post("/comments/{table_name}/batch", tags=["comments"])
+async def get_comments_batch(table_name: str, batch: CommentsBatchRequest, current_user: dict = Depends(get_current_user)):
+    """Get comments for many records of one table at once, grouped by record_id"""
+    record_ids = list(dict.fromkeys(str(r).strip() for r in batch.record_ids if str(r).strip()))
+    if not record_ids:
+        return JSONResponse(content={"table": table_name, "comments": {}, "total_count": 0})
+    if len(record_ids) > COMMENTS_BATCH_MAX_RECORDS:
+        return JSONResponse(
+            content={"error": f"At most {COMMENTS_BATCH_MAX_RECORDS} record ids per request"},
+            status_code=400
+        )
+    if any(c in value for value in record_ids + [table_name] for c in ",()~"):
+        return JSONResponse(content={"error": "Invalid table name or record id"}, status_code=400)
+    
+    try:
+        user_email = current_user.get('email')
+        user_token = await run_in_threadpool(get_user_nocodb_token, user_email) if user_email else None
+        api_token = user_token or os.getenv("NOCODB_API_TOKEN")
+        
+        comments_table_id = os.getenv("NOCODB_COMMENTS_TABLE_ID")
+        if not comments_table_id:
+            return JSONResponse(
+                content={"error": "NOCODB_COMMENTS_TABLE_ID environment variable not set. Please create a comments table in NocoDB first."},
+                status_code=500
+            )
+        nocodb_api_url = os.getenv("NOCODB_API_URL")
+        if not nocodb_api_url:
+            return JSONResponse(
+                content={"error": "NOCODB_API_URL environment variable not set"},
+                status_code=500
+            )
+        if not api_token:
+            return JSONResponse(content={"error": "No API token available"}, status_code=500)
+        
+        api_url = f"{nocodb_api_url}/api/v2/tables/{comments_table_id}/records"
+        headers = nocodb_headers(api_token)
+        
+        # One filtered query per chunk of ids (a single query for typical selections)
+        chunks = [
+            record_ids[i:i + COMMENTS_BATCH_CHUNK_SIZE]
+            for i in range(0, len(record_ids), COMMENTS_BATCH_CHUNK_SIZE)
+        ]
+        results = await asyncio.gather(*[
+            nocodb_list_all(
+                api_url,
+                headers=headers,
+                params={
+                    "where": f"(table_name,eq,{table_name})~and(" + "~or".join(f"(record_id,eq,{record_id})" for record_id in chunk) + ")",
+                    "sort": "-created_at"
+                }
+            )
+            for chunk in chunks
+        ])
+        comments = [comment for chunk_rows in results for comment in chunk_rows]
+        
+        # Resolve display names once for the combined set of authors
+        email_to_name = await run_in_threadpool(
+            get_user_names_batch, [c.get("user_email") for c in comments if c.get("user_email")]
+        )
+        
+        grouped = {record_id: [] for record_id in record_ids}
+        for comment in comments:
+            comment_email = comment.get("user_email")
+            grouped.setdefault(str(comment.get("record_id")), []).append({
+                "id": comment.get("Id"),  # NocoDB auto-generated ID
+                "record_id": comment.get("record_id"),
+                "table_name": comment.get("table_name"),
+                "comment_text": comment.get("comment_text"),
+                "user_id": comment.get("user_id"),
+                "user_email": comment_email,
+                "user_name": email_to_name.get(comment_email, comment_email) if comment_email else "Unknown User",
+                "created_at": comment.get("created_at"),
+                "updated_at": comment.get("updated_at")
+            })
+        
+        return JSONResponse(content={
+            "table": table_name,
+            "comments": grouped,
+            "total_count": len(comments)
+        })
+    
+    except httpx.HTTPStatusError as e:
+        return JSONResponse(
+            content={
+                "error": f"NocoDB API error: {e.response.status_code} - {e.response.text}",
+                "url": str(e.request.url)
+            },
+            status_code=e.response.status_code
+        )
+    except Exception as e:
+        return JSONResponse(
+            content={"error": f"Unexpected error: {str(e)}"},
+            status_code=500
+        )
+
 @app.get("/comments/{table_name}/{record_id}", tags=["comments"])
 def get_comments(table_name: str, record_id: str, current_user: dict = Depends(get_current_user)):
     """Get all comments for a specific record from the comments table"""
@@ -3863,7 +3925,7 @@ def get_comments(table_name: str, record_id: str, current_user: dict = Depends(g
         # Get user's personal API token if available, otherwise use environment token
         user_token = None
         user_email = current_user.get('email')
-        print(f"?? Getting API token for user: {user_email}")
+        comments_logger.debug("Getting API token for user: %s", user_email)
 
         if user_email:
             try:
@@ -3879,11 +3941,11 @@ def get_comments(table_name: str, record_id: str, current_user: dict = Depends(g
                 user_data = cursor.fetchone()
                 if user_data and isinstance(user_data, dict) and user_data.get('nocodb_api'):
                     user_token = user_data['nocodb_api']
-                    print(f"? Using user-specific NocoDB token")
+                    comments_logger.debug("Using user-specific NocoDB token")
                 cursor.close()
                 conn.close()
             except Exception as e:
-                print(f"Error fetching user token: {e}")
+                comments_logger.error("Error fetching user token: %s", e)
         
         # Use user token if available, otherwise fall back to environment token
         api_token = user_token or os.getenv("NOCODB_API_TOKEN")
@@ -3925,7 +3987,7 @@ def get_comments(table_name: str, record_id: str, current_user: dict = Depends(g
         }
         
         # Make request to NocoDB API
-        response = requests.get(api_url, headers=headers, params=params, verify=False)
+        response = nocodb_get_sync(api_url, headers=headers, params=params)
 
         if response.status_code != 200:
             return JSONResponse(
@@ -3976,7 +4038,7 @@ def create_comment(table_name: str, record_id: str, comment_data: CommentCreate,
         user_token = None
         user_email = current_user.get('email')
         user_id = current_user.get('id', 'unknown')
-        print(f"?? Getting API token for user: {user_email}")
+        comments_logger.debug("Getting API token for user: %s", user_email)
 
         if user_email:
             try:
@@ -3992,11 +4054,11 @@ def create_comment(table_name: str, record_id: str, comment_data: CommentCreate,
                 user_data = cursor.fetchone()
                 if user_data and isinstance(user_data, dict) and user_data.get('nocodb_api'):
                     user_token = user_data['nocodb_api']
-                    print(f"? Using user-specific NocoDB token")
+                    comments_logger.debug("Using user-specific NocoDB token")
                 cursor.close()
                 conn.close()
             except Exception as e:
-                print(f"Error fetching user token: {e}")
+                comments_logger.error("Error fetching user token: %s", e)
         
         # Use user token if available, otherwise fall back to environment token
         api_token = user_token or os.getenv("NOCODB_API_TOKEN")
@@ -4043,7 +4105,7 @@ def create_comment(table_name: str, record_id: str, comment_data: CommentCreate,
         }
 
         # Make POST request to NocoDB API
-        response = requests.post(api_url, json=payload, headers=headers, verify=False)
+        response = nocodb_post_sync(api_url, json=payload, headers=headers)
 
         if response.status_code not in [200, 201]:
             return JSONResponse(
@@ -4077,225 +4139,176 @@ def create_comment(table_name: str, record_id: str, comment_data: CommentCreate,
 
 # ===== AUDIT TRAIL ENDPOINTS =====
 
-@app.get("/audit/{table_name}/{record_id}", tags=["audit"])
-def get_audit_trail(table_name: str, record_id: str, current_user: dict = Depends(get_current_user)):
-    """Get audit trail for a specific record using NocoDB's built-in audit functionality"""
-    try:
-        # Get user's personal API token if available, otherwise use environment token
-        user_token = None
-        user_email = current_user.get('email')
-        print(f"?? Getting API token for user: {user_email}")
+AUDIT_PAGE_SIZE_DEFAULT = 50
+AUDIT_PAGE_SIZE_MAX = 500
+# Upper bound on recordAuditList pages read when backfilling one record
+AUDIT_BACKFILL_MAX_PAGES = int(os.getenv("AUDIT_BACKFILL_MAX_PAGES", "100"))
 
-        if user_email:
-            try:
-                conn = mysql.connector.connect(
-                    host=os.getenv("DB_HOST", "10.1.8.51"),
-                    user=os.getenv("DB_USER", "s42project"),
-                    password=os.getenv("DB_PASSWORD", "s42project"),
-                    database=os.getenv("DB_NAME", "nocodb"),
-                    port=int(os.getenv("DB_PORT", "3306")),
+@app.get("/audit/{table_name}/{record_id}", tags=["audit"])
+def get_audit_trail(
+    table_name: str,
+    record_id: str,
+    limit: int = Query(AUDIT_PAGE_SIZE_DEFAULT, ge=1, le=AUDIT_PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get audit trail for a specific record from the local audit store (newest first, keyset paginated)"""
+    if canonical_audit_table(table_name) not in ("projects", "plots"):
+        return JSONResponse(
+            content={"error": f"Unknown table name: {table_name}. Supported: projects, plots, sites"},
+            status_code=400
+        )
+    
+    # History from before the local store is copied in on the first read of a record
+    history_complete = True
+    if not cursor:
+        try:
+            if not is_audit_backfilled(get_db, table_name, record_id):
+                copied = backfill_audit_trail(
+                    get_db, table_name, record_id, fetch_legacy_audit_rows(table_name, record_id)
                 )
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("SELECT nocodb_api FROM users WHERE email = %s", (user_email,))
-                user_data = cursor.fetchone()
-                if user_data and isinstance(user_data, dict) and user_data.get('nocodb_api'):
-                    user_token = user_data['nocodb_api']
-                    print(f"? Using user-specific NocoDB token")
-                cursor.close()
-                conn.close()
-            except Exception as e:
-                print(f"Error fetching user token: {e}")
-        
-        # Use user token if available, otherwise fall back to environment token
-        api_token = user_token or os.getenv("NOCODB_API_TOKEN")
-        
-        # Validate required environment variables
-        nocodb_api_url = os.getenv("NOCODB_API_URL")
-        base_id = os.getenv("NOCODB_BASE_ID")
-        if not nocodb_api_url or not base_id:
-            return JSONResponse(
-                content={"error": "NOCODB_API_URL or NOCODB_BASE_ID environment variables not set"},
-                status_code=500
-            )
-        if not api_token:
-            return JSONResponse(
-                content={"error": "No API token available"},
-                status_code=500
-            )
-        
-        # Map table names to NocoDB table IDs
-        table_id_map = {
-            "projects": os.getenv("NOCODB_PROJECTS_TABLE_ID"),
-            "plots": os.getenv("NOCODB_PLOTS_TABLE_ID"),
-            "sites": os.getenv("NOCODB_PLOTS_TABLE_ID"),  # plots and sites are the same table
-        }
-        
-        table_id = table_id_map.get(table_name.lower())
-        if not table_id:
-            return JSONResponse(
-                content={"error": f"Unknown table name: {table_name}. Supported: projects, plots, sites"},
-                status_code=400
-            )
-        
-        # Use NocoDB's internal audit API
-        audit_url = f"{nocodb_api_url}/api/v2/internal/nc/{base_id}"
-        params = {
-            'operation': 'recordAuditList',
-            'fk_model_id': table_id,
-            'row_id': record_id,
-            'cursor': ''
-        }
-        
-        # Use admin token for internal audit API (requires elevated permissions)
-        admin_api_token = os.getenv("NOCODB_API_TOKEN")  # Admin token from environment
-        
-        headers = {
-            "xc-token": admin_api_token,
-            "xc-auth": admin_api_token,
-            "Content-Type": "application/json",
-            "xc-gui": "true"
-        }
-        
-        # Make request to NocoDB internal audit API
-        response = requests.get(audit_url, params=params, headers=headers, verify=False)
+                audit_logger.info("Backfilled %s NocoDB audit entries for %s/%s", copied, table_name, record_id)
+        except Exception as e:
+            # Served without the old history; retried on the next read
+            audit_logger.warning("Audit backfill for %s/%s failed: %s", table_name, record_id, e)
+            history_complete = False
+    
+    try:
+        rows, next_cursor = fetch_audit_trail(get_db, table_name, record_id, limit=limit, before=cursor)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    except Exception as e:
+        return JSONResponse(
+            content={"error": f"Unexpected error: {str(e)}"},
+            status_code=500
+        )
+    
+    email_to_name = get_user_names_batch([row["user_email"] for row in rows if row.get("user_email")])
+    formatted_audit = []
+    for row in rows:
+        user_email = row.get("user_email")
+        formatted_audit.append({
+            "id": row["id"],
+            "record_id": row["record_id"],
+            "table_name": table_name,
+            "action": row["action"],
+            "old_values": row["old_values"],
+            "new_values": row["new_values"],
+            "field_changed": row["field_changed"],
+            "details": row.get("details"),
+            "user_id": row.get("user_id"),
+            "user_email": user_email,
+            "user_name": email_to_name.get(user_email, user_email) if user_email else "Unknown User",
+            "timestamp": row["timestamp"].replace(tzinfo=timezone.utc).isoformat(),
+            "source": row["source"]
+        })
+    
+    return JSONResponse(content={
+        "table": table_name,
+        "record_id": record_id,
+        "audit_trail": formatted_audit,
+        "total_count": len(formatted_audit),
+        "next_cursor": next_cursor,
+        "history_complete": history_complete,
+        "source": "local_audit_store"
+    })
 
-        if response.status_code != 200:
-            return JSONResponse(
-                content={
-                    "error": f"NocoDB audit API error: {response.status_code} - {response.text}",
-                    "url": audit_url
-                },
-                status_code=response.status_code
-            )
 
-        # Parse and format the audit data
-        data = response.json()
-        audit_entries = data.get("list", [])
-        
-        # Collect all unique emails for batch lookup
-        all_emails = []
-        for entry in audit_entries:
-            user_email = entry.get("user")
-            if user_email:
-                all_emails.append(user_email)
-        
-        # Batch query for all user names
-        email_to_name = get_user_names_batch(all_emails)
-        
-        # Format the response with user names from database
-        formatted_audit = []
-        for entry in audit_entries:
-            user_email = entry.get("user")
-            user_name = email_to_name.get(user_email, user_email) if user_email else "Unknown User"
-            
-            # Parse the details field which contains old_data and new_data
-            details = entry.get("details", {})
-            old_data = None
-            new_data = None
-            
-            if isinstance(details, str):
-                try:
-                    details = json.loads(details)
-                except:
-                    details = {}
-            
-            if isinstance(details, dict):
-                old_data = details.get("old_data")
-                new_data = details.get("new_data")
-            
-            formatted_audit.append({
-                "id": entry.get("id"),
-                "record_id": entry.get("row_id"),
-                "table_name": table_name,
-                "action": entry.get("op_type", "UPDATE"),
-                "old_values": old_data,
-                "new_values": new_data,
-                "details": entry.get("details"),  # Keep original details field
-                "user_id": None,  # Not provided in internal API
-                "user_email": user_email,
-                "user_name": user_name,
-                "timestamp": entry.get("created_at") or entry.get("updated_at"),
-                "ip_address": entry.get("ip"),
-                "description": entry.get("description")
-            })
-        
-        return JSONResponse(content={
-            "table": table_name,
-            "record_id": record_id,
-            "audit_trail": formatted_audit,
-            "total_count": len(formatted_audit),
-            "source": "nocodb_internal_api"
+def fetch_legacy_audit_rows(table_name: str, record_id: str) -> list:
+    """
+    A record's whole history from NocoDB's internal recordAuditList API, as
+    audit store rows, following the cursor across pages. Raises RuntimeError
+    when NocoDB cannot be asked, refuses, or the history does not end within
+    AUDIT_BACKFILL_MAX_PAGES pages - the record is then not marked backfilled.
+    """
+    nocodb_api_url = os.getenv("NOCODB_API_URL")
+    base_id = os.getenv("NOCODB_BASE_ID")
+    # The internal audit API requires the admin token
+    admin_api_token = os.getenv("NOCODB_API_TOKEN")
+    if not nocodb_api_url or not base_id or not admin_api_token:
+        raise RuntimeError("NOCODB_API_URL, NOCODB_BASE_ID or NOCODB_API_TOKEN environment variables not set")
+    
+    # Map table names to NocoDB table IDs; plots and sites are the same table
+    table_id = {
+        "projects": os.getenv("NOCODB_PROJECTS_TABLE_ID"),
+        "plots": os.getenv("NOCODB_PLOTS_TABLE_ID"),
+    }.get(canonical_audit_table(table_name))
+    if not table_id:
+        raise RuntimeError(f"No NocoDB table id configured for {table_name}")
+    
+    audit_url = f"{nocodb_api_url}/api/v2/internal/nc/{base_id}"
+    headers = {
+        "xc-token": admin_api_token,
+        "xc-auth": admin_api_token,
+        "Content-Type": "application/json",
+        "xc-gui": "true"
+    }
+    entries = []
+    seen_ids = set()
+    page_cursor = ''
+    for _ in range(AUDIT_BACKFILL_MAX_PAGES):
+        params = {
+            'operation': 'recordAuditList',
+            'fk_model_id': table_id,
+            'row_id': record_id,
+            'cursor': page_cursor
+        }
+        response = nocodb_get_sync(audit_url, params=params, headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"NocoDB audit API error: {response.status_code} - {response.text}")
+        data = response.json()
+        page_info = data.get("pageInfo") or {}
+        
+        # A page that brings nothing new means the history has been read to the end
+        page = [e for e in data.get("list", []) if e.get("id") is None or e.get("id") not in seen_ids]
+        seen_ids.update(e.get("id") for e in page if e.get("id") is not None)
+        entries.extend(page)
+        if not page or page_info.get("isLastPage") is True:
+            break
+        
+        next_cursor = page_info.get("nextCursor") or page_info.get("cursor") or page[-1].get("id")
+        if not next_cursor:
+            if page_info.get("isLastPage") is False:
+                raise RuntimeError(f"NocoDB audit API returned no cursor after {len(entries)} entries")
+            break
+        page_cursor = str(next_cursor)
+    else:
+        raise RuntimeError(f"NocoDB audit history longer than {AUDIT_BACKFILL_MAX_PAGES} pages")
+    
+    rows = []
+    for entry in entries:
+        # The details field contains old_data and new_data
+        details = entry.get("details") or {}
+        parsed = details
+        if isinstance(parsed, str):
+            try:
+                parsed = json.loads(parsed)
+            except ValueError:
+                parsed = {}
+        if not isinstance(parsed, dict):
+            parsed = {}
+        new_data = parsed.get("new_data")
+        rows.append({
+            "record_id": entry.get("row_id") or record_id,
+            "table_name": table_name,
+            "action": entry.get("op_type") or "UPDATE",
+            "old_values": parsed.get("old_data"),
+            "new_values": new_data,
+            "field_changed": list(new_data) if isinstance(new_data, dict) else None,
+            "user_id": None,  # Not provided in internal API
+            "user_email": entry.get("user"),
+            "timestamp": entry.get("created_at") or entry.get("updated_at"),
+            "details": details or None,
         })
-
-    except Exception as e:
-        return JSONResponse(
-            content={"error": f"Unexpected error: {str(e)}"},
-            status_code=500
-        )
+    return rows
 
 
 @app.post("/audit/{table_name}/{record_id}", tags=["audit"])
 def create_audit_entry(table_name: str, record_id: str, audit_data: dict, current_user: dict = Depends(get_current_user)):
     """Create a new audit entry for a specific record (typically called by webhooks or application logic)"""
     try:
-        # Get user's personal API token if available, otherwise use environment token
-        user_token = None
         user_email = current_user.get('email')
         user_id = current_user.get('id', 'unknown')
-        print(f"?? Getting API token for user: {user_email}")
-
-        if user_email:
-            try:
-                conn = mysql.connector.connect(
-                    host=os.getenv("DB_HOST", "10.1.8.51"),
-                    user=os.getenv("DB_USER", "s42project"),
-                    password=os.getenv("DB_PASSWORD", "s42project"),
-                    database=os.getenv("DB_NAME", "nocodb"),
-                    port=int(os.getenv("DB_PORT", "3306")),
-                )
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("SELECT nocodb_api FROM users WHERE email = %s", (user_email,))
-                user_data = cursor.fetchone()
-                if user_data and isinstance(user_data, dict) and user_data.get('nocodb_api'):
-                    user_token = user_data['nocodb_api']
-                    print(f"? Using user-specific NocoDB token")
-                cursor.close()
-                conn.close()
-            except Exception as e:
-                print(f"Error fetching user token: {e}")
-        
-        # Use user token if available, otherwise fall back to environment token
-        api_token = user_token or os.getenv("NOCODB_API_TOKEN")
-        
-        # Get audit table ID from environment
-        audit_table_id = os.getenv("NOCODB_AUDIT_TABLE_ID")
-        if not audit_table_id:
-            return JSONResponse(
-                content={"error": "NOCODB_AUDIT_TABLE_ID environment variable not set. Please create an audit table in NocoDB first."},
-                status_code=500
-            )
-        
-        # Validate required environment variables
-        nocodb_api_url = os.getenv("NOCODB_API_URL")
-        if not nocodb_api_url:
-            return JSONResponse(
-                content={"error": "NOCODB_API_URL environment variable not set"},
-                status_code=500
-            )
-        if not api_token:
-            return JSONResponse(
-                content={"error": "No API token available"},
-                status_code=500
-            )
-        
-        # Construct NocoDB API v2 URL for creating audit entry
-        api_url = f"{nocodb_api_url}/api/v2/tables/{audit_table_id}/records"
-        
-        # Set up headers for NocoDB API
-        headers = {
-            "xc-token": api_token,
-            "Content-Type": "application/json"
-        }
 
         # Prepare audit payload
         payload = {
@@ -4306,29 +4319,17 @@ def create_audit_entry(table_name: str, record_id: str, audit_data: dict, curren
             "new_values": audit_data.get("new_values"),
             "user_id": str(user_id),
             "user_email": user_email or "unknown",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "field_changed": audit_data.get("field_changed")
         }
 
-        # Make POST request to NocoDB API
-        response = requests.post(api_url, json=payload, headers=headers, verify=False)
-
-        if response.status_code not in [200, 201]:
-            return JSONResponse(
-                content={
-                    "error": f"NocoDB API error: {response.status_code} - {response.text}",
-                    "url": api_url
-                },
-                status_code=response.status_code
-            )
+        entry_id = insert_audit_rows(get_db, [payload], "api")
 
-        # Parse and return the response
-        data = response.json()
         return JSONResponse(content={
             "table": table_name,
             "record_id": record_id,
             "audit_entry_created": {
-                "id": data.get("Id"),
+                "id": entry_id,
                 "action": payload["action"],
                 "user_email": user_email,
                 "timestamp": payload["timestamp"]
@@ -4345,18 +4346,53 @@ def create_audit_entry(table_name: str, record_id: str, audit_data: dict, curren
 
 # ===== WEBHOOK ENDPOINTS FOR AUDIT TRAILS =====
 
+async def write_audit_batch(rows: list):
+    """Bulk-insert a batch of webhook audit rows into the local audit store"""
+    await run_in_threadpool(insert_audit_rows, get_db, rows, "webhook")
+    audit_logger.debug("Audit entries stored: %s", len(rows))
+
+audit_pipeline = AuditPipeline(write_audit_batch)
+
+WEBHOOK_SYSTEM_USER = ("webhook", "system@nocodb-webhook.com")
+
+
+def webhook_actor(payload: dict, row: dict) -> tuple:
+    """
+    (user_id, user_email) of whoever made the change, from the payload's user
+    or the row's UpdatedBy/CreatedBy system fields; the webhook system user
+    when NocoDB sent neither
+    """
+    data = payload.get("data") or {}
+    for candidate in (payload.get("user"), data.get("user"), row.get("UpdatedBy"), row.get("CreatedBy")):
+        if isinstance(candidate, dict) and candidate.get("email"):
+            return str(candidate.get("id") or candidate["email"]), candidate["email"]
+        if isinstance(candidate, str) and "@" in candidate:
+            return candidate, candidate
+    return WEBHOOK_SYSTEM_USER
+
+
+async def apply_webhook_caches(table: str, table_name: str, action: str, row: dict):
+    """Keep the Projects / Land Plots mirror and cached responses current; runs after the webhook is acknowledged"""
+    try:
+        await apply_mirror_event(table, action, row)
+        await run_in_threadpool(invalidate_responses, table=table)
+        if table_name.strip().lower() == "companies":
+            await run_in_threadpool(invalidate_companies)
+    except Exception as e:
+        audit_logger.error("Webhook cache update for %s failed: %s", table_name, str(e))
+
 @app.post("/webhooks/nocodb/audit", tags=["webhooks"])
 async def nocodb_audit_webhook(request: Request):
-    """Webhook endpoint to receive NocoDB events and create audit entries"""
+    """Webhook endpoint to receive NocoDB events; audit rows are queued and written in batches"""
     try:
         # Get the webhook payload
         payload = await request.json()
-        print(f"?? Received NocoDB webhook: {json.dumps(payload, indent=2)}")
 
         # Extract relevant data from webhook
         event_type = payload.get("type")  # AFTER_INSERT, AFTER_UPDATE, AFTER_DELETE
         table_name = payload.get("data", {}).get("table_name")
         record_data = payload.get("data", {}).get("row", {})
+        audit_logger.debug("Received NocoDB webhook: %s %s", event_type, table_name)
 
         if not table_name or not record_data:
             return JSONResponse(content={"status": "ignored", "reason": "Missing table_name or row data"})
@@ -4379,130 +4415,104 @@ async def nocodb_audit_webhook(request: Request):
         # This is a simplified version - in practice, you'd need to fetch the previous state
         old_values = payload.get("data", {}).get("previous_row")
         new_values = record_data
+        actor_id, actor_email = webhook_actor(payload, record_data)
 
-        # Prepare audit data
-        audit_data = {
-            "action": action,
-            "old_values": old_values,
-            "new_values": new_values,
-            "field_changed": payload.get("data", {}).get("changed_columns", [])
-        }
-
-        # Get audit table ID from environment
-        audit_table_id = os.getenv("NOCODB_AUDIT_TABLE_ID")
-        if not audit_table_id:
-            print("??  NOCODB_AUDIT_TABLE_ID not set, skipping audit entry")
-            return JSONResponse(content={"status": "skipped", "reason": "Audit table not configured"})
-
-        # Get API token (use environment token for webhooks)
-        api_token = os.getenv("NOCODB_API_TOKEN")
-        nocodb_api_url = os.getenv("NOCODB_API_URL")
-
-        if not api_token or not nocodb_api_url:
-            print("??  NocoDB API credentials not set, skipping audit entry")
-            return JSONResponse(content={"status": "skipped", "reason": "API credentials not configured"})
-
-        # Create audit entry
-        api_url = f"{nocodb_api_url}/api/v2/tables/{audit_table_id}/records"
-        headers = {
-            "xc-token": api_token,
-            "Content-Type": "application/json"
-        }
-
-        audit_payload = {
+        queued = await audit_pipeline.enqueue({
             "record_id": record_id,
             "table_name": table_name,
             "action": action,
             "old_values": json.dumps(old_values) if old_values else None,
             "new_values": json.dumps(new_values) if new_values else None,
-            "user_id": "webhook",  # Could be enhanced to track actual user
-            "user_email": "system@nocodb-webhook.com",
-            "timestamp": datetime.now().isoformat(),
-            "field_changed": json.dumps(audit_data.get("field_changed", []))
-        }
-
-        response = requests.post(api_url, json=audit_payload, headers=headers, verify=False)
+            "user_id": actor_id,
+            "user_email": actor_email,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "field_changed": json.dumps(payload.get("data", {}).get("changed_columns", []))
+        })
 
-        if response.status_code in [200, 201]:
-            print(f"? Audit entry created for {table_name}/{record_id} - {action}")
-            return JSONResponse(content={"status": "success", "audit_entry_created": True})
-        else:
-            print(f"? Failed to create audit entry: {response.status_code} - {response.text}")
-            return JSONResponse(content={"status": "error", "reason": "Failed to create audit entry"})
+        # The mirror and cache updates run after the response, so NocoDB is not kept waiting
+        caches = BackgroundTask(
+            apply_webhook_caches, payload.get("data", {}).get("table_id") or table_name, table_name, action, record_data
+        )
+        if not queued:
+            # Dead-lettered for replay: acknowledge so NocoDB does not retry and duplicate the event
+            audit_logger.warning("Audit queue full, dead-lettered %s/%s - %s", table_name, record_id, action)
+            return JSONResponse(
+                content={"status": "dead_lettered", "audit_entry_queued": False},
+                status_code=202,
+                background=caches,
+            )
+        return JSONResponse(content={"status": "queued", "audit_entry_queued": True}, background=caches)
 
     except Exception as e:
-        print(f"? Webhook error: {str(e)}")
+        audit_logger.error("Webhook error: %s", str(e))
         return JSONResponse(
             content={"status": "error", "reason": str(e)},
             status_code=500
         )
 
+@app.get("/webhooks/nocodb/audit/metrics", tags=["webhooks"])
+def audit_pipeline_metrics(current_user: dict = Depends(get_current_user)):
+    """Queue depth and throughput counters of the audit ingestion pipeline"""
+    return audit_pipeline.metrics()
+
 # Management Accounts API endpoints
 @app.get("/management-accounts", tags=["management-accounts"])
-async def get_management_accounts():
+async def get_management_accounts(request: Request):
     """Get all management accounts data including companies, accounts, directors, and documents"""
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST'),
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            database='management_accounts',
-            port=int(os.getenv('DB_PORT', '3306'))
-        )
-        cursor = connection.cursor(dictionary=True)
-
-        # Fetch companies
-        cursor.execute('SELECT * FROM companies ORDER BY full_name ASC, name ASC')
-        companies = cursor.fetchall()
-
-        # Fetch accounts with company information, sorted by balance descending
-        cursor.execute("""
-            SELECT a.*, c.full_name as company_name, c.name as company_short_name
-            FROM accounts a 
-            LEFT JOIN companies c ON a.company_id = c.id 
-            ORDER BY a.balance DESC
-        """)
-        accounts = cursor.fetchall()
+        # Sections are read concurrently in the threadpool, off the event loop
+        sections = await fetch_management_sections()
+        return etag_response(request, sections)
 
-        # Fetch directors (if table exists)
-        directors = []
-        try:
-            cursor.execute('SELECT * FROM directors ORDER BY name ASC')
-            directors = cursor.fetchall()
-        except mysql.connector.Error:
-            print('Directors table not found, creating empty array')
+    except Exception as e:
+        accounts_logger.error("Management accounts error: %s", str(e))
+        return JSONResponse(
+            content={"error": str(e)},
+            status_code=500
+        )
 
-        # Fetch documents (if table exists)
-        documents = []
-        try:
-            cursor.execute('SELECT * FROM documents ORDER BY uploaded_at DESC')
-            documents = cursor.fetchall()
-        except mysql.connector.Error:
-            print('Documents table not found, creating empty array')
+@app.get("/management-accounts/summary", tags=["management-accounts"])
+async def get_management_accounts_summary(request: Request):
+    """Row counts per section and account balances per currency, for rendering the dashboard first"""
+    try:
+        summary = await run_in_threadpool(management_accounts_summary)
+        return etag_response(request, summary)
 
-        cursor.close()
-        connection.close()
+    except Exception as e:
+        accounts_logger.error("Management accounts summary error: %s", str(e))
+        return JSONResponse(
+            content={"error": str(e)},
+            status_code=500
+        )
 
-        return {
-            "companies": companies,
-            "accounts": accounts,
-            "directors": directors,
-            "documents": documents
-        }
+@app.get("/management-accounts/{section}", tags=["management-accounts"])
+async def get_management_accounts_section(
+    section: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit for the whole section"),
+    offset: int = Query(0, ge=0),
+):
+    """One section (companies, accounts, directors or documents), optionally paged"""
+    if section not in MANAGEMENT_SECTIONS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown section '{section}'. Use one of: {', '.join(MANAGEMENT_SECTIONS)}",
+        )
+    try:
+        rows, next_offset = await run_in_threadpool(fetch_management_section, section, limit, offset)
+        return etag_response(request, {section: rows, "next_offset": next_offset})
 
     except Exception as e:
-        print(f"? Management accounts error: {str(e)}")
+        accounts_logger.error("Management accounts %s error: %s", section, str(e))
         return JSONResponse(
             content={"error": str(e)},
             status_code=500
         )
 
 @app.post("/management-accounts/companies", tags=["management-accounts"])
-async def create_company(request: Request):
-    """Create a new company"""
+def create_company(body: dict = Body(...)):
+    """Create a new company (plain def: the MySQL insert runs in the threadpool)"""
     try:
-        body = await request.json()
-        
         connection = mysql.connector.connect(
             host=os.getenv('DB_HOST'),
             user=os.getenv('DB_USER'),
@@ -4534,18 +4544,16 @@ async def create_company(request: Request):
         return {"id": new_id, "message": "Company created successfully"}
 
     except Exception as e:
-        print(f"? Create company error: {str(e)}")
+        accounts_logger.error("Create company error: %s", str(e))
         return JSONResponse(
             content={"error": str(e)},
             status_code=500
         )
 
 @app.post("/management-accounts/accounts", tags=["management-accounts"])
-async def create_account(request: Request):
-    """Create a new account"""
+def create_account(body: dict = Body(...)):
+    """Create a new account (plain def: the MySQL insert runs in the threadpool)"""
     try:
-        body = await request.json()
-        
         connection = mysql.connector.connect(
             host=os.getenv('DB_HOST'),
             user=os.getenv('DB_USER'),
@@ -4576,7 +4584,7 @@ async def create_account(request: Request):
         return {"id": new_id, "message": "Account created successfully"}
 
     except Exception as e:
-        print(f"? Create account error: {str(e)}")
+        accounts_logger.error("Create account error: %s", str(e))
         return JSONResponse(
             content={"error": str(e)},
             status_code=500
@@ -4617,40 +4625,38 @@ class BulkPageOrderUpdate(BaseModel):
 
 # Endpoint to persist page order
 @app.put("/pages/reorder", tags=["pages"])
-async def reorder_pages(order_update: BulkPageOrderUpdate):
-    """Update the display order of multiple pages."""
+def reorder_pages(order_update: BulkPageOrderUpdate):
+    """Update the display order of multiple pages in a single statement."""
+    # Last entry wins if the same page appears twice
+    new_order = {update.page_id: update.display_order for update in order_update.updates}
+    if not new_order:
+        return {"message": "Page order updated successfully"}
+    
     try:
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
         
-        # Debug: Check if column exists
-        cursor.execute("SHOW COLUMNS FROM pages LIKE 'display_order'")
-        column_check = cursor.fetchone()
-        print(f"?? display_order column check: {column_check}")
-        
-        if not column_check:
-            print("? display_order column does NOT exist! Running migration...")
-            try:
-                cursor.execute("ALTER TABLE pages ADD COLUMN display_order INT DEFAULT 0 AFTER description")
-                conn.commit()
-                print("? Added display_order column")
-            except Exception as e:
-                print(f"? Failed to add column: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Column doesn't exist and migration failed: {str(e)}")
-        
-        for update in order_update.updates:
-            sql = "UPDATE pages SET display_order = %s WHERE id = %s AND is_active = TRUE"
-            params = (update.display_order, update.page_id)
-            print(f"?? Executing: {sql} with params {params}")
-            cursor.execute(sql, params)
-            
-        conn.commit()
+        # One set-based UPDATE: CASE maps each id to its new position
+        case_sql = " ".join(["WHEN %s THEN %s"] * len(new_order))
+        id_placeholders = ",".join(["%s"] * len(new_order))
+        params = [value for item in new_order.items() for value in item] + list(new_order.keys())
+        try:
+            cursor.execute(f"""
+                UPDATE pages
+                SET display_order = CASE id {case_sql} ELSE display_order END
+                WHERE id IN ({id_placeholders}) AND is_active = TRUE
+            """, params)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        invalidate_pages()
         cursor.close()
         conn.close()
-        print(f"? Reordered pages: {[u.page_id for u in order_update.updates]}")
+        access_logger.info("Reordered pages: %s", [u.page_id for u in order_update.updates])
         return {"message": "Page order updated successfully"}
     except Exception as e:
-        print(f"? Error reordering pages: {str(e)}")
+        access_logger.error("Error reordering pages: %s", str(e))
         if 'conn' in locals() and 'cursor' in locals():
             try:
                 cursor.close()
@@ -4693,11 +4699,10 @@ async def create_page(page: PageCreate):
             "description": page.description
         }
         
-        response = requests.post(
+        response = await nocodb_post(
             f"{config['base_url']}/api/v2/tables/{PAGES_TABLE_ID}/records",
             headers=config["headers"],
-            json=page_data,
-            verify=False
+            json=page_data
         )
         
         if response.status_code != 200:
@@ -4706,15 +4711,16 @@ async def create_page(page: PageCreate):
         result = response.json()
         page_id = result.get("Id") or result.get("id")
         
-        print(f"? Created page: {page.name} (ID: {page_id})")
+        access_logger.info("Created page: %s (ID: %s)", page.name, page_id)
         
+        await run_in_threadpool(invalidate_pages)
         return {"id": page_id, "message": "Page created successfully"}
         
-    except requests.RequestException as e:
-        print(f"? API error creating page: {str(e)}")
+    except httpx.HTTPError as e:
+        access_logger.error("API error creating page: %s", str(e))
         raise HTTPException(status_code=500, detail=f"API error: {str(e)}")
     except Exception as e:
-        print(f"? Error creating page: {str(e)}")
+        access_logger.error("Error creating page: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/pages", tags=["pages"])
@@ -4723,47 +4729,47 @@ async def get_pages():
     try:
         config = get_nocodb_connection()
         
-        # Get all pages
-        response = requests.get(
-            f"{config['base_url']}/api/v2/tables/{PAGES_TABLE_ID}/records",
-            headers=config["headers"],
-            params={"limit": 1000},
-            verify=False
+        # Get all pages and all permission rows concurrently (two bulk reads, not one per page)
+        pages_result, permissions_result = await asyncio.gather(
+            nocodb_list_all(
+                f"{config['base_url']}/api/v2/tables/{PAGES_TABLE_ID}/records",
+                headers=config["headers"]
+            ),
+            nocodb_list_all(
+                f"{config['base_url']}/api/v2/tables/{PAGE_PERMISSIONS_TABLE_ID}/records",
+                headers=config["headers"],
+                params={"fields": "page_id,group_id"}
+            ),
+            return_exceptions=True
         )
         
-        if response.status_code != 200:
-            raise HTTPException(status_code=500, detail=f"Failed to fetch pages: {response.text}")
+        if isinstance(pages_result, httpx.HTTPStatusError):
+            raise HTTPException(status_code=500, detail=f"Failed to fetch pages: {pages_result.response.text}")
+        if isinstance(pages_result, BaseException):
+            raise pages_result
+        pages = pages_result
         
-        pages_data = response.json()
-        pages = pages_data.get("list", [])
+        # Group the permission rows by page
+        group_ids_by_page = {}
+        if isinstance(permissions_result, BaseException):
+            access_logger.error("Error fetching page permissions: %s", str(permissions_result))
+        else:
+            for permission in permissions_result:
+                if permission.get("group_id"):
+                    group_ids_by_page.setdefault(str(permission.get("page_id")), []).append(permission.get("group_id"))
         
-        # For each page, get its permissions (groups that can access it)
         for page in pages:
             page_id = page.get("Id") or page.get("id")
-            
-            # Get page permissions
-            perm_response = requests.get(
-                f"{config['base_url']}/api/v2/tables/{PAGE_PERMISSIONS_TABLE_ID}/records",
-                headers=config["headers"],
-                params={"where": f"(page_id,eq,{page_id})", "limit": 100},
-                verify=False
-            )
-            
-            if perm_response.status_code == 200:
-                permissions = perm_response.json().get("list", [])
-                page["group_ids"] = [p.get("group_id") for p in permissions if p.get("group_id")]
-                page["allowed_groups"] = []  # Will be populated with group names in frontend
-            else:
-                page["group_ids"] = []
-                page["allowed_groups"] = []
+            page["group_ids"] = group_ids_by_page.get(str(page_id), [])
+            page["allowed_groups"] = []  # Will be populated with group names in frontend
         
         return pages
         
-    except requests.RequestException as e:
-        print(f"? API error fetching pages: {str(e)}")
+    except httpx.HTTPError as e:
+        access_logger.error("API error fetching pages: %s", str(e))
         raise HTTPException(status_code=500, detail=f"API error: {str(e)}")
     except Exception as e:
-        print(f"? Error fetching pages: {str(e)}")
+        access_logger.error("Error fetching pages: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/pages/user/{user_email}", tags=["pages"])
@@ -4773,11 +4779,10 @@ async def get_user_pages(user_email: str):
         config = get_nocodb_connection()
         
         # First, get the user's groups
-        user_response = requests.get(
+        user_response = await nocodb_get(
             f"{config['base_url']}/api/v2/tables/{USERS_TABLE_ID}/records",
             headers=config["headers"],
-            params={"where": f"(email,eq,{user_email})", "limit": 1},
-            verify=False
+            params={"where": f"(email,eq,{user_email})", "limit": 1}
         )
         
         if user_response.status_code != 200:
@@ -4795,11 +4800,10 @@ async def get_user_pages(user_email: str):
         
         # Get all page permissions for these groups
         group_filter = " or ".join([f"(group_id,eq,{gid})" for gid in user_groups])
-        perm_response = requests.get(
+        perm_response = await nocodb_get(
             f"{config['base_url']}/api/v2/tables/{PAGE_PERMISSIONS_TABLE_ID}/records",
             headers=config["headers"],
-            params={"where": f"({group_filter})", "limit": 1000},
-            verify=False
+            params={"where": f"({group_filter})", "limit": 1000}
         )
         
         if perm_response.status_code != 200:
@@ -4813,11 +4817,10 @@ async def get_user_pages(user_email: str):
         
         # Get the actual page details
         page_filter = " or ".join([f"(Id,eq,{pid})" for pid in accessible_page_ids])
-        pages_response = requests.get(
+        pages_response = await nocodb_get(
             f"{config['base_url']}/api/v2/tables/{PAGES_TABLE_ID}/records",
             headers=config["headers"],
-            params={"where": f"({page_filter})", "limit": 1000},
-            verify=False
+            params={"where": f"({page_filter})", "limit": 1000}
         )
         
         if pages_response.status_code != 200:
@@ -4830,15 +4833,15 @@ async def get_user_pages(user_email: str):
         
         return pages
         
-    except requests.RequestException as e:
-        print(f"? API error fetching user pages: {str(e)}")
+    except httpx.HTTPError as e:
+        access_logger.error("API error fetching user pages: %s", str(e))
         raise HTTPException(status_code=500, detail=f"API error: {str(e)}")
     except Exception as e:
-        print(f"? Error fetching user pages: {str(e)}")
+        access_logger.error("Error fetching user pages: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/pages/{page_id}/permissions", tags=["pages"])
-async def update_page_permissions(page_id: int, permission_update: PagePermissionUpdate):
+def update_page_permissions(page_id: int, permission_update: PagePermissionUpdate):
     """Update which groups can access a specific page - MySQL version"""
     try:
         conn = get_db()
@@ -4874,15 +4877,16 @@ async def update_page_permissions(page_id: int, permission_update: PagePermissio
                 )
         
         conn.commit()
+        invalidate_pages()
         cursor.close()
         conn.close()
         
-        print(f"? Updated permissions for page {page_id}: groups {permission_update.group_ids}")
+        access_logger.info("Updated permissions for page %s: groups %s", page_id, permission_update.group_ids)
         
         return {"message": "Page permissions updated successfully"}
         
     except Exception as e:
-        print(f"? Error updating page permissions: {str(e)}")
+        access_logger.error("Error updating page permissions: %s", str(e))
         if 'conn' in locals():
             conn.rollback()
             cursor.close()
@@ -4890,7 +4894,7 @@ async def update_page_permissions(page_id: int, permission_update: PagePermissio
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/pages/{page_id}", tags=["pages"])
-async def update_page(page_id: int, page_update: PageUpdate):
+def update_page(page_id: int, page_update: PageUpdate):
     """Update a page using MySQL directly"""
     try:
         conn = get_db()
@@ -4930,10 +4934,10 @@ async def update_page(page_id: int, page_update: PageUpdate):
         
         # Execute the update
         update_query = f"UPDATE pages SET {', '.join(update_fields)} WHERE id = %s AND is_active = TRUE"
-        print(f"?? UPDATE query: {update_query}")
-        print(f"?? Values: {values}")
+        access_logger.debug("UPDATE query: %s", update_query)
+        access_logger.debug("Values: %s", values)
         cursor.execute(update_query, values)
-        print(f"?? Rows affected: {cursor.rowcount}")
+        access_logger.debug("Rows affected: %s", cursor.rowcount)
         
         if cursor.rowcount == 0:
             cursor.close()
@@ -4941,16 +4945,17 @@ async def update_page(page_id: int, page_update: PageUpdate):
             raise HTTPException(status_code=404, detail="Page not found")
         
         conn.commit()
+        invalidate_pages()
         cursor.close()
         conn.close()
         
-        print(f"? Updated page {page_id}")
+        access_logger.info("Updated page %s", page_id)
         return {"message": "Page updated successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"? Error updating page: {str(e)}")
+        access_logger.error("Error updating page: %s", str(e))
         if 'conn' in locals() and 'cursor' in locals():
             try:
                 conn.rollback()
@@ -4967,42 +4972,40 @@ async def delete_page(page_id: int):
         config = get_nocodb_connection()
         
         # Delete page permissions first
-        perm_response = requests.get(
+        perm_response = await nocodb_get(
             f"{config['base_url']}/api/v2/tables/{PAGE_PERMISSIONS_TABLE_ID}/records",
             headers=config["headers"],
-            params={"where": f"(page_id,eq,{page_id})", "limit": 1000},
-            verify=False
+            params={"where": f"(page_id,eq,{page_id})", "limit": 1000}
         )
         
         if perm_response.status_code == 200:
             permissions = perm_response.json().get("list", [])
             for perm in permissions:
                 perm_id = perm.get("Id") or perm.get("id")
-                requests.delete(
+                await nocodb_delete(
                     f"{config['base_url']}/api/v2/tables/{PAGE_PERMISSIONS_TABLE_ID}/records/{perm_id}",
-                    headers=config["headers"],
-                    verify=False
+                    headers=config["headers"]
                 )
         
         # Delete the page
-        delete_response = requests.delete(
+        delete_response = await nocodb_delete(
             f"{config['base_url']}/api/v2/tables/{PAGES_TABLE_ID}/records/{page_id}",
-            headers=config["headers"],
-            verify=False
+            headers=config["headers"]
         )
         
         if delete_response.status_code not in [200, 404]:
             raise HTTPException(status_code=500, detail=f"Failed to delete page: {delete_response.text}")
         
-        print(f"? Deleted page {page_id}")
+        access_logger.info("Deleted page %s", page_id)
         
+        await run_in_threadpool(invalidate_pages)
         return {"message": "Page deleted successfully"}
         
-    except requests.RequestException as e:
-        print(f"? API error deleting page: {str(e)}")
+    except httpx.HTTPError as e:
+        access_logger.error("API error deleting page: %s", str(e))
         raise HTTPException(status_code=500, detail=f"API error: {str(e)}")
     except Exception as e:
-        print(f"? Error deleting page: {str(e)}")
+        access_logger.error("Error deleting page: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/pages/initialize", tags=["pages"])
@@ -5012,11 +5015,10 @@ async def initialize_default_pages():
         config = get_nocodb_connection()
         
         # First, ensure public group exists
-        public_group_response = requests.get(
+        public_group_response = await nocodb_get(
             f"{config['base_url']}/api/v2/tables/{GROUPS_TABLE_ID}/records",
             headers=config["headers"],
-            params={"where": "(name,eq,public)", "limit": 1},
-            verify=False
+            params={"where": "(name,eq,public)", "limit": 1}
         )
         
         public_group_id = None
@@ -5033,11 +5035,10 @@ async def initialize_default_pages():
                 "permissions": '{"access_level": "basic"}'
             }
             
-            group_response = requests.post(
+            group_response = await nocodb_post(
                 f"{config['base_url']}/api/v2/tables/{GROUPS_TABLE_ID}/records",
                 headers=config["headers"],
-                json=group_data,
-                verify=False
+                json=group_data
             )
             
             if group_response.status_code == 200:
@@ -5066,11 +5067,10 @@ async def initialize_default_pages():
         for page_def in default_pages:
             try:
                 # Check if page already exists
-                existing_response = requests.get(
+                existing_response = await nocodb_get(
                     f"{config['base_url']}/api/v2/tables/{PAGES_TABLE_ID}/records",
                     headers=config["headers"],
-                    params={"where": f"(path,eq,{page_def['path']})", "limit": 1},
-                    verify=False
+                    params={"where": f"(path,eq,{page_def['path']})", "limit": 1}
                 )
                 
                 page_id = None
@@ -5091,11 +5091,10 @@ async def initialize_default_pages():
                         "description": f"Default {page_def['name']} page"
                     }
                     
-                    page_response = requests.post(
+                    page_response = await nocodb_post(
                         f"{config['base_url']}/api/v2/tables/{PAGES_TABLE_ID}/records",
                         headers=config["headers"],
-                        json=page_data,
-                        verify=False
+                        json=page_data
                     )
                     
                     if page_response.status_code == 200:
@@ -5110,30 +5109,30 @@ async def initialize_default_pages():
                         "group_id": public_group_id
                     }
                     
-                    requests.post(
+                    await nocodb_post(
                         f"{config['base_url']}/api/v2/tables/{PAGE_PERMISSIONS_TABLE_ID}/records",
                         headers=config["headers"],
-                        json=perm_data,
-                        verify=False
+                        json=perm_data
                     )
                 
             except Exception as e:
-                print(f"?? Error creating page {page_def['name']}: {str(e)}")
+                access_logger.error("Error creating page %s: %s", page_def['name'], str(e))
                 continue
         
-        print(f"? Initialized {created_pages} default pages and assigned to public group (ID: {public_group_id})")
+        access_logger.info("Initialized %s default pages and assigned to public group (ID: %s)", created_pages, public_group_id)
         
+        await run_in_threadpool(invalidate_page_access)
         return {
             "message": "Default pages and public group initialized successfully",
             "public_group_id": public_group_id,
             "pages_created": created_pages
         }
         
-    except requests.RequestException as e:
-        print(f"? API error initializing pages: {str(e)}")
+    except httpx.HTTPError as e:
+        access_logger.error("API error initializing pages: %s", str(e))
         raise HTTPException(status_code=500, detail=f"API error: {str(e)}")
     except Exception as e:
-        print(f"? Error initializing pages: {str(e)}")
+        access_logger.error("Error initializing pages: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 # ===================================================================
@@ -5150,11 +5149,10 @@ async def get_all_users():
         config = get_nocodb_connection()
         
         # Get all users
-        response = requests.get(
+        response = await nocodb_get(
             f"{config['base_url']}/api/v2/tables/{USERS_TABLE_ID}/records",
             headers=config["headers"],
-            params={"limit": 1000},
-            verify=False
+            params={"limit": 1000}
         )
         
         if response.status_code != 200:
@@ -5165,11 +5163,11 @@ async def get_all_users():
         
         return users
         
-    except requests.RequestException as e:
-        print(f"? API error fetching users: {str(e)}")
+    except httpx.HTTPError as e:
+        access_logger.error("API error fetching users: %s", str(e))
         raise HTTPException(status_code=500, detail=f"API error: {str(e)}")
     except Exception as e:
-        print(f"? Error fetching users: {str(e)}")
+        access_logger.error("Error fetching users: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/groups", tags=["users"])
@@ -5178,11 +5176,10 @@ async def get_all_groups():
     try:
         config = get_nocodb_connection()
         
-        response = requests.get(
+        response = await nocodb_get(
             f"{config['base_url']}/api/v2/tables/{GROUPS_TABLE_ID}/records",
             headers=config["headers"],
-            params={"limit": 1000},
-            verify=False
+            params={"limit": 1000}
         )
         
         if response.status_code != 200:
@@ -5193,11 +5190,11 @@ async def get_all_groups():
         
         return groups
         
-    except requests.RequestException as e:
-        print(f"? API error fetching groups: {str(e)}")
+    except httpx.HTTPError as e:
+        access_logger.error("API error fetching groups: %s", str(e))
         raise HTTPException(status_code=500, detail=f"API error: {str(e)}")
     except Exception as e:
-        print(f"? Error fetching groups: {str(e)}")
+        access_logger.error("Error fetching groups: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/users/{user_id}/assign-to-public", tags=["users"])
@@ -5207,11 +5204,10 @@ async def assign_user_to_public_group(user_id: int):
         config = get_nocodb_connection()
         
         # Get public group
-        public_group_response = requests.get(
+        public_group_response = await nocodb_get(
             f"{config['base_url']}/api/v2/tables/{GROUPS_TABLE_ID}/records",
             headers=config["headers"],
-            params={"where": "(name,eq,public)", "limit": 1},
-            verify=False
+            params={"where": "(name,eq,public)", "limit": 1}
         )
         
         if public_group_response.status_code != 200:
@@ -5224,11 +5220,10 @@ async def assign_user_to_public_group(user_id: int):
         public_group_id = groups[0].get("Id") or groups[0].get("id")
         
         # Check if user is already in public group
-        existing_response = requests.get(
+        existing_response = await nocodb_get(
             f"{config['base_url']}/api/v2/tables/{USER_GROUPS_TABLE_ID}/records",
             headers=config["headers"],
-            params={"where": f"(user_id,eq,{user_id}) and (group_id,eq,{public_group_id})", "limit": 1},
-            verify=False
+            params={"where": f"(user_id,eq,{user_id}) and (group_id,eq,{public_group_id})", "limit": 1}
         )
         
         if existing_response.status_code == 200:
@@ -5244,112 +5239,157 @@ async def assign_user_to_public_group(user_id: int):
             "assigned_at": datetime.now().isoformat()
         }
         
-        assign_response = requests.post(
+        assign_response = await nocodb_post(
             f"{config['base_url']}/api/v2/tables/{USER_GROUPS_TABLE_ID}/records",
             headers=config["headers"],
-            json=assignment_data,
-            verify=False
+            json=assignment_data
         )
         
         if assign_response.status_code != 200:
             raise HTTPException(status_code=500, detail="Failed to assign user to public group")
         
-        print(f"? Assigned user {user_id} to public group")
+        access_logger.info("Assigned user %s to public group", user_id)
         
+        await run_in_threadpool(invalidate_user_groups)
         return {"message": "User assigned to public group successfully"}
         
-    except requests.RequestException as e:
-        print(f"? API error assigning user to public group: {str(e)}")
+    except httpx.HTTPError as e:
+        access_logger.error("API error assigning user to public group: %s", str(e))
         raise HTTPException(status_code=500, detail=f"API error: {str(e)}")
     except Exception as e:
-        print(f"? Error assigning user to public group: {str(e)}")
+        access_logger.error("Error assigning user to public group: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/users/ensure-public-assignments", tags=["users"])
-async def ensure_all_users_in_public_group():
-    """Ensure all users are assigned to the public group"""
+PUBLIC_BACKFILL_CHUNK_SIZE = int(os.getenv("PUBLIC_BACKFILL_CHUNK_SIZE", "100"))
+PUBLIC_BACKFILL_MAX_USERS = int(os.getenv("PUBLIC_BACKFILL_MAX_USERS", "5000"))
+PUBLIC_BACKFILL_TIMEOUT = float(os.getenv("PUBLIC_BACKFILL_TIMEOUT", "300"))
+
+async def backfill_public_group(job: Job) -> dict:
+    """
+    Add users that are missing from the public group, in chunked bulk inserts.
+
+    One run assigns at most PUBLIC_BACKFILL_MAX_USERS users and stops after
+    PUBLIC_BACKFILL_TIMEOUT seconds; the result reports what is left, and
+    running the job again continues from there.
+    """
+    outcome = {"total_users": None, "missing": None, "newly_assigned": 0, "failed": 0}
     try:
-        config = get_nocodb_connection()
-        
-        # Get public group
-        public_group_response = requests.get(
-            f"{config['base_url']}/api/v2/tables/{GROUPS_TABLE_ID}/records",
-            headers=config["headers"],
-            params={"where": "(name,eq,public)", "limit": 1},
-            verify=False
+        message = await asyncio.wait_for(_assign_missing_public_users(job, outcome), PUBLIC_BACKFILL_TIMEOUT)
+        timed_out = False
+    except asyncio.TimeoutError:
+        timed_out = True
+        message = (
+            f"Stopped after {PUBLIC_BACKFILL_TIMEOUT:g}s having assigned "
+            f"{outcome['newly_assigned']} users to public group; run again to continue"
         )
-        
-        if public_group_response.status_code != 200:
-            return {"message": "Public group not found, skipping assignment"}
-        
-        groups = public_group_response.json().get("list", [])
-        if not groups:
-            return {"message": "Public group does not exist, skipping assignment"}
-        
-        public_group_id = groups[0].get("Id") or groups[0].get("id")
-        
-        # Get all users
-        users_response = requests.get(
+        access_logger.warning("Public group backfill timed out after %ss (%s assigned)", PUBLIC_BACKFILL_TIMEOUT, outcome["newly_assigned"])
+    
+    if outcome["newly_assigned"]:
+        await run_in_threadpool(invalidate_user_groups)
+    if outcome["missing"] is None:
+        return {"message": message, "timed_out": timed_out}
+    return {
+        "message": message,
+        **outcome,
+        "remaining": outcome["missing"] - outcome["newly_assigned"],
+        "truncated": outcome["missing"] > PUBLIC_BACKFILL_MAX_USERS,
+        "timed_out": timed_out,
+    }
+
+async def _assign_missing_public_users(job: Job, outcome: dict) -> str:
+    # Counts go into `outcome` as they happen so a timeout can still report them
+    config = get_nocodb_connection()
+    user_groups_url = f"{config['base_url']}/api/v2/tables/{USER_GROUPS_TABLE_ID}/records"
+    
+    # Get public group
+    public_group_response = await nocodb_get(
+        f"{config['base_url']}/api/v2/tables/{GROUPS_TABLE_ID}/records",
+        headers=config["headers"],
+        params={"where": "(name,eq,public)", "limit": 1}
+    )
+    
+    if public_group_response.status_code != 200:
+        return "Public group not found, skipping assignment"
+    
+    groups = public_group_response.json().get("list", [])
+    if not groups:
+        return "Public group does not exist, skipping assignment"
+    
+    public_group_id = groups[0].get("Id") or groups[0].get("id")
+    
+    # Read all users and all existing public assignments (every page, concurrently)
+    users, assignments = await asyncio.gather(
+        nocodb_list_all(
             f"{config['base_url']}/api/v2/tables/{USERS_TABLE_ID}/records",
             headers=config["headers"],
-            params={"limit": 1000},
-            verify=False
-        )
-        
-        if users_response.status_code != 200:
-            raise HTTPException(status_code=500, detail="Failed to fetch users")
-        
-        users = users_response.json().get("list", [])
-        assigned_count = 0
-        
-        # Get existing assignments to public group
-        assignments_response = requests.get(
-            f"{config['base_url']}/api/v2/tables/{USER_GROUPS_TABLE_ID}/records",
+            params={"fields": "Id"}
+        ),
+        nocodb_list_all(
+            user_groups_url,
             headers=config["headers"],
-            params={"where": f"(group_id,eq,{public_group_id})", "limit": 1000},
-            verify=False
+            params={"where": f"(group_id,eq,{public_group_id})", "fields": "user_id"}
         )
-        
-        existing_user_ids = set()
-        if assignments_response.status_code == 200:
-            assignments = assignments_response.json().get("list", [])
-            existing_user_ids = set([a.get("user_id") for a in assignments if a.get("user_id")])
-        
-        # Assign users who aren't already in public group
-        for user in users:
-            user_id = user.get("Id") or user.get("id")
-            if user_id and user_id not in existing_user_ids:
-                assignment_data = {
+    )
+    
+    existing_user_ids = {str(a.get("user_id")) for a in assignments if a.get("user_id")}
+    missing_user_ids = []
+    for user in users:
+        user_id = user.get("Id") or user.get("id")
+        if user_id and str(user_id) not in existing_user_ids:
+            missing_user_ids.append(user_id)
+    
+    outcome["total_users"] = len(users)
+    outcome["missing"] = len(missing_user_ids)
+    batch = missing_user_ids[:PUBLIC_BACKFILL_MAX_USERS]
+    await job.set_progress(0, len(batch), total_users=len(users), missing=len(missing_user_ids))
+    
+    failed_chunks = 0
+    assigned_at = datetime.now().isoformat()
+    for start in range(0, len(batch), PUBLIC_BACKFILL_CHUNK_SIZE):
+        chunk = batch[start:start + PUBLIC_BACKFILL_CHUNK_SIZE]
+        assign_response = await nocodb_post(
+            user_groups_url,
+            headers=config["headers"],
+            json=[
+                {
                     "user_id": user_id,
                     "group_id": public_group_id,
                     "assigned_by": "system",
-                    "assigned_at": datetime.now().isoformat()
+                    "assigned_at": assigned_at
                 }
-                
-                assign_response = requests.post(
-                    f"{config['base_url']}/api/v2/tables/{USER_GROUPS_TABLE_ID}/records",
-                    headers=config["headers"],
-                    json=assignment_data,
-                    verify=False
-                )
-                
-                if assign_response.status_code == 200:
-                    assigned_count += 1
-        
-        print(f"? Assigned {assigned_count} users to public group")
-        
-        return {
-            "message": f"Assigned {assigned_count} users to public group",
-            "total_users": len(users),
-            "newly_assigned": assigned_count
-        }
+                for user_id in chunk
+            ]
+        )
         
-    except requests.RequestException as e:
-        print(f"? API error ensuring public assignments: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"API error: {str(e)}")
-    except Exception as e:
-        print(f"? Error ensuring public assignments: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        if assign_response.status_code == 200:
+            outcome["newly_assigned"] += len(chunk)
+        else:
+            failed_chunks += 1
+            outcome["failed"] += len(chunk)
+            access_logger.warning("Bulk public group assignment failed: %s %s", assign_response.status_code, assign_response.text)
+        await job.set_progress(start + len(chunk), failed_chunks=failed_chunks)
+    
+    access_logger.info("Assigned %s users to public group", outcome["newly_assigned"])
+    return f"Assigned {outcome['newly_assigned']} users to public group"
+
+@app.post("/users/ensure-public-assignments", tags=["users"], status_code=202)
+async def ensure_all_users_in_public_group():
+    """Start (or join) the background job that assigns all users to the public group"""
+    job = await start_job("public_group_backfill", backfill_public_group)
+    return {
+        "message": "Public group assignment running in the background",
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "status_url": f"/jobs/{job['job_id']}" if job["job_id"] else None
+    }
+
+@app.get("/jobs/{job_id}", tags=["jobs"])
+def get_job_status(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Status, progress and result of a background job"""
+    job = job_status(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 # ===================================================================
 # ?? QUICK FIX: MANUAL USER GROUP ASSIGNMENT
@@ -5374,12 +5414,12 @@ def assign_user_to_group_manual(user_id: int, group_id: int, current_user: dict
         cursor.close()
         conn.close()
         
-        print(f"? Assigned user {user_id} to group {group_id}")
+        access_logger.info("Assigned user %s to group %s", user_id, group_id)
         
         return {"message": f"User {user_id} assigned to group {group_id} successfully"}
         
     except Exception as e:
-        print(f"? Error assigning user to group: {str(e)}")
+        access_logger.error("Error assigning user to group: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/assign-scale42-users", tags=["User Management"])
@@ -5418,7 +5458,7 @@ def assign_scale42_users(current_user: dict = Depends(get_current_user)):
                 groups_json = json.dumps(current_groups)
                 cursor.execute("UPDATE users SET groups = %s WHERE id = %s", (groups_json, user_id))
                 updated_count += 1
-                print(f"? Assigned user {user['email']} (ID: {user_id}) to Scale42 group")
+                access_logger.info("Assigned user %s (ID: %s) to Scale42 group", user['email'], user_id)
         
         conn.commit()
         cursor.close()
@@ -5431,7 +5471,7 @@ def assign_scale42_users(current_user: dict = Depends(get_current_user)):
         }
         
     except Exception as e:
-        print(f"? Error assigning Scale-42 users: {str(e)}")
+        access_logger.error("Error assigning Scale-42 users: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/assign-user-to-scale42/{user_email}", tags=["User Management"])
@@ -5476,7 +5516,7 @@ def assign_specific_user_to_scale42(user_email: str, current_user: dict = Depend
             cursor.close()
             conn.close()
             
-            print(f"? Assigned user {user_email} (ID: {user_id}) to Scale42 group")
+            access_logger.info("Assigned user %s (ID: %s) to Scale42 group", user_email, user_id)
             
             return {
                 "message": f"User {user_email} assigned to Scale42 group successfully",
@@ -5493,7 +5533,7 @@ def assign_specific_user_to_scale42(user_email: str, current_user: dict = Depend
             }
         
     except Exception as e:
-        print(f"? Error assigning user {user_email} to Scale42: {str(e)}")
+        access_logger.error("Error assigning user %s to Scale42: %s", user_email, str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/fix-scale42-users", tags=["User Management"])
@@ -5527,7 +5567,7 @@ def fix_scale42_users(current_user: dict = Depends(get_current_user)):
         cursor.close()
         conn.close()
         
-        print(f"? Fixed {updated_count} Scale-42 users")
+        access_logger.info("Fixed %s Scale-42 users", updated_count)
         
         return {
             "message": f"Fixed {updated_count} Scale-42 users",
@@ -5536,7 +5576,7 @@ def fix_scale42_users(current_user: dict = Depends(get_current_user)):
         }
         
     except Exception as e:
-        print(f"? Error fixing Scale-42 users: {str(e)}")
+        access_logger.error("Error fixing Scale-42 users: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api-assign-user-to-scale42/{email}")
@@ -5596,6 +5636,7 @@ def api_assign_user_to_scale42(email: str):
         """, (user_id, scale42_group_id))
         
         conn.commit()
+        invalidate_user_groups(email)
         cursor.close()
         conn.close()
         
@@ -5639,11 +5680,11 @@ def migrate_display_order():
         cursor.close()
         conn.close()
         
-        print(message)
+        db_logger.info("%s", message)
         return {"status": "success", "message": message}
         
     except Exception as e:
-        print(f"? Error migrating display_order: {str(e)}")
+        db_logger.error("Error migrating display_order: %s", str(e))
         if 'conn' in locals() and 'cursor' in locals():
             try:
                 cursor.close()
@@ -5777,6 +5818,7 @@ def setup_original_pages():
                 added_pages.append(name)
         
         conn.commit()
+        invalidate_pages()
         cursor.close()
         conn.close()
         
@@ -5792,7 +5834,7 @@ def setup_original_pages():
         return {"error": f"Failed to set up original pages: {str(e)}"}
 
 @app.get("/pages-mysql", tags=["pages"])
-def get_pages_mysql():
+def get_pages_mysql(request: Request):
     """Get all pages using MySQL directly"""
     try:
         conn = get_db()
@@ -5816,59 +5858,16 @@ def get_pages_mysql():
         cursor.close()
         conn.close()
         
-        return pages
+        return etag_response(request, pages, cache_control=NO_CACHE)
         
     except Exception as e:
         return {"error": f"Failed to fetch pages: {str(e)}"}
 
 @app.get("/pages/user-mysql/{email}")
 def get_user_pages_mysql(email: str):
-    """Get pages accessible to a user using MySQL directly"""
+    """Get pages accessible to a user (resolved from the in-memory permission index)"""
     try:
-        conn = get_db()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Get user's assigned groups (if user exists)
-        cursor.execute("""
-            SELECT DISTINCT g.id, g.name
-            FROM users u
-            JOIN user_groups ug ON u.id = ug.user_id AND ug.is_active = TRUE
-            JOIN groups g ON ug.group_id = g.id AND g.is_active = TRUE
-            WHERE u.email = %s AND u.is_active = TRUE
-        """, (email,))
-        
-        user_groups = cursor.fetchall()
-        
-        # Always include Public group for all authenticated users (whether they exist in DB or not)
-        cursor.execute("SELECT id, name FROM groups WHERE name = 'Public' AND is_active = TRUE")
-        public_group = cursor.fetchone()
-        
-        # Collect all group IDs (user's assigned groups + Public group)
-        group_ids = [str(group['id']) for group in user_groups]
-        if public_group and str(public_group['id']) not in group_ids:  # type: ignore
-            group_ids.append(str(public_group['id']))  # type: ignore
-        
-        if not group_ids:
-            cursor.close()
-            conn.close()
-            return []
-        
-        placeholders = ','.join(['%s'] * len(group_ids))
-        
-        # Get pages accessible to user's groups (including Public)
-        cursor.execute(f"""
-            SELECT DISTINCT p.*
-            FROM pages p
-            JOIN page_permissions pp ON p.id = pp.page_id AND pp.is_active = TRUE
-            WHERE pp.group_id IN ({placeholders}) AND p.is_active = TRUE
-            ORDER BY p.display_order, p.category, p.name
-        """, group_ids)
-        
-        pages = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
-        return pages
+        return get_cached_user_pages(email, get_db)
         
     except Exception as e:
         return {"error": f"Failed to fetch user pages: {str(e)}"}
@@ -5939,6 +5938,7 @@ def add_single_page(page_data: dict):
                     """, (page_id, public_group_id))
         
         conn.commit()
+        invalidate_pages()
         cursor.close()
         conn.close()
         
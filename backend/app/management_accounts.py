@@ -0,0 +1,137 @@
+"""
+Section reads for the `management_accounts` database.
+
+The accounts dashboard used to load companies, accounts, directors and
+documents in a single blocking call. Each section can now be read on its own
+with limit/offset paging, a summary gives the headline counts and balances
+from aggregate queries, and `fetch_all` reads every section on its own
+connection concurrently in the threadpool.
+
+All functions here block; call them with run_in_threadpool from async code.
+"""
+import asyncio
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+import mysql.connector
+from starlette.concurrency import run_in_threadpool
+
+from .logging_setup import get_logger
+
+logger = get_logger("accounts")
+
+MANAGEMENT_ACCOUNTS_DB = os.getenv("MANAGEMENT_ACCOUNTS_DB", "management_accounts")
+
+ER_NO_SUCH_TABLE = 1146
+
+# section -> (query, optional); optional sections read as empty when their table is missing
+SECTIONS: Dict[str, Tuple[str, bool]] = {
+    "companies": ("SELECT * FROM companies ORDER BY full_name ASC, name ASC, id ASC", False),
+    "accounts": (
+        """
+        SELECT a.*, c.full_name as company_name, c.name as company_short_name
+        FROM accounts a
+        LEFT JOIN companies c ON a.company_id = c.id
+        ORDER BY a.balance DESC, a.id ASC
+        """,
+        False,
+    ),
+    "directors": ("SELECT * FROM directors ORDER BY name ASC, id ASC", True),
+    "documents": ("SELECT * FROM documents ORDER BY uploaded_at DESC, id DESC", True),
+}
+
+
+def get_connection():
+    return mysql.connector.connect(
+        host=os.getenv("DB_HOST"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        database=MANAGEMENT_ACCOUNTS_DB,
+        port=int(os.getenv("DB_PORT", "3306")),
+    )
+
+
+def _missing_table(e: mysql.connector.Error) -> bool:
+    return getattr(e, "errno", None) == ER_NO_SUCH_TABLE
+
+
+def fetch_section(
+    section: str,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    connect: Callable = get_connection,
+) -> Tuple[List[dict], Optional[int]]:
+    """
+    Rows of one section and the offset of the next page (None on the last page).
+
+    Raises KeyError for an unknown section.
+    """
+    query, optional = SECTIONS[section]
+    params: list = []
+    if limit is not None:
+        query += " LIMIT %s OFFSET %s"
+        params = [limit + 1, offset]
+
+    conn = connect()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+    except mysql.connector.Error as e:
+        if optional and _missing_table(e):
+            logger.info("%s table not found, returning empty array", section.capitalize())
+            return [], None
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    if limit is not None and len(rows) > limit:
+        return rows[:limit], offset + limit
+    return rows, None
+
+
+async def fetch_all(connect: Callable = get_connection) -> Dict[str, List[dict]]:
+    """Every section in full, each read concurrently on its own connection"""
+    results = await asyncio.gather(
+        *(run_in_threadpool(fetch_section, section, None, 0, connect) for section in SECTIONS)
+    )
+    return {section: rows for section, (rows, _) in zip(SECTIONS, results)}
+
+
+def summary(connect: Callable = get_connection) -> dict:
+    """Row counts per section and account balances per currency"""
+    conn = connect()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        counts = {}
+        for section in SECTIONS:
+            try:
+                cursor.execute(f"SELECT COUNT(*) AS n FROM {section}")
+                counts[section] = int(cursor.fetchone()["n"])
+            except mysql.connector.Error as e:
+                if not (SECTIONS[section][1] and _missing_table(e)):
+                    raise
+                counts[section] = 0
+
+        cursor.execute(
+            """
+            SELECT currency, COUNT(*) AS accounts, SUM(balance) AS balance
+            FROM accounts
+            GROUP BY currency
+            ORDER BY balance DESC
+            """
+        )
+        balances = [
+            {
+                "currency": row["currency"],
+                "accounts": int(row["accounts"]),
+                "balance": float(row["balance"]) if row["balance"] is not None else 0.0,
+            }
+            for row in cursor.fetchall()
+        ]
+    finally:
+        cursor.close()
+        conn.close()
+
+    return {"counts": counts, "balances_by_currency": balances}
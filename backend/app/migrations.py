@@ -0,0 +1,308 @@
+"""
+Versioned schema migrations for the application's MySQL tables.
+
+Each migration runs exactly once per database and is recorded in the
+`schema_version` table. The runner is invoked at startup so request handlers
+only execute their own queries instead of re-running DDL on every call.
+
+Migrations must be idempotent: databases created before this runner existed
+already contain some of these tables and columns.
+"""
+from typing import Callable, List, Tuple
+
+from .logging_setup import get_logger
+
+logger = get_logger("db")
+
+# Named lock so several workers starting together don't race on the same DDL
+MIGRATION_LOCK_NAME = "s42_schema_migrations"
+MIGRATION_LOCK_TIMEOUT = 60
+
+
+def _column_exists(cursor, table: str, column: str) -> bool:
+    cursor.execute(
+        """
+        SELECT COUNT(*) AS n FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """,
+        (table, column),
+    )
+    return cursor.fetchone()["n"] > 0
+
+
+def _index_exists(cursor, table: str, index: str) -> bool:
+    cursor.execute(
+        """
+        SELECT COUNT(*) AS n FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """,
+        (table, index),
+    )
+    return cursor.fetchone()["n"] > 0
+
+
+def _add_column(cursor, table: str, column: str, definition: str):
+    if not _column_exists(cursor, table, column):
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _add_index(cursor, table: str, index: str, columns: str):
+    if not _index_exists(cursor, table, index):
+        cursor.execute(f"ALTER TABLE {table} ADD INDEX {index} ({columns})")
+
+
+def _create_users_table(cursor):
+    """Users table; drops the legacy single group_id column"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            email VARCHAR(255) UNIQUE NOT NULL,
+            name VARCHAR(255),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_login TIMESTAMP,
+            is_active BOOLEAN DEFAULT TRUE,
+            nocodbapi VARCHAR(255),
+            INDEX idx_email (email),
+            INDEX idx_active (is_active)
+        )
+    """)
+
+    # Group membership moved to user_groups
+    if _column_exists(cursor, "users", "group_id"):
+        cursor.execute("ALTER TABLE users DROP COLUMN group_id")
+
+    _add_column(cursor, "users", "is_active", "BOOLEAN DEFAULT TRUE")
+    _add_column(cursor, "users", "nocodbapi", "VARCHAR(255)")
+
+
+def _create_groups_table(cursor):
+    """Groups table with the default groups"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS groups (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) UNIQUE NOT NULL,
+            domain VARCHAR(255),
+            description TEXT,
+            permissions JSON,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_domain (domain),
+            INDEX idx_active (is_active)
+        )
+    """)
+
+    _add_column(cursor, "groups", "description", "TEXT")
+    _add_column(cursor, "groups", "permissions", "JSON")
+    _add_column(cursor, "groups", "is_active", "BOOLEAN DEFAULT TRUE")
+
+    default_groups = [
+        ("Guests", None, "Guest users with limited access", '{"pages": ["dashboard", "tools"], "actions": ["read"]}'),
+        ("Scale42", "scale-42.com", "Scale42 domain users with full access", '{"pages": ["dashboard", "projects", "map", "schema", "accounts", "hoyanger", "users", "tools"], "actions": ["read", "write", "delete", "admin"]}'),
+        ("Scale42", "edbmotte.com", "EDB Motte domain users with full access", '{"pages": ["dashboard", "projects", "map", "schema", "accounts", "hoyanger", "users", "tools"], "actions": ["read", "write", "delete", "admin"]}'),
+        ("Developers", None, "Developer group with technical access", '{"pages": ["dashboard", "projects", "map", "schema", "tools"], "actions": ["read", "write"]}'),
+        ("Viewers", None, "Read-only access to most content", '{"pages": ["dashboard", "projects", "map"], "actions": ["read"]}'),
+    ]
+    cursor.executemany(
+        "INSERT IGNORE INTO groups (name, domain, description, permissions) VALUES (%s, %s, %s, %s)",
+        default_groups,
+    )
+
+
+def _create_user_groups_table(cursor):
+    """Junction table for the many-to-many user/group relationship"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_groups (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            group_id INT NOT NULL,
+            role VARCHAR(50) DEFAULT 'member',
+            assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            assigned_by INT,
+            is_active BOOLEAN DEFAULT TRUE,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (group_id) REFERENCES groups(id) ON DELETE CASCADE,
+            FOREIGN KEY (assigned_by) REFERENCES users(id) ON DELETE SET NULL,
+            UNIQUE KEY unique_user_group (user_id, group_id),
+            INDEX idx_user_id (user_id),
+            INDEX idx_group_id (group_id),
+            INDEX idx_active (is_active)
+        )
+    """)
+
+
+def _create_pages_tables(cursor):
+    """Pages and page_permissions, including the display_order column"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pages (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            path VARCHAR(255) NOT NULL UNIQUE,
+            icon VARCHAR(100) DEFAULT 'Globe',
+            category VARCHAR(100) DEFAULT 'Other',
+            is_external BOOLEAN DEFAULT FALSE,
+            url TEXT,
+            description TEXT,
+            display_order INT DEFAULT 0,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_path (path),
+            INDEX idx_category (category),
+            INDEX idx_active (is_active),
+            INDEX idx_display_order (display_order)
+        )
+    """)
+
+    _add_column(cursor, "pages", "display_order", "INT DEFAULT 0 AFTER description")
+    _add_index(cursor, "pages", "idx_display_order", "display_order")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS page_permissions (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            page_id INT NOT NULL,
+            group_id INT NOT NULL,
+            permission_level VARCHAR(50) DEFAULT 'read',
+            granted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            granted_by INT,
+            is_active BOOLEAN DEFAULT TRUE,
+            FOREIGN KEY (page_id) REFERENCES pages(id) ON DELETE CASCADE,
+            FOREIGN KEY (group_id) REFERENCES groups(id) ON DELETE CASCADE,
+            FOREIGN KEY (granted_by) REFERENCES users(id) ON DELETE SET NULL,
+            UNIQUE KEY unique_page_group (page_id, group_id),
+            INDEX idx_page_id (page_id),
+            INDEX idx_group_id (group_id),
+            INDEX idx_active (is_active)
+        )
+    """)
+
+
+def _create_audit_log_table(cursor):
+    """Append-only audit store read per record with keyset pagination"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS audit_log (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            table_name VARCHAR(64) NOT NULL,
+            record_id VARCHAR(64) NOT NULL,
+            action VARCHAR(16) NOT NULL,
+            old_values JSON,
+            new_values JSON,
+            field_changed JSON,
+            user_id VARCHAR(255),
+            user_email VARCHAR(255),
+            timestamp DATETIME(6) NOT NULL,
+            source VARCHAR(32) NOT NULL DEFAULT 'webhook',
+            INDEX idx_audit_record (table_name, record_id, timestamp, id)
+        )
+    """)
+
+
+def _create_audit_backfill_table(cursor):
+    """Records whose NocoDB history has been copied into audit_log, and NocoDB's details column"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS audit_backfill (
+            table_name VARCHAR(64) NOT NULL,
+            record_id VARCHAR(64) NOT NULL,
+            entries INT NOT NULL DEFAULT 0,
+            backfilled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (table_name, record_id)
+        )
+    """)
+    _add_column(cursor, "audit_log", "details", "JSON")
+
+
+def _table_exists(cursor, table: str) -> bool:
+    cursor.execute(
+        """
+        SELECT COUNT(*) AS n FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (table,),
+    )
+    return cursor.fetchone()["n"] > 0
+
+
+def _index_column(cursor, table: str, column: str) -> str:
+    # TEXT/BLOB columns can only be indexed on a prefix
+    cursor.execute(
+        """
+        SELECT DATA_TYPE AS data_type FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """,
+        (table, column),
+    )
+    row = cursor.fetchone()
+    if row and row["data_type"].lower().endswith(("text", "blob")):
+        return f"{column}(191)"
+    return column
+
+
+def _add_companies_indexes(cursor):
+    """Keyset-pagination and filter indexes for GET /companies"""
+    # The companies table is loaded outside this app; nothing to do where it is absent
+    if not _table_exists(cursor, "companies"):
+        return
+    for index, column in (
+        ("idx_companies_full_name", "full_name"),
+        ("idx_companies_type", "type"),
+        ("idx_companies_status", "company_status"),
+    ):
+        if _column_exists(cursor, "companies", column):
+            _add_index(cursor, "companies", index, f"{_index_column(cursor, 'companies', column)}, id")
+
+
+# (version, description, apply) - append new migrations, never reorder or edit applied ones
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "users table", _create_users_table),
+    (2, "groups table and default groups", _create_groups_table),
+    (3, "user_groups table", _create_user_groups_table),
+    (4, "pages and page_permissions tables with display_order", _create_pages_tables),
+    (5, "audit_log table", _create_audit_log_table),
+    (6, "companies listing indexes", _add_companies_indexes),
+    (7, "audit_backfill table and audit_log details", _create_audit_backfill_table),
+]
+
+
+def run_migrations(get_connection: Callable) -> List[int]:
+    """
+    Apply every pending migration and return the versions that were applied.
+
+    `get_connection` returns a new mysql.connector connection; it is closed
+    before returning.
+    """
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    applied_now: List[int] = []
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s) AS locked", (MIGRATION_LOCK_NAME, MIGRATION_LOCK_TIMEOUT))
+        if not cursor.fetchone()["locked"]:
+            raise RuntimeError("Timed out waiting for the schema migration lock")
+
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INT PRIMARY KEY,
+                    description VARCHAR(255) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("SELECT version FROM schema_version")
+            applied = {row["version"] for row in cursor.fetchall()}
+
+            for version, description, apply in MIGRATIONS:
+                if version in applied:
+                    continue
+                logger.info("Applying schema migration %s: %s", version, description)
+                apply(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                    (version, description),
+                )
+                conn.commit()
+                applied_now.append(version)
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s) AS released", (MIGRATION_LOCK_NAME,))
+            cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+
+    return applied_now
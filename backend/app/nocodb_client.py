@@ -0,0 +1,322 @@
+"""
+Shared NocoDB access for the API handlers.
+
+All `async def` endpoints talk to NocoDB through this module so that a slow
+upstream response only suspends the calling request instead of blocking the
+event loop for every user. Plain `def` endpoints (run in the threadpool) use
+the blocking `nocodb_get_sync`, backed by one pooled requests session.
+
+Concurrent identical GETs - same URL, params and headers, hence the same
+token - are coalesced: one request goes upstream and every caller receives
+its response. Shared responses are fully read; treat them as read-only.
+
+Every call has connect and read timeouts. GETs that fail with a connection
+error, timeout or 502/503/504 are retried with jittered exponential backoff;
+writes are never retried. Those failures also feed a circuit breaker: while
+it is open calls raise NocoDBUnavailable at once instead of queueing behind
+an unresponsive NocoDB.
+
+Settings: NOCODB_CONNECT_TIMEOUT (5s), NOCODB_READ_TIMEOUT (30s),
+NOCODB_RETRIES (2), NOCODB_RETRY_BACKOFF (0.25s, doubled per attempt, capped
+at 2s), NOCODB_BREAKER_THRESHOLD (5 consecutive failures) and
+NOCODB_BREAKER_RESET (30s before a trial call).
+"""
+import asyncio
+import hashlib
+import os
+import random
+import time
+from typing import Optional, Any
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from .circuit_breaker import CircuitBreaker
+from .logging_setup import get_logger
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+logger = get_logger("nocodb")
+
+NOCODB_CONNECT_TIMEOUT = float(os.getenv("NOCODB_CONNECT_TIMEOUT", "5"))
+NOCODB_READ_TIMEOUT = float(os.getenv("NOCODB_READ_TIMEOUT", "30"))
+NOCODB_RETRIES = int(os.getenv("NOCODB_RETRIES", "2"))
+NOCODB_RETRY_BACKOFF = float(os.getenv("NOCODB_RETRY_BACKOFF", "0.25"))
+NOCODB_RETRY_BACKOFF_MAX = 2.0
+
+# Responses that mean NocoDB (or its proxy) is unavailable rather than that the request was bad
+UNAVAILABLE_STATUSES = {502, 503, 504}
+
+breaker = CircuitBreaker(
+    "nocodb",
+    failure_threshold=int(os.getenv("NOCODB_BREAKER_THRESHOLD", "5")),
+    reset_timeout=float(os.getenv("NOCODB_BREAKER_RESET", "30")),
+)
+
+
+class NocoDBUnavailable(requests.exceptions.ConnectionError):
+    """Raised without calling NocoDB while the circuit breaker is open"""
+
+# One pooled client per process, created lazily on first use
+_client: Optional[httpx.AsyncClient] = None
+_session: Optional[requests.Session] = None
+
+_async_flights = AsyncSingleFlight()
+_sync_flights = SingleFlight()
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the process-wide async HTTP client, creating it if needed"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            verify=False,  # NocoDB is reached over a self-signed certificate
+            timeout=httpx.Timeout(NOCODB_READ_TIMEOUT, connect=NOCODB_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("NOCODB_MAX_CONNECTIONS", "50")),
+                max_keepalive_connections=int(os.getenv("NOCODB_MAX_KEEPALIVE", "20")),
+            ),
+        )
+    return _client
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide blocking session, creating it if needed"""
+    global _session
+    if _session is None:
+        pool_size = int(os.getenv("NOCODB_MAX_CONNECTIONS", "50"))
+        session = requests.Session()
+        session.verify = False  # NocoDB is reached over a self-signed certificate
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _session = session
+    return _session
+
+
+async def close_client():
+    """Close the shared clients (called on application shutdown)"""
+    global _client, _session
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    if _session is not None:
+        _session.close()
+    _session = None
+
+
+def token_scope(token: Optional[str]) -> str:
+    """Stable, non-reversible identifier for a NocoDB token"""
+    if not token:
+        return "anonymous"
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter: spreads retries from many callers instead of synchronising them
+    return random.uniform(0, min(NOCODB_RETRY_BACKOFF_MAX, NOCODB_RETRY_BACKOFF * (2 ** attempt)))
+
+
+def _attempts(method: str) -> int:
+    # Only idempotent reads are retried
+    return 1 + max(0, NOCODB_RETRIES) if method == "GET" else 1
+
+
+def _refuse(method: str, url: str):
+    logger.debug("NocoDB circuit open, refusing %s %s", method, url)
+    raise NocoDBUnavailable(f"NocoDB is unavailable (circuit open); {method} {url} not attempted")
+
+
+def _flight_key(url: str, headers: Optional[dict], params: Optional[dict]) -> tuple:
+    # Headers carry the token; hash them so tokens are not held as dict keys
+    header_items = sorted((str(k).lower(), str(v)) for k, v in (headers or {}).items())
+    return (
+        url,
+        tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())),
+        token_scope(repr(header_items)),
+    )
+
+
+def nocodb_headers(api_token: Optional[str], **extra: str) -> dict:
+    """Standard NocoDB request headers for the given API token"""
+    headers = {
+        "xc-token": api_token or "",
+        "Content-Type": "application/json",
+    }
+    headers.update(extra)
+    return headers
+
+
+async def nocodb_request(
+    method: str,
+    url: str,
+    *,
+    headers: Optional[dict] = None,
+    params: Optional[dict] = None,
+    json: Any = None,
+) -> httpx.Response:
+    """Perform a non-blocking request against NocoDB; identical concurrent GETs share one"""
+    if method != "GET" or json is not None:
+        return await _send(method, url, headers=headers, params=params, json=json)
+    return await _async_flights.do(
+        _flight_key(url, headers, params),
+        lambda: _send(method, url, headers=headers, params=params),
+    )
+
+
+async def _send(method: str, url: str, **kwargs) -> httpx.Response:
+    attempts = _attempts(method)
+    for attempt in range(attempts):
+        if not breaker.allow():
+            _refuse(method, url)
+        try:
+            response = await get_client().request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            breaker.record_failure(f"{type(e).__name__}: {e}")
+            if attempt + 1 >= attempts:
+                raise
+            logger.info("NocoDB %s %s failed (%s), retrying", method, url, type(e).__name__)
+        else:
+            if response.status_code not in UNAVAILABLE_STATUSES:
+                breaker.record_success()
+                return response
+            breaker.record_failure(f"HTTP {response.status_code}")
+            if attempt + 1 >= attempts:
+                return response
+            logger.info("NocoDB %s %s returned %s, retrying", method, url, response.status_code)
+        await asyncio.sleep(_backoff(attempt))
+
+
+async def nocodb_get(url: str, **kwargs) -> httpx.Response:
+    return await nocodb_request("GET", url, **kwargs)
+
+
+async def nocodb_post(url: str, **kwargs) -> httpx.Response:
+    return await nocodb_request("POST", url, **kwargs)
+
+
+async def nocodb_patch(url: str, **kwargs) -> httpx.Response:
+    return await nocodb_request("PATCH", url, **kwargs)
+
+
+async def nocodb_delete(url: str, **kwargs) -> httpx.Response:
+    return await nocodb_request("DELETE", url, **kwargs)
+
+
+def nocodb_request_sync(
+    method: str,
+    url: str,
+    *,
+    headers: Optional[dict] = None,
+    params: Optional[dict] = None,
+    json: Any = None,
+    timeout: Optional[float] = None,
+) -> requests.Response:
+    """Blocking request for threadpool code; identical concurrent GETs share one"""
+    if method != "GET" or json is not None:
+        return _send_sync(method, url, headers=headers, params=params, json=json, timeout=timeout)
+    return _sync_flights.do(
+        _flight_key(url, headers, params),
+        lambda: _send_sync(method, url, headers=headers, params=params, timeout=timeout),
+    )
+
+
+def _send_sync(method: str, url: str, *, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+    attempts = _attempts(method)
+    for attempt in range(attempts):
+        if not breaker.allow():
+            _refuse(method, url)
+        try:
+            response = get_session().request(
+                method, url, timeout=timeout or (NOCODB_CONNECT_TIMEOUT, NOCODB_READ_TIMEOUT), **kwargs
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            breaker.record_failure(f"{type(e).__name__}: {e}")
+            if attempt + 1 >= attempts:
+                raise
+            logger.info("NocoDB %s %s failed (%s), retrying", method, url, type(e).__name__)
+        else:
+            if response.status_code not in UNAVAILABLE_STATUSES:
+                breaker.record_success()
+                return response
+            breaker.record_failure(f"HTTP {response.status_code}")
+            if attempt + 1 >= attempts:
+                return response
+            logger.info("NocoDB %s %s returned %s, retrying", method, url, response.status_code)
+        time.sleep(_backoff(attempt))
+
+
+def nocodb_get_sync(url: str, **kwargs) -> requests.Response:
+    return nocodb_request_sync("GET", url, **kwargs)
+
+
+def nocodb_post_sync(url: str, **kwargs) -> requests.Response:
+    return nocodb_request_sync("POST", url, **kwargs)
+
+
+def stats() -> dict:
+    return {
+        "breaker": breaker.stats(),
+        "single_flight": {"async": _async_flights.stats(), "sync": _sync_flights.stats()},
+        "timeouts": {"connect_seconds": NOCODB_CONNECT_TIMEOUT, "read_seconds": NOCODB_READ_TIMEOUT},
+        "retries": NOCODB_RETRIES,
+    }
+
+
+def pool_stats() -> dict:
+    """
+    Connections held by the shared clients: open, in use and the limit.
+
+    Read from the clients' transport internals, so best effort - a field is
+    None when this httpx/urllib3 version does not expose it.
+    """
+    limit = int(os.getenv("NOCODB_MAX_CONNECTIONS", "50"))
+    result = {"async": None, "sync": None}
+
+    pool = getattr(getattr(_client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if _client is not None and not _client.is_closed and connections is not None:
+        in_use = sum(1 for c in connections if not c.is_idle())
+        result["async"] = {"open": len(connections), "in_use": in_use, "limit": limit}
+
+    adapter = _session.get_adapter("https://") if _session is not None else None
+    poolmanager = getattr(adapter, "poolmanager", None)
+    if poolmanager is not None:
+        open_connections = in_use = 0
+        for key in list(poolmanager.pools.keys()):
+            host_pool = poolmanager.pools.get(key)
+            if host_pool is None or host_pool.pool is None:
+                continue
+            # The queue holds idle connections plus empty slots up to maxsize
+            in_use += host_pool.pool.maxsize - host_pool.pool.qsize()
+            open_connections += host_pool.num_connections
+        result["sync"] = {"opened": open_connections, "in_use": in_use, "limit": limit}
+    return result
+
+
+async def nocodb_list_all(
+    url: str,
+    *,
+    headers: Optional[dict] = None,
+    params: Optional[dict] = None,
+    page_size: int = 1000,
+) -> list:
+    """
+    Fetch every row of a NocoDB v2 records endpoint, following pagination.
+
+    Raises httpx.HTTPStatusError if any page is not returned successfully.
+    """
+    rows: list = []
+    offset = 0
+    while True:
+        page_params = dict(params or {}, limit=page_size, offset=offset)
+        response = await nocodb_get(url, headers=headers, params=page_params)
+        response.raise_for_status()
+        data = response.json()
+        batch = data.get("list", [])
+        rows.extend(batch)
+
+        page_info = data.get("pageInfo") or {}
+        if page_info.get("isLastPage", True) or len(batch) < page_size or not batch:
+            return rows
+        offset += len(batch)
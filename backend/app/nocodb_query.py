@@ -0,0 +1,105 @@
+"""
+Translate list-endpoint parameters into NocoDB v2 query parameters.
+
+A `NocoQuery` holds equality filters, a sort and a field projection keyed by
+NocoDB field titles. `to_params()` pushes them down to NocoDB as `where`,
+`sort` and `fields` so only the needed rows and columns cross the wire;
+`apply()` gives the same result for rows already held locally (the table
+mirror), so endpoints behave the same whichever source served them.
+
+Filter values NocoDB's where syntax cannot carry (commas, parentheses,
+tildes) are not pushed down; `to_params()` leaves them out and `apply()`
+still enforces them, so callers should always run `apply()` on the result.
+"""
+from typing import Dict, Iterable, List, Optional
+
+_UNSAFE_WHERE_CHARS = set(",()~")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """'Id,Project Name' -> ['Id', 'Project Name']; None/empty -> None"""
+    if not fields:
+        return None
+    parsed = [f.strip() for f in fields.split(",") if f.strip()]
+    return parsed or None
+
+
+def parse_sort(sort: Optional[str]) -> List[str]:
+    """'-Project Priority,Country' -> ['-Project Priority', 'Country']"""
+    if not sort:
+        return []
+    return [s.strip() for s in sort.split(",") if s.strip().lstrip("-")]
+
+
+def _blank(value) -> bool:
+    return value is None or value == ""
+
+
+def _sort_key(value):
+    # Numbers before text, text case-insensitive
+    if isinstance(value, bool):
+        return (0, int(value), "")
+    if isinstance(value, (int, float)):
+        return (0, value, "")
+    return (1, 0, str(value).lower())
+
+
+class NocoQuery:
+    def __init__(
+        self,
+        filters: Optional[Dict[str, Optional[str]]] = None,
+        sort: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ):
+        # Blank filter values mean "no filter", as the endpoints always treated them
+        self.filters = {
+            field: str(value).strip()
+            for field, value in (filters or {}).items()
+            if value is not None and str(value).strip()
+        }
+        self.sort = list(sort or [])
+        self.fields = list(dict.fromkeys(fields)) if fields else None
+
+    def pushdown_filters(self) -> Dict[str, str]:
+        return {f: v for f, v in self.filters.items() if not (_UNSAFE_WHERE_CHARS & set(v))}
+
+    def where(self) -> Optional[str]:
+        clauses = [f"({field},eq,{value})" for field, value in self.pushdown_filters().items()]
+        return "~and".join(clauses) or None
+
+    def to_params(self, **extra) -> dict:
+        """NocoDB v2 list parameters, merged with `extra` (limit, offset, ...)"""
+        params = dict(extra)
+        where = self.where()
+        if where:
+            params["where"] = where
+        if self.sort:
+            params["sort"] = ",".join(self.sort)
+        if self.fields:
+            # apply() still needs the columns it filters and sorts on locally
+            local_filters = [f for f in self.filters if f not in self.pushdown_filters()]
+            sort_fields = [spec.lstrip("-") for spec in self.sort]
+            params["fields"] = ",".join(dict.fromkeys([*self.fields, *local_filters, *sort_fields]))
+        return params
+
+    def matches(self, row: dict) -> bool:
+        for field, value in self.filters.items():
+            actual = row.get(field)
+            if actual is None or str(actual).strip().lower() != value.lower():
+                return False
+        return True
+
+    def apply(self, rows: Iterable[dict]) -> List[dict]:
+        """Filter, sort and project rows locally; input rows are not modified"""
+        result = [row for row in rows if self.matches(row)]
+        # Stable sorts applied from the last key to the first give a multi-key sort
+        # Blank values go last in either direction
+        for spec in reversed(self.sort):
+            field = spec.lstrip("-")
+            present = [row for row in result if not _blank(row.get(field))]
+            blank = [row for row in result if _blank(row.get(field))]
+            present.sort(key=lambda row: _sort_key(row.get(field)), reverse=spec.startswith("-"))
+            result = present + blank
+        if self.fields:
+            result = [{field: row.get(field) for field in self.fields} for row in result]
+        return result
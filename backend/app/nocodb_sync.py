@@ -1,6 +1,13 @@
 import requests
 import csv
 import warnings
+
+from .logging_setup import get_logger
+from .nocodb_client import nocodb_request_sync
+from .select_options import dump_options, option_from_nocodb
+
+logger = get_logger("nocodb_sync")
+
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
 
 # Fill in your NocoDB API details
@@ -16,14 +23,14 @@ headers = {
 # Function to list all bases
 def list_bases():
     url = f"{API_URL}/api/v2/meta/bases"
-    response = requests.get(url, headers=headers, verify=False)
+    response = nocodb_request_sync("GET", url, headers=headers)
     response.raise_for_status()
     return response.json()
 
 # Function to list all tables for a base
 def list_tables_for_base(base_id):
     url = f"{API_URL}/api/v2/meta/bases/{base_id}/tables"
-    response = requests.get(url, headers=headers, verify=False)
+    response = nocodb_request_sync("GET", url, headers=headers)
     response.raise_for_status()
     return response.json()
 
@@ -34,7 +41,7 @@ try:
     for base in bases.get("list", []):
         bases_info.append(f"Base ID: {base.get('id')}, Name: {base.get('title')}")
 except requests.exceptions.HTTPError as e:
-    print(f"Error listing bases: {e}")
+    logger.error("Error listing bases: %s", e)
 
 # Print tables for the selected base
 tables_info = []
@@ -43,12 +50,12 @@ try:
     for table in tables.get("list", []):
         tables_info.append(f"Table ID: {table.get('id')}, Name: {table.get('title')}")
 except requests.exceptions.HTTPError as e:
-    print(f"Error listing tables: {e}")
+    logger.error("Error listing tables: %s", e)
 
 # Function to list all tables (Note: Not available in provided v2 docs, may need baseId)
 def list_tables():
     # For v2, this might be /api/v2/meta/bases/{baseId}/tables, but baseId unknown
-    print("List tables not available in v2 API without baseId")
+    logger.debug("List tables not available in v2 API without baseId")
     return []
 
 # Function to check API versions
@@ -62,7 +69,7 @@ def check_api_versions():
     for version, endpoint in endpoints.items():
         try:
             url = f"{API_URL}{endpoint}"
-            response = requests.get(url, headers=headers, timeout=5, verify=False)
+            response = nocodb_request_sync("GET", url, headers=headers, timeout=5)
             if response.status_code == 200:
                 versions.append(version)
         except:
@@ -75,12 +82,12 @@ try:
     available_versions = check_api_versions()
     api_versions_info = available_versions
 except:
-    print("Error checking API versions")
+    logger.warning("Error checking API versions")
 
 # Function to get table metadata including fields with more details
 def get_table_metadata(table_id):
     url = f"{API_URL}/api/v2/meta/tables/{table_id}"
-    response = requests.get(url, headers=headers, verify=False)
+    response = nocodb_request_sync("GET", url, headers=headers)
     response.raise_for_status()
     data = response.json()
     columns = data.get("columns", [])
@@ -104,63 +111,63 @@ def get_table_metadata(table_id):
 # Function to list table records
 def list_table_records(table_id, params=None):
     url = f"{API_URL}/api/v2/tables/{table_id}/records"
-    response = requests.get(url, headers=headers, params=params, verify=False)
+    response = nocodb_request_sync("GET", url, headers=headers, params=params)
     response.raise_for_status()
     return response.json()
 
 # Function to create table records
 def create_table_records(table_id, data):
     url = f"{API_URL}/api/v2/tables/{table_id}/records"
-    response = requests.post(url, headers=headers, json=data, verify=False)
+    response = nocodb_request_sync("POST", url, headers=headers, json=data)
     response.raise_for_status()
     return response.json()
 
 # Function to update table records
 def update_table_records(table_id, data):
     url = f"{API_URL}/api/v2/tables/{table_id}/records"
-    response = requests.patch(url, headers=headers, json=data, verify=False)
+    response = nocodb_request_sync("PATCH", url, headers=headers, json=data)
     response.raise_for_status()
     return response.json()
 
 # Function to delete table records
 def delete_table_records(table_id, data):
     url = f"{API_URL}/api/v2/tables/{table_id}/records"
-    response = requests.delete(url, headers=headers, json=data, verify=False)
+    response = nocodb_request_sync("DELETE", url, headers=headers, json=data)
     response.raise_for_status()
     return response.json()
 
 # Function to read a single table record
 def read_table_record(table_id, record_id, params=None):
     url = f"{API_URL}/api/v2/tables/{table_id}/records/{record_id}"
-    response = requests.get(url, headers=headers, params=params, verify=False)
+    response = nocodb_request_sync("GET", url, headers=headers, params=params)
     response.raise_for_status()
     return response.json()
 
 # Function to count table records
 def count_table_records(table_id, params=None):
     url = f"{API_URL}/api/v2/tables/{table_id}/records/count"
-    response = requests.get(url, headers=headers, params=params, verify=False)
+    response = nocodb_request_sync("GET", url, headers=headers, params=params)
     response.raise_for_status()
     return response.json()
 
 # Function to list linked records
 def list_linked_records(table_id, link_field_id, record_id, params=None):
     url = f"{API_URL}/api/v2/tables/{table_id}/links/{link_field_id}/records/{record_id}"
-    response = requests.get(url, headers=headers, params=params, verify=False)
+    response = nocodb_request_sync("GET", url, headers=headers, params=params)
     response.raise_for_status()
     return response.json()
 
 # Function to link records
 def link_records(table_id, link_field_id, record_id, data):
     url = f"{API_URL}/api/v2/tables/{table_id}/links/{link_field_id}/records/{record_id}"
-    response = requests.post(url, headers=headers, json=data, verify=False)
+    response = nocodb_request_sync("POST", url, headers=headers, json=data)
     response.raise_for_status()
     return response
 
 # Function to unlink records
 def unlink_records(table_id, link_field_id, record_id, data):
     url = f"{API_URL}/api/v2/tables/{table_id}/links/{link_field_id}/records/{record_id}"
-    response = requests.delete(url, headers=headers, json=data, verify=False)
+    response = nocodb_request_sync("DELETE", url, headers=headers, json=data)
     response.raise_for_status()
     return response
 
@@ -172,28 +179,30 @@ def get_raw_column_metadata(column_id):
     """
     try:
         url = f"{API_URL}/api/v1/db/meta/columns/{column_id}"
-        response = requests.get(url, headers=headers, timeout=10, verify=False)
+        response = nocodb_request_sync("GET", url, headers=headers, timeout=10)
 
         if response.status_code == 200:
             return response.json()
         else:
-            print(f"Failed to get column metadata: {response.status_code}")
+            logger.warning("Failed to get column metadata: %s", response.status_code)
             return None
 
     except Exception as e:
-        print(f"Error getting raw column metadata: {e}")
+        logger.error("Error getting raw column metadata: %s", e)
         return None
 
-# Function to get column options as a simple string
+# Function to get column options for the schema table
 def get_column_options(table_id, column_id, field_title=""):
     """
-    Get column options as a detailed string including colors, order, and other metadata
+    Get column options for the schema table's Options column.
+    Select fields return a JSON list of options (title, color, order, id);
+    other field types return a short description of their settings.
     Uses v1 API to get accurate options data for all field types
     """
     try:
         # Use v1 API to get actual column options
         url = f"{API_URL}/api/v1/db/meta/columns/{column_id}"
-        response = requests.get(url, headers=headers, timeout=10, verify=False)
+        response = nocodb_request_sync("GET", url, headers=headers, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
@@ -204,31 +213,8 @@ def get_column_options(table_id, column_id, field_title=""):
             if field_type in ["SingleSelect", "MultiSelect"]:
                 options = col_options.get("options", [])
                 if options:
-                    # Create detailed option strings with all metadata
-                    option_details = []
-                    for opt in options:
-                        title = opt.get("title", "")
-                        color = opt.get("color", "")
-                        order = opt.get("order", "")
-                        value = opt.get("value", "")
-                        option_id = opt.get("id", "")
-
-                        # Format: Title (Color: #hex, Order: N, ID: xxx)
-                        detail = f"{title}"
-                        if color:
-                            detail += f" (Color: {color}"
-                        if order:
-                            detail += f", Order: {order}"
-                        if option_id:
-                            detail += f", ID: {option_id[:8]}...)"
-                        else:
-                            detail += ")"
-
-                        option_details.append(detail)
-
-                    # Sort by order and join
-                    option_details.sort(key=lambda x: int(x.split("Order: ")[1].split(",")[0]) if "Order: " in x else 999)
-                    return " | ".join(option_details)
+                    # Stored as structured JSON (see select_options) and sorted by the numeric order
+                    return dump_options([option_from_nocodb(opt) for opt in options])
 
             elif field_type == "Checkbox":
                 # For checkbox fields, get the default value and other settings
@@ -377,7 +363,7 @@ def get_column_options(table_id, column_id, field_title=""):
         return ""
 
     except Exception as e:
-        print(f"Error getting options for column {column_id}: {e}")
+        logger.error("Error getting options for column %s: %s", column_id, e)
         return ""
 
 # Function to display column options with order and colors
@@ -446,10 +432,10 @@ def update_column_options(column_id, new_options_list, preserve_existing=True):
     try:
         # First get current column metadata
         url = f"{API_URL}/api/v1/db/meta/columns/{column_id}"
-        response = requests.get(url, headers=headers, timeout=10, verify=False)
+        response = nocodb_request_sync("GET", url, headers=headers, timeout=10)
 
         if response.status_code != 200:
-            print(f"Failed to get current column metadata for {column_id}")
+            logger.warning("Failed to get current column metadata for %s", column_id)
             return False
 
         current_data = response.json()
@@ -526,19 +512,19 @@ def update_column_options(column_id, new_options_list, preserve_existing=True):
         }
 
         # Send PATCH request to update
-        response = requests.patch(url, headers=headers, json=update_data, timeout=10, verify=False)
+        response = nocodb_request_sync("PATCH", url, headers=headers, json=update_data, timeout=10)
 
         if response.status_code == 200:
-            print(f"Successfully updated options for column {column_id}")
-            print(f"New options: {[opt['title'] for opt in options]}")
+            logger.info("Successfully updated options for column %s", column_id)
+            logger.info("New options: %s", [opt['title'] for opt in options])
             return True
         else:
-            print(f"Failed to update column {column_id}: {response.status_code}")
-            print(f"Response: {response.text}")
+            logger.warning("Failed to update column %s: %s", column_id, response.status_code)
+            logger.warning("Response: %s", response.text)
             return False
 
     except Exception as e:
-        print(f"Error updating options for column {column_id}: {e}")
+        logger.error("Error updating options for column %s: %s", column_id, e)
         return False
 
 # Function to add specific options to existing select field
@@ -558,7 +544,7 @@ def add_select_options(column_id, options_to_add):
     new_titles = [title for title in options_to_add if title not in current_titles]
 
     if not new_titles:
-        print(f"All options already exist in column {column_id}")
+        logger.info("All options already exist in column %s", column_id)
         return True
 
     all_titles = current_titles + new_titles
@@ -581,7 +567,7 @@ def remove_select_options(column_id, options_to_remove):
     remaining_titles = [title for title in current_titles if title not in options_to_remove]
 
     if len(remaining_titles) == len(current_titles):
-        print(f"None of the specified options found in column {column_id}")
+        logger.info("None of the specified options found in column %s", column_id)
         return True
 
     return update_column_options(column_id, remaining_titles, preserve_existing=False)
@@ -602,17 +588,17 @@ def update_column_metadata(table_id, column_id, updates):
         columns = table_meta.get("columns", [])
         column = next((col for col in columns if col.get("id") == column_id), None)
         if not column:
-            print(f"Column {column_id} not found in table {table_id}")
+            logger.warning("Column %s not found in table %s", column_id, table_id)
             return
         # Update the column with provided updates
         column.update(updates)
         # PATCH the updated column
         url = f"{API_URL}/api/v2/meta/tables/{table_id}/columns/{column_id}"
-        response = requests.patch(url, headers=headers, json=column, verify=False)
+        response = nocodb_request_sync("PATCH", url, headers=headers, json=column)
         response.raise_for_status()
-        print(f"Updated description for column {column_id} in table {table_id}")
+        logger.info("Updated description for column %s in table %s", column_id, table_id)
     except Exception as e:
-        print(f"Error updating column {column_id}: {e}")
+        logger.error("Error updating column %s: %s", column_id, e)
 
 # Main sync function that can be called from the API
 def run_nocodb_sync():
@@ -0,0 +1,199 @@
+"""
+In-memory resolution of the sidebar menu (pages visible to a user).
+
+Two structures replace the per-navigation MySQL queries:
+
+* a permission index: every active page plus, for each group, the ids of the
+  pages it may see (and the id of the Public group every user belongs to)
+* a per-user cache of active group ids keyed by email
+
+Endpoints that change pages, page permissions, groups or memberships call
+`invalidate_pages()` / `invalidate_user_groups()`. Both caches also expire on
+a TTL because the same tables can be edited directly through NocoDB.
+
+With several workers an invalidation is also signalled through the shared
+cache; the other workers drop their copies within a couple of seconds.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+from .cache import TTLCache
+from .shared_cache import Generation
+
+PAGE_INDEX_TTL = float(os.getenv("PAGE_INDEX_TTL", "300"))
+USER_GROUPS_TTL = float(os.getenv("USER_GROUPS_TTL", "300"))
+
+_lock = threading.Lock()
+_index: Optional[dict] = None
+_index_generation = 0
+
+_user_groups = TTLCache(ttl=USER_GROUPS_TTL, max_entries=5000)
+_user_groups_generation = 0
+
+_shared_pages = Generation("page_access:pages")
+_shared_user_groups = Generation("page_access:user_groups")
+
+
+def _sort_value(value):
+    # Mirrors MySQL ordering: NULLs first, strings compared case-insensitively
+    if isinstance(value, str):
+        value = value.lower()
+    return (value is not None, value if value is not None else 0)
+
+
+def _page_sort_key(page: dict):
+    return (
+        _sort_value(page.get("display_order")),
+        _sort_value(page.get("category")),
+        _sort_value(page.get("name")),
+    )
+
+
+def _load_index(cursor) -> dict:
+    cursor.execute("SELECT * FROM pages WHERE is_active = TRUE")
+    pages = {row["id"]: row for row in cursor.fetchall()}
+
+    cursor.execute("SELECT page_id, group_id FROM page_permissions WHERE is_active = TRUE")
+    group_pages: Dict[int, Set[int]] = {}
+    for row in cursor.fetchall():
+        if row["page_id"] in pages:
+            group_pages.setdefault(row["group_id"], set()).add(row["page_id"])
+
+    cursor.execute("SELECT id FROM groups WHERE name = 'Public' AND is_active = TRUE")
+    public_group = cursor.fetchone()
+
+    return {
+        "pages": pages,
+        "ordered_ids": [p["id"] for p in sorted(pages.values(), key=_page_sort_key)],
+        "group_pages": group_pages,
+        "public_group_id": public_group["id"] if public_group else None,
+        "expires_at": time.monotonic() + PAGE_INDEX_TTL,
+    }
+
+
+def _load_user_groups(cursor, email: str) -> Set[int]:
+    cursor.execute("""
+        SELECT DISTINCT g.id
+        FROM users u
+        JOIN user_groups ug ON u.id = ug.user_id AND ug.is_active = TRUE
+        JOIN groups g ON ug.group_id = g.id AND g.is_active = TRUE
+        WHERE u.email = %s AND u.is_active = TRUE
+    """, (email,))
+    return {row["id"] for row in cursor.fetchall()}
+
+
+def get_user_pages(email: str, get_connection: Callable) -> List[dict]:
+    """
+    Pages accessible to `email` through its groups plus the Public group,
+    ordered by display_order, category, name.
+
+    `get_connection` is only called when one of the caches needs a reload.
+    """
+    global _index
+
+    if _shared_pages.changed():
+        _drop_index()
+    if _shared_user_groups.changed():
+        _drop_user_groups(None)
+
+    with _lock:
+        index = _index if _index and _index["expires_at"] > time.monotonic() else None
+        index_generation = _index_generation
+        groups_generation = _user_groups_generation
+    group_ids = _user_groups.get(email)
+
+    if index is None or group_ids is None:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            if index is None:
+                index = _load_index(cursor)
+                with _lock:
+                    # Don't publish a snapshot that an invalidation has already superseded
+                    if _index_generation == index_generation:
+                        _index = index
+            if group_ids is None:
+                group_ids = _load_user_groups(cursor, email)
+                with _lock:
+                    if _user_groups_generation == groups_generation:
+                        _user_groups.set(email, group_ids)
+        finally:
+            cursor.close()
+            conn.close()
+
+    visible_groups = set(group_ids)
+    if index["public_group_id"] is not None:
+        visible_groups.add(index["public_group_id"])
+
+    page_ids: Set[int] = set()
+    for group_id in visible_groups:
+        page_ids |= index["group_pages"].get(group_id, set())
+
+    return [dict(index["pages"][page_id]) for page_id in index["ordered_ids"] if page_id in page_ids]
+
+
+def warm(get_connection: Callable):
+    """Load the permission index ahead of the first menu request"""
+    global _index
+    with _lock:
+        generation = _index_generation
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        index = _load_index(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+    with _lock:
+        if _index_generation == generation:
+            _index = index
+
+
+def _drop_index():
+    global _index, _index_generation
+    with _lock:
+        _index = None
+        _index_generation += 1
+
+
+def _drop_user_groups(email: Optional[str]):
+    global _user_groups_generation
+    with _lock:
+        _user_groups_generation += 1
+        if email is None:
+            _user_groups.clear()
+        else:
+            _user_groups.invalidate(email)
+
+
+def invalidate_pages():
+    """Drop the page/permission index after pages, permissions or groups change"""
+    _drop_index()
+    _shared_pages.bump()
+
+
+def invalidate_user_groups(email: Optional[str] = None):
+    """
+    Drop cached group ids for one user, or for everyone when email is None.
+    Other workers drop all of theirs.
+    """
+    _drop_user_groups(email)
+    _shared_user_groups.bump()
+
+
+def invalidate_all():
+    invalidate_pages()
+    invalidate_user_groups()
+
+
+def stats() -> dict:
+    with _lock:
+        index = _index
+    return {
+        "page_index_loaded": index is not None,
+        "pages": len(index["pages"]) if index else 0,
+        "groups": len(index["group_pages"]) if index else 0,
+        "user_groups": _user_groups.stats(),
+    }
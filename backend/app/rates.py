@@ -0,0 +1,125 @@
+"""
+Background-refreshed BTC exchange rates.
+
+Endpoints read `rate_service.snapshot()`, which never performs network I/O:
+it returns the last good rates together with when they were fetched and
+whether they are stale. A background task refreshes them every
+RATES_REFRESH_INTERVAL seconds from the configured provider:
+
+* RATES_PROVIDER=coingecko (default) - CoinGecko simple price API
+* RATES_PROVIDER=static - fixed rates from RATES_STATIC, e.g.
+  "GBP=55000,NOK=650000,USD=60000" (local development and tests)
+"""
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import httpx
+
+from .logging_setup import get_logger
+
+logger = get_logger("rates")
+
+RATES_REFRESH_INTERVAL = float(os.getenv("RATES_REFRESH_INTERVAL", "300"))
+RATES_STALE_AFTER = float(os.getenv("RATES_STALE_AFTER", str(RATES_REFRESH_INTERVAL * 3)))
+RATES_HTTP_TIMEOUT = float(os.getenv("RATES_HTTP_TIMEOUT", "10"))
+
+# Served until the first successful refresh
+FALLBACK_BTC_RATES = {"GBP": 55000, "NOK": 650000, "USD": 60000}
+
+
+class CoinGeckoProvider:
+    name = "coingecko"
+    url = "https://api.coingecko.com/api/v3/simple/price"
+
+    async def fetch(self) -> Dict[str, float]:
+        async with httpx.AsyncClient(timeout=RATES_HTTP_TIMEOUT) as client:
+            response = await client.get(self.url, params={"ids": "bitcoin", "vs_currencies": "gbp,nok,usd"})
+            response.raise_for_status()
+            bitcoin = response.json()["bitcoin"]
+        return {"GBP": bitcoin["gbp"], "NOK": bitcoin["nok"], "USD": bitcoin["usd"]}
+
+
+class StaticRateProvider:
+    name = "static"
+
+    def __init__(self, rates: Dict[str, float]):
+        self.rates = dict(rates)
+
+    @classmethod
+    def from_env(cls) -> "StaticRateProvider":
+        spec = os.getenv("RATES_STATIC", "")
+        rates = dict(FALLBACK_BTC_RATES)
+        for part in spec.split(","):
+            if "=" in part:
+                currency, value = part.split("=", 1)
+                rates[currency.strip().upper()] = float(value)
+        return cls(rates)
+
+    async def fetch(self) -> Dict[str, float]:
+        return dict(self.rates)
+
+
+def provider_from_env():
+    if os.getenv("RATES_PROVIDER", "coingecko").lower() == "static":
+        return StaticRateProvider.from_env()
+    return CoinGeckoProvider()
+
+
+class RateService:
+    def __init__(self, provider, refresh_interval: float = RATES_REFRESH_INTERVAL):
+        self.provider = provider
+        self.refresh_interval = refresh_interval
+        self._rates: Dict[str, float] = dict(FALLBACK_BTC_RATES)
+        self._fetched_at: Optional[datetime] = None
+        self._fetched_monotonic: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> bool:
+        try:
+            rates = await self.provider.fetch()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.warning("Error fetching live rates: %s", e)
+            return False
+        # Swap in one assignment so readers never see a half-updated dict
+        self._rates = rates
+        self._fetched_at = datetime.now()
+        self._fetched_monotonic = time.monotonic()
+        self.last_error = None
+        return True
+
+    def snapshot(self) -> dict:
+        age = time.monotonic() - self._fetched_monotonic if self._fetched_monotonic is not None else None
+        return {
+            "rates": dict(self._rates),
+            "provider": self.provider.name,
+            "fetched_at": self._fetched_at.isoformat() if self._fetched_at else None,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "stale": age is None or age > RATES_STALE_AFTER,
+            "last_error": self.last_error,
+        }
+
+    async def _loop(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+rate_service = RateService(provider_from_env())
@@ -0,0 +1,310 @@
+"""
+Token-scoped response cache for NocoDB-backed read endpoints.
+
+`@cached_response(...)` sits between the route decorator and a GET endpoint:
+
+    @app.get("/nocodb/table/{table_id}")
+    @cached_response("nocodb_table_info", ttl=30, scope=user_scope, table=lambda kw: kw["table_id"])
+    async def get_nocodb_table_info(table_id: str, current_user: dict = Depends(get_current_user)):
+
+Entries are keyed by the NocoDB table read, a token scope (a hash of the token
+the endpoint would call NocoDB with, so users whose tokens see different data
+never share an entry) and the endpoint's query parameters with blanks
+dropped. Each endpoint gets its own LRU with its own TTL.
+
+Only successes are stored: dict/list results without an "error" key, and 200
+Responses. Stored Responses are replayed with their ETag, and the caller's
+If-None-Match still gets a 304. Write endpoints call `invalidate(table=...)`.
+
+Expired entries are kept for RESPONSE_CACHE_STALE_TTL seconds more. While
+NocoDB is unhealthy (its circuit breaker has recorded failures) a request
+that cannot be answered fresh gets the stale copy, marked with a Warning
+header, instead of an error; while the breaker is open the endpoint is not
+called at all.
+
+With the shared cache on (several workers, see shared_cache) entries also go
+to the cross-process store: a worker's own copy lives at most
+SHARED_CACHE_LOCAL_TTL seconds, so invalidations made by other workers show
+up quickly, and a miss is filled by one worker while the others wait up to
+SHARED_CACHE_FILL_WAIT seconds for its result.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Union
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from starlette.concurrency import run_in_threadpool
+
+from . import shared_cache
+from .cache import TTLCache
+from .http_cache import not_modified
+from .circuit_breaker import OPEN
+from .logging_setup import get_logger
+from .nocodb_client import breaker as nocodb_breaker
+
+logger = get_logger("response_cache")
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() != "false"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+RESPONSE_CACHE_STALE_TTL = float(os.getenv("RESPONSE_CACHE_STALE_TTL", "3600"))
+
+SHARED_CACHE_LOCAL_TTL = float(os.getenv("SHARED_CACHE_LOCAL_TTL", "2"))
+SHARED_CACHE_FILL_WAIT = float(os.getenv("SHARED_CACHE_FILL_WAIT", "10"))
+_FILL_POLL_INTERVAL = 0.05
+
+STALE_WARNING = '110 - "Response is Stale"'
+
+# Endpoint arguments that identify the caller rather than the data requested
+_NOT_PARAMS = ("request", "current_user")
+
+_MISS = object()
+_caches: Dict[str, TTLCache] = {}
+_stale: Dict[str, TTLCache] = {}
+_lock = threading.Lock()
+_generation = 0
+invalidations = 0
+stale_served = 0
+
+
+def _normalise(value):
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalise(v) for v in value)
+    return value
+
+
+def _params_key(kwargs: dict) -> tuple:
+    params = ((name, _normalise(value)) for name, value in kwargs.items() if name not in _NOT_PARAMS)
+    return tuple(sorted((name, value) for name, value in params if value is not None))
+
+
+def _without_conditional_headers(request: Request) -> Request:
+    # The endpoint must always produce the full body so there is something to
+    # store; the caller's If-None-Match is applied to the stored entry instead
+    scope = dict(request.scope)
+    scope["headers"] = [(k, v) for k, v in request.scope["headers"] if k != b"if-none-match"]
+    return Request(scope, request.receive)
+
+
+def _storable(result: Any) -> Optional[tuple]:
+    if isinstance(result, Response):
+        if result.status_code != 200:
+            return None
+        headers = {k: v for k, v in result.headers.items() if k != "content-length"}
+        return ("response", result.body, headers, result.media_type)
+    if isinstance(result, dict) and "error" not in result:
+        return ("value", result)
+    if isinstance(result, list):
+        return ("value", result)
+    return None
+
+
+def _replay(entry: tuple, request: Optional[Request], stale: bool = False) -> Any:
+    if entry[0] == "value":
+        if stale:
+            return JSONResponse(content=entry[1], headers={"Warning": STALE_WARNING})
+        return entry[1]
+    _, body, headers, media_type = entry
+    if stale:
+        headers = {**headers, "warning": STALE_WARNING, "cache-control": "private, no-cache"}
+    if not_modified(request, headers.get("etag")):
+        return Response(
+            status_code=304,
+            headers={k: v for k, v in headers.items() if k in ("etag", "cache-control", "warning")},
+        )
+    return Response(content=body, status_code=200, headers=headers, media_type=media_type)
+
+
+def _serve_stale(stale_cache: TTLCache, key: Hashable, request: Optional[Request]) -> Any:
+    global stale_served
+    entry = stale_cache.get(key, _MISS)
+    if entry is _MISS:
+        return _MISS
+    with _lock:
+        stale_served += 1
+    logger.info("NocoDB unavailable (%s), serving stale response", nocodb_breaker.state)
+    return _replay(entry, request, stale=True)
+
+
+def cached_response(
+    name: str,
+    ttl: float,
+    scope: Callable[[dict], str],
+    table: Union[None, str, Callable[[dict], Optional[str]]] = None,
+    max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+):
+    """
+    Cache an endpoint's successful results for `ttl` seconds.
+
+    `scope(kwargs)` returns the caller's token scope; it may block and is run
+    in the threadpool for async endpoints. `table` (a table id, or a function
+    of the endpoint's kwargs) tags entries for `invalidate(table=...)`.
+    """
+    local_ttl = min(ttl, SHARED_CACHE_LOCAL_TTL) if shared_cache.ENABLED else ttl
+    cache = _caches.setdefault(name, TTLCache(ttl=local_ttl, max_entries=max_entries))
+    stale_cache = _stale.setdefault(name, TTLCache(ttl=ttl + RESPONSE_CACHE_STALE_TTL, max_entries=max_entries))
+
+    def table_of(kwargs: dict) -> Optional[str]:
+        return table(kwargs) if callable(table) else table
+
+    def shared_key(key: tuple) -> str:
+        return f"response:{name}:" + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+    def from_shared(key: tuple) -> Any:
+        entry = shared_cache.get(shared_key(key), _MISS)
+        if entry is not _MISS:
+            cache.set(key, entry)
+            stale_cache.set(key, entry)
+        return entry
+
+    def lookup(kwargs: dict, scope_value: str):
+        # Blocking (scope functions and the shared store); run in the threadpool
+        key = (table_of(kwargs), scope_value, _params_key(kwargs))
+        request = kwargs.get("request")
+        entry = cache.get(key, _MISS)
+        if entry is _MISS and shared_cache.ENABLED:
+            entry = from_shared(key)
+        if entry is not _MISS:
+            return key, request, _replay(entry, request)
+        if nocodb_breaker.state == OPEN:
+            # Fail fast: the endpoint would only be refused by the breaker
+            stale = _serve_stale(stale_cache, key, request)
+            if stale is not _MISS:
+                return key, request, stale
+        if isinstance(request, Request):
+            kwargs["request"] = _without_conditional_headers(request)
+        return key, request, _MISS
+
+    def remember(key: Hashable, generation: int, result: Any, request: Optional[Request]) -> Any:
+        entry = _storable(result)
+        if entry is None:
+            if not nocodb_breaker.healthy:
+                stale = _serve_stale(stale_cache, key, request)
+                if stale is not _MISS:
+                    return stale
+            return result
+        with _lock:
+            # Skip the store if a write invalidated while this result was being built
+            store = generation == _generation
+            if store:
+                cache.set(key, entry)
+                stale_cache.set(key, entry)
+        if store and shared_cache.ENABLED:
+            shared_cache.put(shared_key(key), entry, ttl, tag=key[0])
+        return _replay(entry, request) if entry[0] == "response" else result
+
+    def claim_fill(key: tuple) -> bool:
+        # True when this worker should call the endpoint; otherwise another
+        # worker is already fetching the same response
+        return not shared_cache.ENABLED or shared_cache.acquire_lease(shared_key(key), SHARED_CACHE_FILL_WAIT)
+
+    def release_fill(key: tuple):
+        if shared_cache.ENABLED:
+            shared_cache.release_lease(shared_key(key))
+
+    def stale_or_raise(key: tuple, request: Optional[Request], error: Exception) -> Any:
+        stale = _MISS if nocodb_breaker.healthy else _serve_stale(stale_cache, key, request)
+        if stale is _MISS:
+            raise error
+        return stale
+
+    def decorator(endpoint: Callable):
+        if inspect.iscoroutinefunction(endpoint):
+            @functools.wraps(endpoint)
+            async def wrapper(**kwargs):
+                if not RESPONSE_CACHE_ENABLED:
+                    return await endpoint(**kwargs)
+                generation = _generation
+                key, request, hit = await run_in_threadpool(lambda: lookup(kwargs, scope(kwargs)))
+                if hit is not _MISS:
+                    return hit
+                if not await run_in_threadpool(claim_fill, key):
+                    deadline = time.monotonic() + SHARED_CACHE_FILL_WAIT
+                    while time.monotonic() < deadline:
+                        await asyncio.sleep(_FILL_POLL_INTERVAL)
+                        entry = await run_in_threadpool(from_shared, key)
+                        if entry is not _MISS:
+                            return _replay(entry, request)
+                try:
+                    result = await endpoint(**kwargs)
+                    return await run_in_threadpool(remember, key, generation, result, request)
+                except Exception as e:
+                    return stale_or_raise(key, request, e)
+                finally:
+                    await run_in_threadpool(release_fill, key)
+        else:
+            @functools.wraps(endpoint)
+            def wrapper(**kwargs):
+                if not RESPONSE_CACHE_ENABLED:
+                    return endpoint(**kwargs)
+                generation = _generation
+                key, request, hit = lookup(kwargs, scope(kwargs))
+                if hit is not _MISS:
+                    return hit
+                if not claim_fill(key):
+                    deadline = time.monotonic() + SHARED_CACHE_FILL_WAIT
+                    while time.monotonic() < deadline:
+                        time.sleep(_FILL_POLL_INTERVAL)
+                        entry = from_shared(key)
+                        if entry is not _MISS:
+                            return _replay(entry, request)
+                try:
+                    result = endpoint(**kwargs)
+                    return remember(key, generation, result, request)
+                except Exception as e:
+                    return stale_or_raise(key, request, e)
+                finally:
+                    release_fill(key)
+        return wrapper
+
+    return decorator
+
+
+def invalidate(table: Optional[str] = None, name: Optional[str] = None) -> int:
+    """
+    Drop cached responses for one table, one endpoint, or (no arguments) all.
+
+    Returns the number of entries removed.
+    """
+    global _generation, invalidations
+    with _lock:
+        _generation += 1
+        invalidations += 1
+    names = [name] if name in _caches else ([] if name else list(_caches))
+    removed = 0
+    for n in names:
+        # Stale copies go too: after a write, old data is not a fallback
+        if table is None:
+            removed += len(_caches[n])
+            _caches[n].clear()
+            _stale[n].clear()
+        else:
+            removed += _caches[n].invalidate_where(lambda key: key[0] == table)
+            _stale[n].invalidate_where(lambda key: key[0] == table)
+    if shared_cache.ENABLED:
+        prefix = f"response:{name}:" if name else "response:"
+        if table is None:
+            removed += shared_cache.delete_prefix(prefix)
+        else:
+            removed += shared_cache.delete_tag(table, prefix)
+    if removed:
+        logger.debug("Invalidated %s cached responses (table=%s, endpoint=%s)", removed, table, name)
+    return removed
+
+
+def stats() -> dict:
+    return {
+        "enabled": RESPONSE_CACHE_ENABLED,
+        "invalidations": invalidations,
+        "stale_served": stale_served,
+        "endpoints": {name: cache.stats() for name, cache in _caches.items()},
+        "shared": shared_cache.stats(),
+    }
@@ -0,0 +1,141 @@
+"""
+Structured SingleSelect/MultiSelect options for schema table records.
+
+The sync (nocodb_sync.get_column_options) stores select options in the
+schema table's Options column as a JSON list:
+
+    [{"title": "Power", "color": "#cfdffe", "order": 1, "id": "sl1a2b3c..."}, ...]
+
+Rows written before that carry the legacy display string
+"Power (Color: #cfdffe, Order: 1, ID: sl1a2b3c...) | ...". Both forms are
+parsed by `parse_options`, which is memoised on the raw value, so each
+distinct Options value is parsed once per process rather than on every
+schema request. Returned lists are shared; treat them as read-only.
+"""
+import json
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+SELECT_TYPES = ("SingleSelect", "MultiSelect")
+DEFAULT_COLOR = "#cfdffe"
+UNORDERED = 999
+
+
+def option_from_nocodb(opt: dict) -> dict:
+    """One NocoDB colOptions.options entry -> stored option"""
+    order = opt.get("order")
+    return {
+        "title": opt.get("title", ""),
+        "color": opt.get("color") or None,
+        "order": order if isinstance(order, (int, float)) else UNORDERED,
+        "id": opt.get("id") or None,
+    }
+
+
+def dump_options(options: List[dict]) -> str:
+    """Stable JSON for the Options column; identical input gives identical text"""
+    ordered = sorted(options, key=lambda o: o["order"])
+    return json.dumps(ordered, separators=(",", ":"), ensure_ascii=False)
+
+
+def _parse_legacy(raw: str) -> List[dict]:
+    options = []
+    for part in raw.split(" | "):
+        part = part.strip()
+        if not part:
+            continue
+        title, _, detail = part.partition(" (")
+        option = {"title": title.strip(), "color": None, "order": UNORDERED, "id": None}
+        for item in detail.rstrip(")").split(", "):
+            key, _, value = item.partition(": ")
+            value = value.strip()
+            if key == "Color" and value:
+                option["color"] = value
+            elif key == "Order":
+                try:
+                    option["order"] = int(value)
+                except ValueError:
+                    pass
+            elif key == "ID" and value:
+                option["id"] = value
+        if option["title"]:
+            options.append(option)
+    return options
+
+
+@lru_cache(maxsize=4096)
+def _parse(raw: str) -> Tuple[dict, ...]:
+    if raw.lstrip().startswith("["):
+        try:
+            options = [option_from_nocodb(o) for o in json.loads(raw) if isinstance(o, dict)]
+        except ValueError:
+            options = _parse_legacy(raw)
+    else:
+        options = _parse_legacy(raw)
+    options.sort(key=lambda o: o["order"])
+    return tuple(options)
+
+
+def parse_options(raw, field_type: str = "SingleSelect") -> List[dict]:
+    """Options of a select field from either stored form; [] for other field types"""
+    if field_type not in SELECT_TYPES or not raw:
+        return []
+    if isinstance(raw, list):
+        return sorted((option_from_nocodb(o) for o in raw if isinstance(o, dict)), key=lambda o: o["order"])
+    return list(_parse(str(raw)))
+
+
+@lru_cache(maxsize=4096)
+def _legacy(raw: str, field_type: str) -> str:
+    if field_type not in SELECT_TYPES or not raw.lstrip().startswith("["):
+        return raw
+    return legacy_string(parse_options(raw, field_type))
+
+
+def legacy_string(options: List[dict]) -> str:
+    """Display string in the pre-JSON format the frontend still reads"""
+    parts = []
+    for opt in options:
+        details = []
+        if opt.get("color"):
+            details.append(f"Color: {opt['color']}")
+        if opt.get("order") != UNORDERED:
+            details.append(f"Order: {opt['order']}")
+        if opt.get("id"):
+            option_id = opt["id"]
+            details.append(f"ID: {option_id if option_id.endswith('...') else option_id[:8] + '...'}")
+        parts.append(f"{opt['title']} ({', '.join(details)})" if details else opt["title"])
+    return " | ".join(parts)
+
+
+def display_options(raw, field_type: str) -> str:
+    """Options column as served to clients: legacy string form, whatever is stored"""
+    if not raw:
+        return ""
+    if isinstance(raw, list):
+        return legacy_string(parse_options(raw, field_type))
+    return _legacy(str(raw), field_type or "")
+
+
+def as_choices(options: List[dict]) -> List[dict]:
+    """Dropdown choices in the shape of the schema endpoint's fieldOptions"""
+    return [
+        {
+            "value": opt["title"],
+            "label": opt["title"],
+            "order": opt["order"],
+            "color": opt.get("color") or DEFAULT_COLOR,
+        }
+        for opt in options
+    ]
+
+
+def option_order(value: Optional[str], options: List[dict]) -> int:
+    """Order of `value` among `options`, case-insensitive; UNORDERED when absent"""
+    if not value:
+        return UNORDERED
+    wanted = value.lower()
+    for opt in options:
+        if opt["title"].lower() == wanted:
+            return opt["order"]
+    return UNORDERED
@@ -0,0 +1,268 @@
+"""
+Cache shared by the worker processes of one deployment.
+
+With WEB_CONCURRENCY > 1 uvicorn runs several workers, and every in-memory
+cache would be built - and fetched from NocoDB - once per worker. This module
+keeps a single SQLite database (WAL mode) at SHARED_CACHE_PATH that all
+workers on the host read and write:
+
+* entries - pickled values with an expiry time and an optional tag used for
+  invalidation (the NocoDB table a cached response came from)
+* leases - named locks with an owner and an expiry, used to elect the worker
+  that refreshes the table mirrors and to let a single worker fill a missing
+  cache entry while the others wait for it
+* generations - tokens a worker changes when it invalidates a private
+  in-memory cache, so the other workers drop their copies too
+
+Settings:
+
+* SHARED_CACHE - auto (default: on when WEB_CONCURRENCY > 1), true or false
+* SHARED_CACHE_PATH - database file; must be on a filesystem every worker
+  sees (default: the temp directory)
+
+Only this application's own workers write the file, which is created with
+owner-only permissions. Any SQLite error is logged and treated as a miss, so
+the shared cache can drop a worker back to single-process behaviour but
+never fails a request.
+"""
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Optional
+
+from .cache import hit_rate
+from .logging_setup import get_logger
+
+logger = get_logger("shared_cache")
+
+
+def _enabled_from_env() -> bool:
+    setting = os.getenv("SHARED_CACHE", "auto").lower()
+    if setting == "auto":
+        try:
+            return int(os.getenv("WEB_CONCURRENCY", "1")) > 1
+        except ValueError:
+            return False
+    return setting == "true"
+
+
+ENABLED = _enabled_from_env()
+SHARED_CACHE_PATH = os.getenv(
+    "SHARED_CACHE_PATH", os.path.join(tempfile.gettempdir(), "s42-shared-cache.sqlite3")
+)
+# Expired rows are purged on roughly one write in this many
+_PURGE_EVERY = 200
+# How often a worker looks for other workers' invalidations
+GENERATION_CHECK_INTERVAL = float(os.getenv("SHARED_CACHE_LOCAL_TTL", "2"))
+_GENERATION_TTL = 7 * 24 * 3600
+
+_local = threading.local()
+_counter_lock = threading.Lock()
+_counters = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, tag TEXT, expires_at REAL NOT NULL, value BLOB NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS entries_tag ON entries (tag)",
+    "CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)",
+)
+
+
+def worker_id() -> str:
+    return f"pid-{os.getpid()}"
+
+
+def _count(name: str):
+    with _counter_lock:
+        _counters[name] += 1
+
+
+def _connection() -> sqlite3.Connection:
+    # One connection per thread; reopened after a fork
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid():
+        fd = os.open(SHARED_CACHE_PATH, os.O_CREAT | os.O_RDWR, 0o600)
+        os.close(fd)
+        conn = sqlite3.connect(SHARED_CACHE_PATH, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        _local.conn, _local.pid = conn, os.getpid()
+    return conn
+
+
+def _failed(operation: str, e: Exception):
+    _count("errors")
+    logger.warning("Shared cache %s failed: %s", operation, e)
+
+
+def get(key: str, default: Any = None) -> Any:
+    try:
+        row = _connection().execute(
+            "SELECT value FROM entries WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            _count("misses")
+            return default
+        value = pickle.loads(row[0])
+    except (sqlite3.Error, OSError, pickle.PickleError, EOFError) as e:
+        _failed("read", e)
+        return default
+    _count("hits")
+    return value
+
+
+def put(key: str, value: Any, ttl: float, tag: Optional[str] = None):
+    try:
+        conn = _connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, tag, expires_at, value) VALUES (?, ?, ?, ?)",
+            (key, tag, time.time() + ttl, sqlite3.Binary(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))),
+        )
+        with _counter_lock:
+            _counters["writes"] += 1
+            purge = _counters["writes"] % _PURGE_EVERY == 0
+        if purge:
+            conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+    except (sqlite3.Error, OSError, pickle.PickleError) as e:
+        _failed("write", e)
+
+
+def delete(key: str):
+    try:
+        _connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+    except (sqlite3.Error, OSError) as e:
+        _failed("delete", e)
+
+
+def delete_tag(tag: str, prefix: str = "") -> int:
+    """Remove entries carrying `tag` (whose key starts with `prefix`)"""
+    try:
+        cursor = _connection().execute(
+            "DELETE FROM entries WHERE tag = ? AND substr(key, 1, ?) = ?", (tag, len(prefix), prefix)
+        )
+        return cursor.rowcount
+    except (sqlite3.Error, OSError) as e:
+        _failed("delete", e)
+        return 0
+
+
+def delete_prefix(prefix: str) -> int:
+    try:
+        cursor = _connection().execute("DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        return cursor.rowcount
+    except (sqlite3.Error, OSError) as e:
+        _failed("delete", e)
+        return 0
+
+
+def acquire_lease(name: str, ttl: float) -> bool:
+    """
+    Take (or renew) the named lease for `ttl` seconds.
+
+    True when this worker now holds it; False when another worker holds an
+    unexpired lease. Errors count as not acquired.
+    """
+    now = time.time()
+    try:
+        cursor = _connection().execute(
+            """
+            INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+            WHERE leases.expires_at <= ? OR leases.owner = excluded.owner
+            """,
+            (name, worker_id(), now + ttl, now),
+        )
+        return cursor.rowcount > 0
+    except (sqlite3.Error, OSError) as e:
+        _failed("lease", e)
+        return False
+
+
+def release_lease(name: str):
+    try:
+        _connection().execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, worker_id()))
+    except (sqlite3.Error, OSError) as e:
+        _failed("lease release", e)
+
+
+def lease_owner(name: str) -> Optional[str]:
+    try:
+        row = _connection().execute(
+            "SELECT owner FROM leases WHERE name = ? AND expires_at > ?", (name, time.time())
+        ).fetchone()
+    except (sqlite3.Error, OSError) as e:
+        _failed("lease read", e)
+        return None
+    return row[0] if row else None
+
+
+def stats() -> dict:
+    with _counter_lock:
+        counters = dict(_counters)
+    result = {
+        "enabled": ENABLED,
+        "worker": worker_id(),
+        **counters,
+        "hit_rate": hit_rate(counters["hits"], counters["misses"]),
+    }
+    if ENABLED:
+        try:
+            row = _connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM entries WHERE expires_at > ?", (time.time(),)
+            ).fetchone()
+            result.update({"path": SHARED_CACHE_PATH, "entries": row[0], "bytes": row[1]})
+        except (sqlite3.Error, OSError) as e:
+            _failed("stats", e)
+    return result
+
+
+class Generation:
+    """
+    Cross-worker invalidation signal for a private in-memory cache.
+
+    The invalidating worker calls `bump()`; readers call `changed()`, which
+    checks the shared token at most every GENERATION_CHECK_INTERVAL seconds
+    and returns True once when another worker bumped it since. Both are no-ops
+    (False) while the shared cache is off.
+    """
+
+    def __init__(self, name: str):
+        self.key = f"generation:{name}"
+        self._lock = threading.Lock()
+        self._seen: Optional[str] = None
+        self._checked_at = 0.0
+        self._created_ns = time.time_ns()
+
+    def bump(self):
+        if not ENABLED:
+            return
+        token = f"{worker_id()}:{time.time_ns()}"
+        with self._lock:
+            self._seen = token
+        put(self.key, token, _GENERATION_TTL)
+
+    def changed(self) -> bool:
+        if not ENABLED:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < GENERATION_CHECK_INTERVAL:
+                return False
+            self._checked_at = now
+        token = get(self.key)
+        with self._lock:
+            if token is None or token == self._seen:
+                return False
+            first_check = self._seen is None
+            self._seen = token
+        if first_check:
+            # Bumps from before this process started concern caches it never had
+            try:
+                return int(token.rsplit(":", 1)[1]) >= self._created_ns
+            except (IndexError, ValueError):
+                return True
+        return True
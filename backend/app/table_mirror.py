@@ -0,0 +1,411 @@
+"""
+In-memory read-through mirror of the NocoDB Projects and Land Plots tables.
+
+Read endpoints serve rows from here instead of pulling the full record lists
+from NocoDB on every request. Each mirror:
+
+* is fully loaded in the background at startup and again every
+  MIRROR_FULL_RELOAD_INTERVAL seconds (this also drops deleted rows)
+* is refreshed incrementally every MIRROR_REFRESH_INTERVAL seconds, fetching
+  only rows whose updated-at field is at or after the high-water mark
+* applies NocoDB webhook events (upsert/delete) as they arrive
+* keeps secondary indexes (partner, country, status) next to the Id map
+
+With the shared cache on (several workers) only the worker holding the
+"mirror-refresh" lease talks to NocoDB; it publishes the rows to the shared
+store after every change and the other workers load them from there, checking
+every MIRROR_FOLLOW_INTERVAL seconds. A delete arriving at a follower by
+webhook makes the leader run a full reload on its next cycle.
+
+Rows handed out are shared; callers must treat them as read-only.
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from . import shared_cache
+from .logging_setup import get_logger
+from .nocodb_client import nocodb_get, nocodb_headers, nocodb_list_all
+
+logger = get_logger("mirror")
+
+MIRROR_REFRESH_INTERVAL = float(os.getenv("MIRROR_REFRESH_INTERVAL", "60"))
+MIRROR_FULL_RELOAD_INTERVAL = float(os.getenv("MIRROR_FULL_RELOAD_INTERVAL", "3600"))
+MIRROR_UPDATED_FIELD = os.getenv("MIRROR_UPDATED_FIELD", "UpdatedAt")
+MIRROR_FOLLOW_INTERVAL = float(os.getenv("MIRROR_FOLLOW_INTERVAL", "5"))
+
+MIRROR_LEASE = "mirror-refresh"
+# The leader renews every cycle; a worker that dies loses the lease after this
+MIRROR_LEASE_TTL = MIRROR_REFRESH_INTERVAL * 3
+
+
+def _index_key(value) -> Optional[str]:
+    if value is None:
+        return None
+    key = str(value).strip().lower()
+    return key or None
+
+
+class TableMirror:
+    def __init__(self, name: str, table_id: str, titles: Iterable[str], index_fields: Dict[str, str]):
+        self.name = name
+        self.table_id = table_id
+        self.titles = {t.lower() for t in titles}
+        self.index_fields = index_fields  # index name -> NocoDB field title
+        self._lock = threading.Lock()
+        self._rows: Dict[int, dict] = {}
+        self._indexes: Dict[str, Dict[str, Set[int]]] = {name: {} for name in index_fields}
+        self.loaded = False
+        self.version = 0  # bumped on every change so derived views know when to rebuild
+        self.high_water: Optional[str] = None
+        self.last_full_load: Optional[float] = None
+        self.last_refresh: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._published_version: Optional[int] = None
+        self._loaded_stamp: Optional[str] = None
+
+    # ----- reads -----
+
+    def snapshot(self) -> Tuple[int, Optional[List[dict]]]:
+        """(version, rows) read together; rows is None while not loaded"""
+        with self._lock:
+            return self.version, (list(self._rows.values()) if self.loaded else None)
+
+    def all_rows(self) -> Optional[List[dict]]:
+        """Every row, or None while the mirror has not been loaded yet"""
+        with self._lock:
+            return list(self._rows.values()) if self.loaded else None
+
+    def get(self, row_id) -> Optional[dict]:
+        try:
+            row_id = int(row_id)
+        except (TypeError, ValueError):
+            return None
+        with self._lock:
+            return self._rows.get(row_id)
+
+    def find(self, **filters) -> Optional[List[dict]]:
+        """
+        Rows matching every given index (case-insensitive equality), e.g.
+        find(partner="APL", country="Norway"). None while not loaded.
+        """
+        with self._lock:
+            if not self.loaded:
+                return None
+            ids: Optional[Set[int]] = None
+            for index_name, value in filters.items():
+                matches = self._indexes[index_name].get(_index_key(value), set())
+                ids = set(matches) if ids is None else ids & matches
+            if ids is None:
+                return list(self._rows.values())
+            return [self._rows[i] for i in ids]
+
+    # ----- writes -----
+
+    def _unindex(self, row_id: int):
+        row = self._rows.get(row_id)
+        if not row:
+            return
+        for index_name, field in self.index_fields.items():
+            key = _index_key(row.get(field))
+            bucket = self._indexes[index_name].get(key)
+            if bucket:
+                bucket.discard(row_id)
+                if not bucket:
+                    del self._indexes[index_name][key]
+
+    def _index(self, row_id: int, row: dict):
+        for index_name, field in self.index_fields.items():
+            key = _index_key(row.get(field))
+            if key is not None:
+                self._indexes[index_name].setdefault(key, set()).add(row_id)
+
+    def _bump_high_water(self, row: dict):
+        updated = row.get(MIRROR_UPDATED_FIELD)
+        if updated and (self.high_water is None or str(updated) > self.high_water):
+            self.high_water = str(updated)
+
+    def replace_all(self, rows: List[dict]):
+        with self._lock:
+            self._rows = {}
+            self._indexes = {name: {} for name in self.index_fields}
+            self.high_water = None
+            for row in rows:
+                row_id = row.get("Id") or row.get("id")
+                if row_id is None:
+                    continue
+                self._rows[int(row_id)] = row
+                self._index(int(row_id), row)
+                self._bump_high_water(row)
+            self.loaded = True
+            self.version += 1
+
+    def upsert(self, row: dict):
+        row_id = row.get("Id") or row.get("id")
+        if row_id is None:
+            return
+        row_id = int(row_id)
+        with self._lock:
+            # Webhook payloads may be partial; keep fields we already have
+            existing = self._rows.get(row_id)
+            merged = {**(existing or {}), **row}
+            if merged == existing:
+                # Incremental refreshes re-read rows at the high-water mark;
+                # unchanged ones must not trigger rebuilds or re-publishing
+                return
+            self._unindex(row_id)
+            self._rows[row_id] = merged
+            self._index(row_id, merged)
+            self._bump_high_water(merged)
+            self.version += 1
+
+    def remove(self, row_id):
+        try:
+            row_id = int(row_id)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._unindex(row_id)
+            if self._rows.pop(row_id, None) is not None:
+                self.version += 1
+
+    # ----- synchronisation -----
+
+    def _url(self) -> str:
+        return f"{os.getenv('NOCODB_API_URL', 'https://nocodb.edbmotte.com')}/api/v2/tables/{self.table_id}/records"
+
+    async def full_load(self):
+        rows = await nocodb_list_all(self._url(), headers=nocodb_headers(os.getenv("NOCODB_API_TOKEN")))
+        self.replace_all(rows)
+        self.last_full_load = self.last_refresh = time.monotonic()
+        logger.info("%s mirror loaded: %s rows", self.name, len(rows))
+
+    async def refresh(self):
+        """Incremental refresh from the high-water mark; full load when there is none"""
+        if not self.loaded or not self.high_water:
+            await self.full_load()
+            return
+        # Date granularity: re-reads today's edits, which upsert idempotently
+        since = str(self.high_water)[:10]
+        rows = await nocodb_list_all(
+            self._url(),
+            headers=nocodb_headers(os.getenv("NOCODB_API_TOKEN")),
+            params={"where": f"({MIRROR_UPDATED_FIELD},gte,exactDate,{since})"},
+        )
+        for row in rows:
+            self.upsert(row)
+        self.last_refresh = time.monotonic()
+
+    async def refresh_row(self, row_id):
+        """Re-read one row after a write made through this API (read-your-writes)"""
+        response = await nocodb_get(f"{self._url()}/{row_id}", headers=nocodb_headers(os.getenv("NOCODB_API_TOKEN")))
+        if response.status_code == 200:
+            self.upsert(response.json())
+        elif response.status_code == 404:
+            self.remove(row_id)
+
+    async def sync_once(self):
+        try:
+            due_full = (
+                self.last_full_load is None
+                or time.monotonic() - self.last_full_load >= MIRROR_FULL_RELOAD_INTERVAL
+                or (shared_cache.ENABLED and await run_in_threadpool(self._take_reload_request))
+            )
+            if due_full:
+                await self.full_load()
+            else:
+                await self.refresh()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error("%s mirror refresh failed: %s", self.name, str(e))
+
+    async def wait_until_loaded(self, poll_interval: float = 0.25):
+        """Wait for the background refresher's first load; raises if it failed"""
+        while not self.loaded:
+            if self.last_error:
+                raise RuntimeError(f"{self.name} mirror load failed: {self.last_error}")
+            await asyncio.sleep(poll_interval)
+
+    # ----- sharing between workers -----
+
+    def _shared_key(self, part: str) -> str:
+        return f"mirror:{self.table_id}:{part}"
+
+    def publish(self):
+        """Leader: write the rows to the shared store if they changed since the last publish"""
+        with self._lock:
+            if not self.loaded or self.version == self._published_version:
+                return
+            version, rows, high_water = self.version, list(self._rows.values()), self.high_water
+        stamp = f"{shared_cache.worker_id()}:{version}"
+        ttl = MIRROR_FULL_RELOAD_INTERVAL * 2
+        shared_cache.put(self._shared_key("rows"), {"stamp": stamp, "rows": rows, "high_water": high_water}, ttl)
+        # Small key polled by followers so they only unpickle the rows when they changed
+        shared_cache.put(self._shared_key("stamp"), stamp, ttl)
+        self._published_version = version
+
+    def load_published(self) -> bool:
+        """Follower: take the leader's rows if they changed; True when they were loaded"""
+        stamp = shared_cache.get(self._shared_key("stamp"))
+        if stamp is None or stamp == self._loaded_stamp:
+            return False
+        published = shared_cache.get(self._shared_key("rows"))
+        if not published:
+            return False
+        self.replace_all(published["rows"])
+        with self._lock:
+            self.high_water = published["high_water"]
+        # Should this worker become leader it continues incrementally from here
+        self.last_full_load = self.last_refresh = time.monotonic()
+        self._loaded_stamp = published["stamp"]
+        self.last_error = None
+        logger.debug("%s mirror loaded from the shared cache: %s rows", self.name, len(published["rows"]))
+        return True
+
+    def request_full_reload(self):
+        """Ask the leader for a full reload (rows deleted by webhook at another worker)"""
+        shared_cache.put(self._shared_key("reload"), True, MIRROR_LEASE_TTL)
+
+    def _take_reload_request(self) -> bool:
+        if shared_cache.get(self._shared_key("reload")) is None:
+            return False
+        shared_cache.delete(self._shared_key("reload"))
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "rows": len(self._rows),
+                "version": self.version,
+                "high_water": self.high_water,
+                "seconds_since_refresh": round(time.monotonic() - self.last_refresh, 1) if self.last_refresh else None,
+                "seconds_since_full_load": (
+                    round(time.monotonic() - self.last_full_load, 1) if self.last_full_load else None
+                ),
+                "last_error": self.last_error,
+            }
+
+
+projects_mirror = TableMirror(
+    "Projects",
+    os.getenv("NOCODB_PROJECTS_TABLE_ID", "mftsk8hkw23m8q1"),
+    titles=["Projects", "projects"],
+    index_fields={"partner": "Primary Project Partner", "country": "Country", "status": "Status"},
+)
+plots_mirror = TableMirror(
+    "Land Plots",
+    os.getenv("NOCODB_PLOTS_TABLE_ID", "mmqclkrvx9lbtpc"),
+    titles=["Land Plots", "Land Plots, Sites", "plots", "sites"],
+    index_fields={"country": "Country", "status": "Secure Status"},
+)
+MIRRORS = [projects_mirror, plots_mirror]
+
+_refresher: Optional[asyncio.Task] = None
+# Last cycle of the refresh loop, for the health report
+_loop_state = {"cycles": 0, "last_cycle": None, "role": None}
+
+
+def mirror_for_table(table: Optional[str]) -> Optional[TableMirror]:
+    """Match a webhook table id or title to its mirror"""
+    if not table:
+        return None
+    for mirror in MIRRORS:
+        if table == mirror.table_id or table.lower() in mirror.titles:
+            return mirror
+    return None
+
+
+async def refresh_mirrored_row(table: Optional[str], row_id) -> bool:
+    """Re-read one row if `table` is mirrored; errors are logged, not raised"""
+    mirror = mirror_for_table(table)
+    if mirror is None or not mirror.loaded:
+        return False
+    try:
+        await mirror.refresh_row(row_id)
+    except Exception as e:
+        logger.error("%s mirror row refresh failed for %s: %s", mirror.name, row_id, str(e))
+    return True
+
+
+async def apply_webhook_event(table: Optional[str], action: str, row: dict) -> bool:
+    """Apply one CREATE/UPDATE/DELETE event; returns False for unmirrored tables"""
+    mirror = mirror_for_table(table)
+    if mirror is None or not row:
+        return False
+    if action == "DELETE":
+        mirror.remove(row.get("Id") or row.get("id"))
+        if shared_cache.ENABLED:
+            await run_in_threadpool(mirror.request_full_reload)
+    else:
+        mirror.upsert(row)
+    return True
+
+
+def is_leader() -> bool:
+    """Whether this worker refreshes the mirrors from NocoDB"""
+    return not shared_cache.ENABLED or shared_cache.lease_owner(MIRROR_LEASE) == shared_cache.worker_id()
+
+
+async def _refresh_loop():
+    while True:
+        leader = not shared_cache.ENABLED or await run_in_threadpool(
+            shared_cache.acquire_lease, MIRROR_LEASE, MIRROR_LEASE_TTL
+        )
+        if leader:
+            await asyncio.gather(*(mirror.sync_once() for mirror in MIRRORS))
+            if shared_cache.ENABLED:
+                for mirror in MIRRORS:
+                    await run_in_threadpool(mirror.publish)
+        else:
+            for mirror in MIRRORS:
+                await run_in_threadpool(mirror.load_published)
+        _loop_state.update(
+            cycles=_loop_state["cycles"] + 1,
+            last_cycle=time.monotonic(),
+            role="leader" if leader else "follower",
+        )
+        await asyncio.sleep(MIRROR_REFRESH_INTERVAL if leader else MIRROR_FOLLOW_INTERVAL)
+
+
+def start_refresher():
+    """Start the background load/refresh loop on the running event loop"""
+    global _refresher
+    if _refresher is None or _refresher.done():
+        _refresher = asyncio.get_running_loop().create_task(_refresh_loop())
+
+
+async def stop_refresher():
+    global _refresher
+    if _refresher is not None:
+        _refresher.cancel()
+        try:
+            await _refresher
+        except asyncio.CancelledError:
+            pass
+        _refresher = None
+    if shared_cache.ENABLED:
+        # Hand leadership over at once instead of after the lease expires
+        await run_in_threadpool(shared_cache.release_lease, MIRROR_LEASE)
+
+
+def stats() -> dict:
+    return {mirror.name: mirror.stats() for mirror in MIRRORS}
+
+
+def refresher_stats() -> dict:
+    """The background refresh loop: whether it runs, its role and its last cycle"""
+    last_cycle = _loop_state["last_cycle"]
+    return {
+        "running": bool(_refresher and not _refresher.done()),
+        "role": _loop_state["role"],
+        "cycles": _loop_state["cycles"],
+        "seconds_since_last_cycle": round(time.monotonic() - last_cycle, 1) if last_cycle else None,
+        "refresh_interval_seconds": MIRROR_REFRESH_INTERVAL,
+        "mirrors": stats(),
+    }
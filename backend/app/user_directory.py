@@ -0,0 +1,157 @@
+"""
+Process-wide email -> display name directory for the users table.
+
+Comment and audit rendering resolve the same staff emails over and over; the
+directory serves them from memory. The full table is loaded at startup and
+reloaded after USER_DIRECTORY_TTL seconds. Emails missing from the snapshot
+are fetched on demand in one query; unknown emails are remembered briefly so
+external authors don't cause a query per request.
+
+It also memoises each user's personal NocoDB token (the response cache key
+of most endpoints) for USER_TOKEN_TTL seconds; `invalidate` drops it too.
+
+With several workers `invalidate` is signalled through the shared cache and
+the other workers reload their directory.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from .cache import TTLCache
+from .shared_cache import Generation
+
+USER_DIRECTORY_TTL = float(os.getenv("USER_DIRECTORY_TTL", "600"))
+UNKNOWN_EMAIL_TTL = float(os.getenv("USER_DIRECTORY_UNKNOWN_TTL", "60"))
+USER_TOKEN_TTL = float(os.getenv("USER_TOKEN_TTL", "300"))
+
+_lock = threading.Lock()
+_names: Dict[str, Optional[str]] = {}
+_expires_at = 0.0
+_generation = 0
+_unknown = TTLCache(ttl=UNKNOWN_EMAIL_TTL, max_entries=10000)
+# Users without a token are stored as "" so they are cached as well
+_tokens = TTLCache(ttl=USER_TOKEN_TTL, max_entries=5000)
+_shared = Generation("user_directory")
+
+
+def _query(get_connection: Callable, emails: Optional[list] = None) -> Dict[str, Optional[str]]:
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        if emails is None:
+            cursor.execute("SELECT email, name FROM users")
+        else:
+            placeholders = ", ".join(["%s"] * len(emails))
+            cursor.execute(f"SELECT email, name FROM users WHERE email IN ({placeholders})", tuple(emails))
+        return {row["email"]: row.get("name") for row in cursor.fetchall() if row.get("email")}
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def refresh(get_connection: Callable):
+    """Reload the whole directory (startup warm-up and TTL expiry)"""
+    global _names, _expires_at
+    with _lock:
+        generation = _generation
+    names = _query(get_connection)
+    with _lock:
+        if generation == _generation:
+            _names = names
+            _expires_at = time.monotonic() + USER_DIRECTORY_TTL
+
+
+def resolve_names(emails: Iterable[str], get_connection: Callable) -> Dict[str, str]:
+    """
+    Map each email to its display name, falling back to the email itself.
+
+    Only emails that are neither cached nor recently known to be missing
+    cause a database query.
+    """
+    unique_emails = list({email for email in emails if email})
+    if not unique_emails:
+        return {}
+
+    if _shared.changed():
+        _forget(None)
+
+    with _lock:
+        expired = time.monotonic() >= _expires_at
+    if expired:
+        refresh(get_connection)
+
+    with _lock:
+        names = _names
+        generation = _generation
+    missing = [e for e in unique_emails if e not in names and _unknown.get(e) is None]
+    if missing:
+        found = _query(get_connection, missing)
+        with _lock:
+            if generation == _generation:
+                _names.update(found)
+        for email in missing:
+            if email not in found:
+                _unknown.set(email, True)
+        names = {**names, **found}
+
+    return {email: names.get(email) or email for email in unique_emails}
+
+
+def nocodb_token(email: str, get_connection: Callable) -> Optional[str]:
+    """The user's personal NocoDB token, or None; queries only on a cache miss"""
+    if _shared.changed():
+        _forget(None)
+
+    token = _tokens.get(email)
+    if token is not None:
+        return token or None
+
+    with _lock:
+        generation = _generation
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT nocodb_api FROM users WHERE email = %s", (email,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+    token = (row or {}).get("nocodb_api") or ""
+    with _lock:
+        # Don't cache a token that an invalidation has already superseded
+        if generation == _generation:
+            _tokens.set(email, token)
+    return token or None
+
+
+def invalidate(email: Optional[str] = None):
+    """Forget one user (or everyone) after the users table changes; other workers forget everyone"""
+    _forget(email)
+    _shared.bump()
+
+
+def _forget(email: Optional[str]):
+    global _generation, _expires_at
+    with _lock:
+        _generation += 1
+        if email is None:
+            _expires_at = 0.0
+        else:
+            _names.pop(email, None)
+    if email is None:
+        _unknown.clear()
+        _tokens.clear()
+    else:
+        _unknown.invalidate(email)
+        _tokens.invalidate(email)
+
+
+def stats() -> dict:
+    with _lock:
+        return {
+            "entries": len(_names),
+            "expires_in_seconds": max(0.0, round(_expires_at - time.monotonic(), 1)),
+            "unknown_emails": _unknown.stats(),
+            "tokens": _tokens.stats(),
+        }
@@ -0,0 +1,119 @@
+"""
+Startup warm-up of the caches the first requests would otherwise fill.
+
+After a deploy every cold dataset - schema, projects, map data, page
+permissions, the user directory - used to be fetched by whichever user asked
+first. `warmup` runs registered steps concurrently in the background once the
+app has started; a step that fails is retried every WARMUP_RETRY_INTERVAL
+seconds until it succeeds. GET /ready reports `warmup.ready` so deploys can
+hold traffic back until the caches are warm.
+
+Steps are async callables; blocking work belongs in run_in_threadpool. Each
+attempt is bounded by WARMUP_STEP_TIMEOUT seconds.
+"""
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from fastapi import Request
+
+from .logging_setup import get_logger
+
+logger = get_logger("warmup")
+
+WARMUP_STEP_TIMEOUT = float(os.getenv("WARMUP_STEP_TIMEOUT", "120"))
+WARMUP_RETRY_INTERVAL = float(os.getenv("WARMUP_RETRY_INTERVAL", "30"))
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def internal_request(path: str) -> Request:
+    """A bare GET request for calling an endpoint function directly"""
+    return Request({"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""})
+
+
+class _Step:
+    def __init__(self, name: str, fn: Callable[[], Awaitable]):
+        self.name = name
+        self.fn = fn
+        self.state = PENDING
+        self.attempts = 0
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {"state": self.state, "attempts": self.attempts, "seconds": self.seconds, "error": self.error}
+
+
+class Warmup:
+    def __init__(self):
+        self._steps: Dict[str, _Step] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    def add(self, name: str, fn: Callable[[], Awaitable]):
+        self._steps[name] = _Step(name, fn)
+
+    @property
+    def ready(self) -> bool:
+        return all(step.state == DONE for step in self._steps.values())
+
+    async def _run_step(self, step: _Step):
+        step.state = RUNNING
+        step.attempts += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(step.fn(), WARMUP_STEP_TIMEOUT)
+        except Exception as e:
+            step.state = FAILED
+            step.error = str(e) or type(e).__name__
+            logger.warning("Warm-up of %s failed (attempt %s): %s", step.name, step.attempts, step.error)
+        else:
+            step.state = DONE
+            step.error = None
+        step.seconds = round(time.monotonic() - started, 2)
+
+    async def _run(self):
+        self._started_at = time.monotonic()
+        pending = list(self._steps.values())
+        while True:
+            await asyncio.gather(*(self._run_step(step) for step in pending))
+            pending = [step for step in pending if step.state == FAILED]
+            if not pending:
+                break
+            await asyncio.sleep(WARMUP_RETRY_INTERVAL)
+        self._finished_at = time.monotonic()
+        logger.info("Warm-up finished in %.1fs", self._finished_at - self._started_at)
+
+    def start(self):
+        """Run the steps in the background on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> dict:
+        elapsed = None
+        if self._started_at is not None:
+            elapsed = round((self._finished_at or time.monotonic()) - self._started_at, 2)
+        return {
+            "ready": self.ready,
+            "started": self._started_at is not None,
+            "seconds": elapsed,
+            "steps": {name: step.to_dict() for name, step in self._steps.items()},
+        }
+
+
+warmup = Warmup()
@@ -0,0 +1,75 @@
+from app import cache
+from app.cache import TTLCache, hit_rate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(monkeypatch, ttl=10, max_entries=None):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return TTLCache(ttl=ttl, max_entries=max_entries), clock
+
+
+def test_get_returns_default_on_miss(monkeypatch):
+    c, _ = make_cache(monkeypatch)
+    assert c.get("a") is None
+    assert c.get("a", "fallback") == "fallback"
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    c, clock = make_cache(monkeypatch, ttl=10)
+    c.set("a", 1)
+    clock.now += 9.9
+    assert c.get("a") == 1
+    clock.now += 0.1
+    assert c.get("a") is None
+    assert len(c) == 0
+
+
+def test_falsy_values_are_cached(monkeypatch):
+    c, _ = make_cache(monkeypatch)
+    c.set("empty", "")
+    assert c.get("empty", "missing") == ""
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch):
+    c, _ = make_cache(monkeypatch, max_entries=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1
+    assert c.get("c") == 3
+
+
+def test_invalidate_and_invalidate_where(monkeypatch):
+    c, _ = make_cache(monkeypatch)
+    for key in ("t1:a", "t1:b", "t2:a"):
+        c.set(key, key)
+    c.invalidate("t2:a")
+    assert c.get("t2:a") is None
+    assert c.invalidate_where(lambda key: key.startswith("t1:")) == 2
+    assert len(c) == 0
+
+
+def test_stats_count_hits_and_misses(monkeypatch):
+    c, _ = make_cache(monkeypatch, max_entries=5)
+    c.set("a", 1)
+    c.get("a")
+    c.get("b")
+    stats = c.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert stats["max_entries"] == 5
+
+
+def test_hit_rate():
+    assert hit_rate(0, 0) is None
+    assert hit_rate(2, 1) == 0.667
@@ -0,0 +1,71 @@
+from app import circuit_breaker
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(monkeypatch, threshold=3, reset=30):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return CircuitBreaker("test", failure_threshold=threshold, reset_timeout=reset), clock
+
+
+def test_opens_after_consecutive_failures(monkeypatch):
+    breaker, _ = make_breaker(monkeypatch)
+    for _ in range(2):
+        breaker.record_failure("timeout")
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+    breaker.record_failure("timeout")
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_success_resets_the_failure_count(monkeypatch):
+    breaker, _ = make_breaker(monkeypatch)
+    breaker.record_failure("timeout")
+    breaker.record_failure("timeout")
+    breaker.record_success()
+    breaker.record_failure("timeout")
+    assert breaker.state == CLOSED
+    assert not breaker.healthy
+
+
+def test_half_open_allows_a_single_trial(monkeypatch):
+    breaker, clock = make_breaker(monkeypatch, threshold=1)
+    breaker.record_failure("HTTP 503")
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.healthy
+
+
+def test_failed_trial_opens_again(monkeypatch):
+    breaker, clock = make_breaker(monkeypatch, threshold=1)
+    breaker.record_failure("HTTP 503")
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure("HTTP 503")
+    assert breaker.state == OPEN
+    assert breaker.stats()["times_opened"] == 2
+    assert breaker.stats()["retry_in_seconds"] == 30
+
+
+def test_unreported_trial_is_given_up_after_the_reset_timeout(monkeypatch):
+    breaker, clock = make_breaker(monkeypatch, threshold=1)
+    breaker.record_failure("timeout")
+    clock.now += 30
+    assert breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
@@ -0,0 +1,116 @@
+import pytest
+
+from app import companies
+from app.companies import _keyset_clause, decode_cursor, encode_cursor, list_companies
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._rows = []
+
+    def execute(self, query, params=()):
+        self.conn.queries.append((" ".join(query.split()), list(params)))
+        if "information_schema" in query:
+            self._rows = [{"name": n, "data_type": t} for n, t in self.conn.columns.items()]
+        else:
+            self._rows = self.conn.results.pop(0)
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, results=(), columns=None):
+        self.results = list(results)
+        self.columns = columns or {"id": "int", "full_name": "varchar", "type": "varchar", "company_status": "varchar"}
+        self.queries = []
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    companies._drop()
+    yield
+    companies._drop()
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("Acme Ltd", 42)) == ("Acme Ltd", 42)
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+
+
+def test_malformed_cursor_is_a_value_error():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.parametrize("descending, after_value, expected_sql, expected_params", [
+    (False, "B", "(full_name > %s OR (full_name = %s AND id > %s))", ["B", "B", 5]),
+    (False, None, "((full_name IS NULL AND id > %s) OR full_name IS NOT NULL)", [5]),
+    (True, "B", "(full_name < %s OR (full_name = %s AND id < %s) OR full_name IS NULL)", ["B", "B", 5]),
+    (True, None, "(full_name IS NULL AND id < %s)", [5]),
+])
+def test_keyset_clause_follows_mysql_null_ordering(descending, after_value, expected_sql, expected_params):
+    assert _keyset_clause("full_name", descending, after_value, 5) == (expected_sql, expected_params)
+
+
+def test_keyset_clause_rejects_columns_outside_the_whitelist():
+    with pytest.raises(ValueError):
+        _keyset_clause("full_name; DROP TABLE companies", False, "B", 5)
+
+
+def test_page_returns_next_cursor_and_parameterised_filters():
+    rows = [{"id": i, "full_name": f"C{i}", "type": "Ltd", "company_status": "Active"} for i in (1, 2, 3)]
+    conn = FakeConnection(results=[rows])
+    page, next_cursor = list_companies(lambda: conn, name="C", status="Active", limit=2)
+
+    assert [r["id"] for r in page] == [1, 2]
+    assert decode_cursor(next_cursor) == ("C2", 2)
+    query, params = conn.queries[-1]
+    assert "WHERE company_status = %s AND (full_name LIKE %s OR name LIKE %s)" in query
+    assert query.endswith("ORDER BY full_name ASC, id ASC LIMIT %s")
+    assert params == ["Active", "%C%", "%C%", 3]
+
+
+def test_last_page_has_no_cursor():
+    conn = FakeConnection(results=[[{"id": 1, "full_name": "A", "type": "Ltd", "company_status": None}]])
+    page, next_cursor = list_companies(lambda: conn, limit=2)
+    assert len(page) == 1
+    assert next_cursor is None
+
+
+def test_unknown_fields_and_sorts_are_rejected():
+    conn = FakeConnection()
+    with pytest.raises(ValueError):
+        list_companies(lambda: conn, fields=["password"])
+    with pytest.raises(ValueError):
+        list_companies(lambda: conn, sort="full_name")
+
+
+def test_summary_is_cached_until_invalidated():
+    groups = [
+        {"type": "Ltd", "company_status": "Active", "count": 3},
+        {"type": "Ltd", "company_status": "Dissolved", "count": 1},
+        {"type": "LLP", "company_status": None, "count": 2},
+    ]
+    conn = FakeConnection(results=[groups, groups])
+    first = companies.summary(lambda: conn)
+    assert first["total_companies"] == 6
+    assert first["active_companies"] == 3
+    assert first["type_breakdown"] == {"Ltd": 4, "LLP": 2}
+
+    companies.summary(lambda: conn)
+    assert len(conn.queries) == 1
+
+    companies.invalidate()
+    companies.summary(lambda: conn)
+    assert len(conn.queries) == 2
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import Request  # noqa: E402
+
+from app.http_cache import NO_CACHE, etag_response, make_etag, max_age, not_modified  # noqa: E402
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode("latin-1"))] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+
+def test_response_carries_etag_and_cache_control():
+    response = etag_response(make_request(), {"b": 2, "a": 1})
+    assert response.status_code == 200
+    assert json.loads(response.body) == {"b": 2, "a": 1}
+    assert response.headers["etag"] == make_etag(response.body)
+    assert response.headers["cache-control"] == NO_CACHE
+
+
+def test_same_content_gives_same_etag():
+    first = etag_response(make_request(), {"rows": [1, 2]})
+    second = etag_response(make_request(), {"rows": [1, 2]})
+    third = etag_response(make_request(), {"rows": [1, 3]})
+    assert first.headers["etag"] == second.headers["etag"] != third.headers["etag"]
+
+
+def test_matching_if_none_match_gives_empty_304():
+    etag = etag_response(make_request(), {"a": 1}).headers["etag"]
+    response = etag_response(make_request(f'"other", W/{etag}'), {"a": 1}, cache_control=max_age(60))
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "private, max-age=60, must-revalidate"
+
+
+def test_errors_are_never_304():
+    etag = etag_response(make_request(), {"error": "x"}, status_code=500).headers["etag"]
+    assert etag_response(make_request(etag), {"error": "x"}, status_code=500).status_code == 500
+
+
+def test_not_modified():
+    assert not_modified(make_request("*"), '"abc"')
+    assert not not_modified(make_request('"abc"'), None)
+    assert not not_modified(None, '"abc"')
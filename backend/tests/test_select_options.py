@@ -0,0 +1,77 @@
+from app.select_options import (
+    UNORDERED,
+    as_choices,
+    display_options,
+    dump_options,
+    legacy_string,
+    option_from_nocodb,
+    option_order,
+    parse_options,
+)
+
+NOCODB_OPTIONS = [
+    {"title": "Hydro", "color": "#ffdaf6", "order": 2, "id": "sl2222222222"},
+    {"title": "Power", "color": "#cfdffe", "order": 1, "id": "sl1111111111"},
+]
+LEGACY = "Power (Color: #cfdffe, Order: 1, ID: sl111111...) | Hydro (Color: #ffdaf6, Order: 2, ID: sl222222...)"
+
+
+def test_json_form_is_parsed_and_sorted_by_order():
+    raw = dump_options([option_from_nocodb(o) for o in NOCODB_OPTIONS])
+    options = parse_options(raw, "MultiSelect")
+    assert [o["title"] for o in options] == ["Power", "Hydro"]
+    assert options[0] == {"title": "Power", "color": "#cfdffe", "order": 1, "id": "sl1111111111"}
+
+
+def test_legacy_form_is_parsed():
+    options = parse_options(LEGACY)
+    assert [(o["title"], o["color"], o["order"], o["id"]) for o in options] == [
+        ("Power", "#cfdffe", 1, "sl111111..."),
+        ("Hydro", "#ffdaf6", 2, "sl222222..."),
+    ]
+
+
+def test_legacy_form_with_missing_details():
+    options = parse_options("Open | Closed (Order: x)")
+    assert [(o["title"], o["color"], o["order"]) for o in options] == [
+        ("Open", None, UNORDERED),
+        ("Closed", None, UNORDERED),
+    ]
+
+
+def test_invalid_json_falls_back_to_the_legacy_parser():
+    assert [o["title"] for o in parse_options("[Power")] == ["[Power"]
+
+
+def test_non_select_fields_and_empty_values_have_no_options():
+    assert parse_options(LEGACY, "SingleLineText") == []
+    assert parse_options(None) == []
+    assert parse_options("") == []
+
+
+def test_list_values_are_accepted():
+    assert [o["title"] for o in parse_options(NOCODB_OPTIONS)] == ["Power", "Hydro"]
+
+
+def test_dump_options_is_stable():
+    options = [option_from_nocodb(o) for o in NOCODB_OPTIONS]
+    assert dump_options(options) == dump_options(list(reversed(options)))
+
+
+def test_display_options_renders_json_in_the_legacy_form():
+    raw = dump_options([option_from_nocodb(o) for o in NOCODB_OPTIONS])
+    assert display_options(raw, "SingleSelect") == LEGACY
+    assert display_options(LEGACY, "SingleSelect") == LEGACY
+    assert display_options("", "SingleSelect") == ""
+
+
+def test_legacy_string_round_trips_through_the_parser():
+    assert legacy_string(parse_options(LEGACY)) == LEGACY
+
+
+def test_choices_and_order_lookup():
+    options = parse_options(LEGACY)
+    assert as_choices(options)[0] == {"value": "Power", "label": "Power", "order": 1, "color": "#cfdffe"}
+    assert option_order("hydro", options) == 2
+    assert option_order("Solar", options) == UNORDERED
+    assert option_order(None, options) == UNORDERED
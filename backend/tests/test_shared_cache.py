@@ -0,0 +1,87 @@
+import pytest
+
+from app import shared_cache
+from app.shared_cache import Generation
+
+
+@pytest.fixture(autouse=True)
+def shared_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE_PATH", str(tmp_path / "shared.sqlite3"))
+    monkeypatch.setattr(shared_cache, "ENABLED", True)
+    monkeypatch.setattr(shared_cache, "GENERATION_CHECK_INTERVAL", 0)
+    shared_cache._local.conn = None
+    yield
+    if shared_cache._local.conn is not None:
+        shared_cache._local.conn.close()
+        shared_cache._local.conn = None
+
+
+def as_worker(monkeypatch, name):
+    monkeypatch.setattr(shared_cache, "worker_id", lambda: name)
+
+
+def test_put_get_and_expiry():
+    shared_cache.put("k", {"rows": [1, 2]}, ttl=60)
+    assert shared_cache.get("k") == {"rows": [1, 2]}
+    shared_cache.put("gone", 1, ttl=-1)
+    assert shared_cache.get("gone", "miss") == "miss"
+
+
+def test_delete_by_tag_and_prefix():
+    shared_cache.put("resp:a", 1, 60, tag="projects")
+    shared_cache.put("resp:b", 2, 60, tag="plots")
+    shared_cache.put("other:a", 3, 60, tag="projects")
+    assert shared_cache.delete_tag("projects", prefix="resp:") == 1
+    assert shared_cache.get("resp:a") is None
+    assert shared_cache.get("other:a") == 3
+    assert shared_cache.delete_prefix("resp:") == 1
+    assert shared_cache.get("resp:b") is None
+
+
+def test_lease_is_exclusive_until_released(monkeypatch):
+    as_worker(monkeypatch, "worker-a")
+    assert shared_cache.acquire_lease("mirror", 60)
+    assert shared_cache.acquire_lease("mirror", 60), "the holder can renew"
+
+    as_worker(monkeypatch, "worker-b")
+    assert not shared_cache.acquire_lease("mirror", 60)
+    assert shared_cache.lease_owner("mirror") == "worker-a"
+    shared_cache.release_lease("mirror")
+    assert shared_cache.lease_owner("mirror") == "worker-a", "only the owner can release"
+
+    as_worker(monkeypatch, "worker-a")
+    shared_cache.release_lease("mirror")
+    as_worker(monkeypatch, "worker-b")
+    assert shared_cache.acquire_lease("mirror", 60)
+    assert shared_cache.lease_owner("mirror") == "worker-b"
+
+
+def test_expired_lease_can_be_taken_over(monkeypatch):
+    as_worker(monkeypatch, "worker-a")
+    assert shared_cache.acquire_lease("jobs", -1)
+    as_worker(monkeypatch, "worker-b")
+    assert shared_cache.acquire_lease("jobs", 60)
+
+
+def test_generation_reports_a_foreign_bump_once():
+    reader = Generation("pages")
+    writer = Generation("pages")
+    assert not reader.changed()
+
+    writer.bump()
+    assert reader.changed()
+    assert not reader.changed()
+    assert not writer.changed(), "a worker does not react to its own bump"
+
+
+def test_generation_ignores_bumps_from_before_it_existed():
+    Generation("users").bump()
+    assert not Generation("users").changed()
+
+
+def test_generation_is_inert_when_the_shared_cache_is_off(monkeypatch):
+    reader = Generation("groups")
+    monkeypatch.setattr(shared_cache, "ENABLED", False)
+    Generation("groups").bump()
+    assert not reader.changed()
+    assert shared_cache.get("generation:groups") is None
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"rows": 3}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("k", fetch))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flights.stats()["shared"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [{"rows": 3}] * 5
+    assert flights.stats() == {"in_flight": 0, "calls": 1, "shared": 4}
+
+
+def test_errors_are_shared_and_the_key_is_forgotten():
+    flights = SingleFlight()
+
+    def fail():
+        raise ValueError("upstream down")
+
+    with pytest.raises(ValueError):
+        flights.do("k", fail)
+    assert flights.do("k", lambda: "ok") == "ok"
+    assert flights.stats()["calls"] == 2
+
+
+def test_async_callers_share_one_call():
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "rows"
+
+    async def main():
+        return await asyncio.gather(*(flights.do("k", fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["rows"] * 5
+    assert len(calls) == 1
+    assert flights.stats() == {"in_flight": 0, "calls": 1, "shared": 4}
+
+
+def test_cancelled_waiter_does_not_cancel_the_call():
+    flights = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "rows"
+
+    async def main():
+        first = asyncio.ensure_future(flights.do("k", fetch))
+        second = asyncio.ensure_future(flights.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "rows"
@@ -12,7 +12,7 @@ export async function GET(request: NextRequest) {
     // Use Docker internal network URL when in container, fallback to localhost for development
     const backendUrl = process.env.BACKEND_BASE_URL || 'http://localhost:8150';
 
-    const response = await fetch(`${backendUrl}/companies`, {
+    const response = await fetch(`${backendUrl}/companies${request.nextUrl.search}`, {
       method: 'GET',
       headers: {
         'Authorization': authHeader,
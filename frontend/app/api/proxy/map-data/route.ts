@@ -20,14 +20,28 @@ export async function GET(request: NextRequest) {
     
   // Prefer in-docker URL, then public URL, then default
   const backendUrl = process.env.BACKEND_BASE_URL || 'http://localhost:8150';
+    const ifNoneMatch = request.headers.get('if-none-match');
     const response = await fetch(`${backendUrl}/projects/map-data`, {
       method: 'GET',
       headers: {
         'Authorization': `Bearer ${encodedUser}`,
         'Content-Type': 'application/json',
+        ...(ifNoneMatch ? { 'If-None-Match': ifNoneMatch } : {}),
       },
+      cache: 'no-store',
     });
 
+    // Pass validators through so the browser can revalidate with a 304
+    const cacheHeaders: Record<string, string> = {};
+    for (const name of ['etag', 'cache-control']) {
+      const value = response.headers.get(name);
+      if (value) cacheHeaders[name] = value;
+    }
+
+    if (response.status === 304) {
+      return new NextResponse(null, { status: 304, headers: cacheHeaders });
+    }
+
     if (!response.ok) {
       const errorText = await response.text();
       console.error('Backend map data error:', response.status, errorText);
@@ -38,7 +52,7 @@ export async function GET(request: NextRequest) {
     }
 
     const data = await response.json();
-    return NextResponse.json(data);
+    return NextResponse.json(data, { headers: cacheHeaders });
     
   } catch (error) {
     console.error('Map data proxy error:', error);
@@ -75,7 +75,7 @@ function ReceiptsPage() {
   const fetchCompanies = async () => {
     try {
       console.log('📡 Fetching companies list...');
-      const response = await makeAuthenticatedRequest('/api/proxy/companies');
+      const response = await makeAuthenticatedRequest('/api/proxy/companies?fields=full_name&include_summary=false');
       console.log('📡 Companies API response status:', response.status);
       
       if (response.ok) {